@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import time
+
+import aiogram
+
+from app.config import config
+from app.dependencies import get_bot, get_service
+from app.scheduler import run_jobs
+
+logger = logging.getLogger(__name__)
+
+
+async def drain(bot: aiogram.Bot) -> int:
+    """Run a catch-up job that was in the backlog the longest.
+
+    Fresh notifications take priority, so nothing is run while any job is due,
+    see `JobService.has_due`.
+
+    Returns number of claimed jobs.
+    """
+    async with get_service() as service:
+        if await service.job.has_due():
+            return 0
+
+        jobs = await service.job.claim_backlog(limit=1)
+        await service.commit()
+
+        await run_jobs(service=service, bot=bot, jobs=jobs)
+
+    return len(jobs)
+
+
+async def main() -> None:
+    async with get_bot() as bot:
+        while True:
+            start = time.monotonic()
+            if not await drain(bot=bot):
+                await asyncio.sleep(config.scheduler.poll_interval)
+                continue
+
+            # no more than `config.catch_up.rate` missed notifications are sent per second
+            await asyncio.sleep(max(1 / config.catch_up.rate - (time.monotonic() - start), 0))
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,68 @@
+import aiogram
+import pytest
+from pytest_mock import MockerFixture
+
+from app import schema
+from app.backlog import drain
+from app.service import Service
+from app.util import RelativeDelta
+
+
+@pytest.fixture
+def drain_mocks(mock_get_service: None, mocker: MockerFixture, service: Service) -> None:
+    mocker.patch.object(service.job, "has_due", return_value=False, autospec=True)
+    mocker.patch.object(service.job, "complete", autospec=True)
+
+
+async def test_drain_success(
+    drain_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    jobs = [
+        schema.Job(
+            type=schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=event.next_date + RelativeDelta(seconds=i),
+        )
+        for i in range(2)
+    ]
+    await service.job.schedule_many(jobs=jobs)
+    await service.commit()
+    run_job = mocker.patch("app.scheduler.run_job", autospec=True)
+
+    assert await drain(bot=bot) == 1
+    assert await drain(bot=bot) == 1
+    assert await drain(bot=bot) == 0
+
+    assert [call.kwargs["job"] for call in run_job.await_args_list] == jobs
+    assert [call.kwargs["jobs"] for call in service.job.complete.await_args_list] == [
+        [jobs[0]],
+        [jobs[1]],
+        [],
+    ]
+
+
+async def test_drain_due_jobs_first(
+    drain_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    await service.job.schedule(
+        job=schema.Job(
+            type=schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=event.next_date,
+        ),
+    )
+    service.job.has_due.return_value = True
+    run_job = mocker.patch("app.scheduler.run_job", autospec=True)
+
+    assert await drain(bot=bot) == 0
+
+    run_job.assert_not_awaited()
+    service.job.complete.assert_not_awaited()
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+import aiogram
+
+from app import schema
+from app.config import config
+from app.dependencies import get_service
+from app.keyboards import build_occurrence_keyboard
+
+logger = logging.getLogger(__name__)
+
+
+class EditCoalescer:
+    """Debounce edits of notification messages requested by callbacks.
+
+    Edits of a message requested within `config.edit_window` seconds are sent as a single edit,
+    rendered from the snapshot of the occurrence read when the edit is sent. A message is edited
+    by one task at a time, edits requested while it's being edited are sent after it.
+    Edits that wouldn't change the message are skipped, see `OccurrenceService.update_rendered`.
+    """
+
+    def __init__(self, bot: aiogram.Bot) -> None:
+        self._bot = bot
+
+        self._requested: dict[tuple[int, int], schema.Occurrence] = {}
+        self._tasks: dict[tuple[int, int], asyncio.Task[None]] = {}
+
+    async def request(self, occurrence: schema.Occurrence) -> None:
+        """Request an edit of occurrence's notification message to show its current queue.
+
+        Must be requested once the change of the queue is committed, see `Service.on_commit`.
+        """
+        key = (occurrence.event.chat.id, occurrence.message_id)
+
+        self._requested[key] = occurrence
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key=key))
+
+    async def close(self) -> None:
+        """Wait until all requested edits are sent."""
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _run(self, key: tuple[int, int]) -> None:
+        try:
+            while key in self._requested:
+                await asyncio.sleep(config.edit_window)
+
+                occurrence = self._requested.pop(key)
+                try:
+                    await self._edit(occurrence=occurrence)
+                except Exception:
+                    logger.exception(
+                        "failed to edit message of occurrence with id: %s.",
+                        str(occurrence.id),
+                    )
+        finally:
+            del self._tasks[key]
+
+    async def _edit(self, occurrence: schema.Occurrence) -> None:
+        reply_markup = build_occurrence_keyboard(occurrence_id=occurrence.id)
+
+        async with get_service() as service:
+            snapshot = await service.occurrence.get_snapshot(
+                filter_=schema.OccurrenceGetFilter(id=occurrence.id),
+            )
+            if snapshot is None:
+                return
+
+            text = service.occurrence.generate_notification_message_text(
+                occurrence=snapshot.occurrence,
+                entries=snapshot.entries,
+            )
+            is_changed = await service.occurrence.update_rendered(
+                occurrence_id=occurrence.id,
+                text=text,
+                reply_markup=reply_markup,
+            )
+
+        if not is_changed:
+            return
+
+        # the message may have been resent since the edit was requested,
+        # so the one the snapshot was rendered for is edited
+        try:
+            await self._bot.edit_message_text(
+                text=text,
+                chat_id=snapshot.occurrence.event.chat.id,
+                message_id=snapshot.occurrence.message_id,
+                reply_markup=reply_markup,
+            )
+        except Exception:
+            async with get_service() as service:
+                await service.occurrence.forget_rendered(occurrence_id=occurrence.id)
+            raise
@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+
+import aiogram
+import pytest
+from pytest_mock import MockerFixture
+
+from app import schema
+from app.coalescer import EditCoalescer
+from app.config import config
+from app.service import Service
+
+
+@pytest.fixture
+def coalescer_mocks(
+    mock_get_service: None,
+    mocker: MockerFixture,
+    service: Service,
+    occurrence: schema.Occurrence,
+) -> None:
+    mocker.patch.object(config, "edit_window", 0.05)
+    mocker.patch.object(
+        service.occurrence,
+        "get_snapshot",
+        return_value=schema.OccurrenceSnapshot(occurrence=occurrence, entries=[]),
+        autospec=True,
+    )
+    mocker.patch.object(
+        service.occurrence,
+        "generate_notification_message_text",
+        side_effect=(f"text {i}" for i in itertools.count()),
+        autospec=True,
+    )
+
+
+async def test_edit_coalescer_request_success(
+    coalescer_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    coalescer = EditCoalescer(bot=bot)
+
+    # message was resent after the edit was requested
+    resent = occurrence.model_copy(update={"message_id": occurrence.message_id + 1})
+    snapshot = schema.OccurrenceSnapshot(occurrence=resent, entries=[entry])
+    service.occurrence.get_snapshot.return_value = snapshot
+
+    for _ in range(30):
+        await coalescer.request(occurrence=occurrence)
+    await coalescer.close()
+
+    bot.edit_message_text.assert_awaited_once()
+    service.occurrence.get_snapshot.assert_awaited_once_with(
+        filter_=schema.OccurrenceGetFilter(id=occurrence.id),
+    )
+    service.occurrence.generate_notification_message_text.assert_called_once_with(
+        occurrence=snapshot.occurrence,
+        entries=snapshot.entries,
+    )
+    assert bot.edit_message_text.await_args.kwargs["text"] == "text 0"
+    assert bot.edit_message_text.await_args.kwargs["chat_id"] == resent.event.chat.id
+    assert bot.edit_message_text.await_args.kwargs["message_id"] == resent.message_id
+
+
+async def test_edit_coalescer_request_while_editing_success(
+    coalescer_mocks: None,
+    mocker: MockerFixture,
+    occurrence: schema.Occurrence,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    coalescer = EditCoalescer(bot=bot)
+    editing = asyncio.Event()
+
+    async def edit_message_text(**_: object) -> None:
+        editing.set()
+        await asyncio.sleep(config.edit_window)
+
+    bot.edit_message_text.side_effect = edit_message_text
+
+    await coalescer.request(occurrence=occurrence)
+    await editing.wait()
+    await coalescer.request(occurrence=occurrence)
+    await coalescer.request(occurrence=occurrence)
+    await coalescer.close()
+
+    assert bot.edit_message_text.await_count == 2
+
+
+async def test_edit_coalescer_request_different_messages_success(
+    coalescer_mocks: None,
+    mocker: MockerFixture,
+    occurrence: schema.Occurrence,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    coalescer = EditCoalescer(bot=bot)
+
+    await coalescer.request(occurrence=occurrence)
+    await coalescer.request(occurrence=occurrence.model_copy(update={"message_id": 2}))
+    await coalescer.close()
+
+    assert bot.edit_message_text.await_count == 2
+
+
+async def test_edit_coalescer_edit_failure(
+    coalescer_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    occurrence: schema.Occurrence,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    service.occurrence.generate_notification_message_text.side_effect = None
+    service.occurrence.generate_notification_message_text.return_value = "text"
+    bot.edit_message_text.side_effect = [Exception, None]
+    coalescer = EditCoalescer(bot=bot)
+
+    await coalescer.request(occurrence=occurrence)
+    await coalescer.close()
+    await coalescer.request(occurrence=occurrence)
+    await coalescer.close()
+
+    assert bot.edit_message_text.await_count == 2
+
+
+async def test_edit_coalescer_unchanged_message_skipped(
+    coalescer_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    occurrence: schema.Occurrence,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    service.occurrence.generate_notification_message_text.side_effect = None
+    service.occurrence.generate_notification_message_text.return_value = "text"
+    coalescer = EditCoalescer(bot=bot)
+
+    for _ in range(2):
+        await coalescer.request(occurrence=occurrence)
+        await coalescer.close()
+
+    bot.edit_message_text.assert_awaited_once()
+    assert await service.occurrence.get_skipped_edits() == 1
+
+
+async def test_edit_coalescer_expired_occurrence_skipped(
+    coalescer_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    occurrence: schema.Occurrence,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    service.occurrence.get_snapshot.return_value = None
+    coalescer = EditCoalescer(bot=bot)
+
+    await coalescer.request(occurrence=occurrence)
+    await coalescer.close()
+
+    bot.edit_message_text.assert_not_called()
+    service.occurrence.generate_notification_message_text.assert_not_called()
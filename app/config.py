@@ -1,6 +1,6 @@
 import typing
 
-from pydantic import BaseModel, Field, ValidationInfo
+from pydantic import BaseModel, Field, ValidationInfo, model_validator
 from pydantic.functional_validators import AfterValidator
 from pydantic_core import MultiHostUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -28,6 +28,56 @@ class RedisConfig(BaseModel):
     port: int
 
 
+class UpdatesConfig(BaseModel):
+    mode: typing.Literal["polling", "webhook"] = "polling"
+    webhook_url: str = ""
+    webhook_path: str = "/webhook"
+    webhook_secret: str = ""
+    host: str = "0.0.0.0"  # noqa: S104
+    port: int = 8080
+    concurrency: int = 64
+
+    @model_validator(mode="after")
+    def check_webhook_secret(self) -> typing.Self:
+        # without a secret anyone who finds the webhook could send updates on Telegram's behalf
+        if self.mode == "webhook" and not self.webhook_secret:
+            msg = "webhook_secret is required in webhook mode"
+            raise ValueError(msg)
+        return self
+
+
+class WorkerConfig(BaseModel):
+    pool: typing.Literal["threads", "prefork", "solo"] = "threads"
+    concurrency: int = 16
+    prefetch_multiplier: int = 4
+
+
+class SchedulerConfig(BaseModel):
+    backend: typing.Literal["celery", "postgres", "redis"] = "celery"
+    batch_size: int = 100
+    poll_interval: float = 1.0
+
+
+class RecoveryConfig(BaseModel):
+    batch_size: int = 1000
+    interval: float = RelativeDelta(minutes=10).s
+
+
+class CatchUpConfig(BaseModel):
+    policy: typing.Literal["skip", "latest", "all"] = "latest"
+    grace_period: int = RelativeDelta(minutes=5).s
+    rate: float = 1.0
+
+
+class RateLimitConfig(BaseModel):
+    rate: float = 30.0
+    chat_rate: float = 1.0
+    chat_burst: int = 1
+    group_rate: float = 20 / 60
+    group_burst: int = 20
+    max_retries: int = 3
+
+
 def build_database_url(_: str, info: ValidationInfo) -> str:
     postgres: PostgresConfig = info.data["postgres"]
     database_url = MultiHostUrl.build(
@@ -66,6 +116,8 @@ class Config(BaseSettings):
     min_offset: RelativeDelta = RelativeDelta()
     max_offset: RelativeDelta = RelativeDelta(years=2)
 
+    max_catch_up_steps: int = 1_000_000
+
     postgres: PostgresConfig = Field(default=...)
     database_url: typing.Annotated[str, AfterValidator(build_database_url)] = ""
 
@@ -75,5 +127,14 @@ class Config(BaseSettings):
     redis: RedisConfig = Field(default=...)
     cache_ttl: int = RelativeDelta(minutes=5).s
 
+    edit_window: float = 1.0
+
+    updates: UpdatesConfig = UpdatesConfig()
+    worker: WorkerConfig = WorkerConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    recovery: RecoveryConfig = RecoveryConfig()
+    catch_up: CatchUpConfig = CatchUpConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+
 
 config = Config()
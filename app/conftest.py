@@ -1,9 +1,11 @@
 import asyncio
 import typing
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 import pytest
 import pytz
+from pytest_mock import MockerFixture
 from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
@@ -16,6 +18,8 @@ from testcontainers.redis import AsyncRedisContainer
 
 from app import schema
 from app.models import Base
+from app.repository import Repository
+from app.service import Service
 from app.util.util import RelativeDelta
 
 
@@ -89,6 +93,34 @@ async def redis(
         await redis.close()
 
 
+@pytest.fixture
+def repository(mocker: MockerFixture) -> Repository:
+    return Repository(session=mocker.create_autospec(spec=AsyncSession))
+
+
+@pytest.fixture
+def service(repository: Repository, redis: AsyncRedis) -> Service:
+    return Service(repository=repository, redis=redis)
+
+
+@pytest.fixture
+def mock_get_service(mocker: MockerFixture, service: Service) -> None:
+    """Make background processes and worker tasks use `service` instead of their own."""
+
+    @asynccontextmanager
+    async def get_service() -> typing.AsyncGenerator[Service, None]:
+        yield service
+
+    for target in [
+        "app.backlog.get_service",
+        "app.coalescer.get_service",
+        "app.recovery.get_service",
+        "app.scheduler.get_service",
+        "app.tasks.celery.runtime.get_service",
+    ]:
+        mocker.patch(target, get_service)
+
+
 @pytest.fixture
 def chat() -> schema.Chat:
     return schema.Chat(
@@ -152,3 +184,12 @@ def entry(occurrence: schema.Occurrence) -> schema.Entry:
         is_skipping=False,
         is_done=True,
     )
+
+
+@pytest.fixture
+def job(event: schema.Event) -> schema.Job:
+    return schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        eta=event.next_date,
+    )
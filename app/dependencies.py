@@ -1,11 +1,13 @@
 import typing
 from contextlib import asynccontextmanager
 
+import aiogram
 from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import config
 from app.database import Session
+from app.limiter import RateLimiter, RateLimitMiddleware
 from app.repository import Repository
 from app.service import Service
 
@@ -25,11 +27,14 @@ async def get_session() -> typing.AsyncGenerator[AsyncSession, None]:
 
 @asynccontextmanager
 async def get_repository() -> typing.AsyncGenerator[Repository, None]:
+    """Get repository whose changes are committed at once when the block exits without errors."""
     async with get_session() as session:
         repository = Repository(session=session)
 
         yield repository
 
+        await repository.commit()
+
 
 @asynccontextmanager
 async def get_redis() -> typing.AsyncGenerator[AsyncRedis, None]:
@@ -39,7 +44,22 @@ async def get_redis() -> typing.AsyncGenerator[AsyncRedis, None]:
 
 @asynccontextmanager
 async def get_service() -> typing.AsyncGenerator[Service, None]:
-    async with get_repository() as repository, get_redis() as redis:
+    # redis outlives the repository, its `on_commit` callbacks use it
+    async with get_redis() as redis, get_repository() as repository:
         service = Service(repository=repository, redis=redis)
 
         yield service
+
+
+def build_bot(redis: AsyncRedis) -> aiogram.Bot:
+    """Build bot whose Bot API requests are rate limited, see `RateLimitMiddleware`."""
+    bot = aiogram.Bot(token=config.token)
+    bot.session.middleware(RateLimitMiddleware(limiter=RateLimiter(redis=redis)))
+
+    return bot
+
+
+@asynccontextmanager
+async def get_bot() -> typing.AsyncGenerator[aiogram.Bot, None]:
+    async with get_redis() as redis, build_bot(redis=redis) as bot:
+        yield bot
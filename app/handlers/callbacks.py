@@ -1,17 +1,18 @@
 from datetime import datetime
+from functools import partial
 
 import aiogram
 import pytz
 
 from app import callbacks, schema
-from app.keyboards import build_occurrence_keyboard
+from app.coalescer import EditCoalescer
 from app.service import Service
 
 
 async def occurrence_callback_handler(
     callback: aiogram.types.CallbackQuery,
-    bot: aiogram.Bot,
     service: Service,
+    coalescer: EditCoalescer,
     callback_data: callbacks.OccurrenceCallbackFactory,
 ) -> None:
     now = datetime.now(tz=pytz.utc)
@@ -23,82 +24,61 @@ async def occurrence_callback_handler(
         await callback.answer(text="Event is expired or invalid.")
         return
 
-    entry = await service.entry.get(
-        filter_=schema.EntryGetFilter(
-            occurrence_id=occurrence.id,
-            user_id=callback.from_user.id,
-        ),
-    )
+    user_id = callback.from_user.id
 
     match callback_data.action:
         case callbacks.OccurrenceActionEnum.JOIN:
-            if entry:
-                if entry.is_done is True:
-                    await callback.answer(text="You are already done. Can't join.")
-                else:
-                    await callback.answer(text="You are already in the queue.")
-                return
-
-            await service.entry.upsert(
+            mutation = await service.entry.join(
                 entry=schema.Entry(
                     occurrence_id=occurrence.id,
                     username=callback.from_user.username,
                     full_name=callback.from_user.full_name,
-                    user_id=callback.from_user.id,
+                    user_id=user_id,
                     created_at=now,
                     is_skipping=False,
                     is_done=False,
                 ),
             )
-        case callbacks.OccurrenceActionEnum.LEAVE:
-            if entry is None:
-                await callback.answer(text="You are not in the queue.")
+            if not mutation.is_changed:
+                if mutation.entry is not None and mutation.entry.is_done is True:
+                    await callback.answer(text="You are already done. Can't join.")
+                else:
+                    await callback.answer(text="You are already in the queue.")
                 return
-
-            if entry.is_done is True:
-                await callback.answer(text="You are already done. Can't leave.")
+        case callbacks.OccurrenceActionEnum.LEAVE:
+            mutation = await service.entry.leave(occurrence_id=occurrence.id, user_id=user_id)
+            if not mutation.is_changed:
+                await answer_unchanged(callback=callback, mutation=mutation, action="leave")
                 return
-
-            await service.entry.delete(
-                filter_=schema.EntryDeleteFilter(
-                    occurrence_id=occurrence.id,
-                    user_id=callback.from_user.id,
-                ),
-            )
-
         case callbacks.OccurrenceActionEnum.SKIP:
-            if entry is None:
-                await callback.answer(text="You are not in the queue.")
-                return
-
-            if entry.is_done is True:
-                await callback.answer(text="You are already done. Can't skip.")
+            mutation = await service.entry.toggle_skip(
+                occurrence_id=occurrence.id,
+                user_id=user_id,
+            )
+            if not mutation.is_changed:
+                await answer_unchanged(callback=callback, mutation=mutation, action="skip")
                 return
-
-            entry.is_skipping = not entry.is_skipping
-            await service.entry.upsert(entry=entry)
-
         case callbacks.OccurrenceActionEnum.DONE:
-            if entry is None:
+            mutation = await service.entry.toggle_done(
+                occurrence_id=occurrence.id,
+                user_id=user_id,
+            )
+            if not mutation.is_changed:
                 await callback.answer(text="You are not in the queue.")
                 return
 
-            entry.is_skipping = False
-            entry.is_done = not entry.is_done
-            await service.entry.upsert(entry=entry)
+    await callback.answer(text="Success.")
 
-    entries = await service.entry.get_many(
-        filter_=schema.EntryGetManyFilter(occurrence_id=occurrence.id),
-    )
+    # the message is rendered from the queue read once the change is visible to others
+    service.on_commit(partial(coalescer.request, occurrence=occurrence))
 
-    await bot.edit_message_text(
-        text=service.occurrence.generate_notification_message_text(
-            occurrence=occurrence,
-            entries=entries,
-        ),
-        chat_id=occurrence.event.chat.id,
-        message_id=occurrence.message_id,
-        reply_markup=build_occurrence_keyboard(occurrence_id=occurrence.id),
-    )
 
-    await callback.answer(text="Success.")
+async def answer_unchanged(
+    callback: aiogram.types.CallbackQuery,
+    mutation: schema.EntryMutation,
+    action: str,
+) -> None:
+    if mutation.entry is None:
+        await callback.answer(text="You are not in the queue.")
+    else:
+        await callback.answer(text=f"You are already done. Can't {action}.")
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+
+import aiogram
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from redis.asyncio import Redis as AsyncRedis
+
+from app import schema
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+PAUSE_KEY = "rate_limit:pause"
+STATS_KEY = "rate_limit:stats"
+GLOBAL_BUCKET_KEY = "rate_limit:global"
+CHAT_BUCKET_KEY = "rate_limit:chat:{chat_id}"
+GROUP_BUCKET_KEY = "rate_limit:group:{chat_id}"
+
+# takes a token from every bucket in KEYS[3:] if each of them has one, bucket KEYS[i] is refilled
+# with ARGV[2 * i - 5] tokens per second up to ARGV[2 * i - 4] tokens,
+# returns how many milliseconds to wait before trying again or 0 if tokens were taken
+ACQUIRE_SCRIPT = """
+local pause = redis.call("PTTL", KEYS[1])
+if pause > 0 then
+    return pause
+end
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local wait, tokens = 0, {}
+for i = 3, #KEYS do
+    local rate, burst = tonumber(ARGV[2 * i - 5]), tonumber(ARGV[2 * i - 4])
+    local bucket = redis.call("HMGET", KEYS[i], "tokens", "updated_at")
+    tokens[i] = burst
+    if bucket[1] then
+        tokens[i] = math.min(burst, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * rate)
+    end
+    if tokens[i] < 1 then
+        wait = math.max(wait, (1 - tokens[i]) / rate)
+    end
+end
+if wait > 0 then
+    return math.ceil(wait * 1000)
+end
+
+for i = 3, #KEYS do
+    local rate, burst = tonumber(ARGV[2 * i - 5]), tonumber(ARGV[2 * i - 4])
+    redis.call("HSET", KEYS[i], "tokens", tokens[i] - 1, "updated_at", now)
+    redis.call("PEXPIRE", KEYS[i], math.ceil(burst / rate * 1000))
+end
+redis.call("HINCRBY", KEYS[2], "requests", 1)
+return 0
+"""
+
+
+class RateLimiter:
+    """Token buckets in Redis shared by every process that calls Telegram Bot API.
+
+    A request to a chat takes a token from the global bucket, from the chat's bucket
+    and, if the chat is a group, from the group's bucket. Buckets are configured
+    by `config.rate_limit` after Telegram's limits.
+    """
+
+    def __init__(self, redis: AsyncRedis) -> None:
+        self._redis = redis
+
+        self._acquire_script = redis.register_script(ACQUIRE_SCRIPT)
+
+    async def acquire(self, chat_id: int | str) -> float:
+        """Wait until a request to chat with `chat_id` is allowed by every bucket.
+
+        Returns number of seconds waited.
+        """
+        keys, args = self._get_buckets(chat_id=chat_id)
+
+        start = time.monotonic()
+        delayed = False
+        while wait := await self._acquire_script(keys=[PAUSE_KEY, STATS_KEY, *keys], args=args):
+            delayed = True
+            await asyncio.sleep(wait / 1000)
+
+        if not delayed:
+            return 0.0
+
+        waited = time.monotonic() - start
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            pipeline.hincrby(STATS_KEY, "delayed", 1)
+            pipeline.hincrbyfloat(STATS_KEY, "wait_time", waited)
+            await pipeline.execute()
+
+        return waited
+
+    async def pause(self, seconds: int) -> None:
+        """Stop all requests for `seconds`, after Telegram answered with `RetryAfter`."""
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            pipeline.set(PAUSE_KEY, seconds, ex=max(seconds, 1))
+            pipeline.hincrby(STATS_KEY, "retry_after", 1)
+            await pipeline.execute()
+
+    async def get_stats(self) -> schema.RateLimitStats:
+        """Get counters shared by all processes.
+
+        Counts granted requests, requests that had to wait, total time they waited in seconds
+        and `RetryAfter` answers.
+        """
+        stats = await self._redis.hgetall(STATS_KEY)
+        return schema.RateLimitStats.model_validate(
+            {key.decode(): value.decode() for key, value in stats.items()},
+        )
+
+    @staticmethod
+    def _get_buckets(chat_id: int | str) -> tuple[list[str], list[float]]:
+        keys = [GLOBAL_BUCKET_KEY, CHAT_BUCKET_KEY.format(chat_id=chat_id)]
+        args = [
+            config.rate_limit.rate,
+            config.rate_limit.rate,
+            config.rate_limit.chat_rate,
+            config.rate_limit.chat_burst,
+        ]
+
+        # private chats have positive ids, groups and channels have negative ones
+        if isinstance(chat_id, str) or chat_id < 0:
+            keys.append(GROUP_BUCKET_KEY.format(chat_id=chat_id))
+            args.extend([config.rate_limit.group_rate, config.rate_limit.group_burst])
+
+        return keys, args
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """Wait for `RateLimiter` before every Bot API request to a chat.
+
+    Requests that don't target a chat, like `getUpdates`, are not limited.
+    Request answered with `RetryAfter` pauses requests of all processes
+    and is retried up to `config.rate_limit.max_retries` times.
+    """
+
+    def __init__(self, limiter: RateLimiter) -> None:
+        self._limiter = limiter
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: aiogram.Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        retries = 0
+        while True:
+            await self._limiter.acquire(chat_id=chat_id)
+
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                await self._limiter.pause(seconds=e.retry_after)
+                if retries == config.rate_limit.max_retries:
+                    raise
+
+                retries += 1
+                logger.warning(
+                    "flood control exceeded on %s, retrying in %d seconds.",
+                    type(method).__name__,
+                    e.retry_after,
+                )
@@ -0,0 +1,109 @@
+import aiogram
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetMe, SendMessage
+from pytest_mock import MockerFixture
+from redis.asyncio import Redis as AsyncRedis
+
+from app.config import config
+from app.limiter import PAUSE_KEY, RateLimiter, RateLimitMiddleware
+
+
+@pytest.fixture
+def limiter(mocker: MockerFixture, redis: AsyncRedis) -> RateLimiter:
+    mocker.patch.object(config.rate_limit, "rate", 100.0)
+    mocker.patch.object(config.rate_limit, "chat_rate", 10.0)
+    mocker.patch.object(config.rate_limit, "chat_burst", 3)
+    mocker.patch.object(config.rate_limit, "group_rate", 5.0)
+    mocker.patch.object(config.rate_limit, "group_burst", 2)
+
+    return RateLimiter(redis=redis)
+
+
+async def test_rate_limiter_acquire_chat_success(limiter: RateLimiter) -> None:
+    waited = [await limiter.acquire(chat_id=1) for _ in range(4)]
+
+    assert waited[:3] == [0.0, 0.0, 0.0]
+    assert 0.05 < waited[3] < 0.2
+    assert await limiter.acquire(chat_id=2) == 0.0
+
+    stats = await limiter.get_stats()
+    assert (stats.requests, stats.delayed, stats.retry_after) == (5, 1, 0)
+    assert stats.wait_time == pytest.approx(waited[3])
+
+
+async def test_rate_limiter_acquire_group_success(limiter: RateLimiter) -> None:
+    waited = [await limiter.acquire(chat_id=-1) for _ in range(3)]
+
+    assert waited[:2] == [0.0, 0.0]
+    assert 0.1 < waited[2] < 0.3
+
+
+async def test_rate_limiter_acquire_global_success(
+    mocker: MockerFixture,
+    limiter: RateLimiter,
+) -> None:
+    mocker.patch.object(config.rate_limit, "rate", 2.0)
+
+    waited = [await limiter.acquire(chat_id=chat_id) for chat_id in range(3)]
+
+    assert waited[:2] == [0.0, 0.0]
+    assert 0.3 < waited[2] < 0.7
+
+
+async def test_rate_limiter_pause_success(limiter: RateLimiter, redis: AsyncRedis) -> None:
+    await limiter.pause(seconds=1)
+    await redis.pexpire(PAUSE_KEY, 100)
+
+    assert 0.05 < await limiter.acquire(chat_id=1) < 0.2
+    assert (await limiter.get_stats()).retry_after == 1
+
+
+async def test_rate_limit_middleware_success(mocker: MockerFixture, limiter: RateLimiter) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    method = SendMessage(chat_id=1, text="text")
+    make_request = mocker.AsyncMock(
+        side_effect=[TelegramRetryAfter(method=method, message="", retry_after=1), "response"],
+    )
+    acquire = mocker.patch.object(limiter, "acquire", autospec=True)
+    pause = mocker.patch.object(limiter, "pause", autospec=True)
+
+    response = await RateLimitMiddleware(limiter=limiter)(make_request, bot, method)
+
+    assert response == "response"
+    assert acquire.await_count == 2
+    acquire.assert_awaited_with(chat_id=1)
+    pause.assert_awaited_once_with(seconds=1)
+
+
+async def test_rate_limit_middleware_retries_exceeded_failure(
+    mocker: MockerFixture,
+    limiter: RateLimiter,
+) -> None:
+    mocker.patch.object(config.rate_limit, "max_retries", 1)
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    method = SendMessage(chat_id=1, text="text")
+    make_request = mocker.AsyncMock(
+        side_effect=TelegramRetryAfter(method=method, message="", retry_after=1),
+    )
+    mocker.patch.object(limiter, "acquire", autospec=True)
+    mocker.patch.object(limiter, "pause", autospec=True)
+
+    with pytest.raises(TelegramRetryAfter):
+        await RateLimitMiddleware(limiter=limiter)(make_request, bot, method)
+
+    assert make_request.await_count == 2
+
+
+async def test_rate_limit_middleware_no_chat_success(
+    mocker: MockerFixture,
+    limiter: RateLimiter,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    make_request = mocker.AsyncMock(return_value="response")
+    acquire = mocker.patch.object(limiter, "acquire", autospec=True)
+
+    response = await RateLimitMiddleware(limiter=limiter)(make_request, bot, GetMe())
+
+    assert response == "response"
+    acquire.assert_not_awaited()
@@ -1,16 +1,20 @@
 import asyncio
+import signal
 
 import aiogram
 import aiogram.filters
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
 from app import callbacks, handlers, middlewares
+from app.coalescer import EditCoalescer
 from app.config import config
+from app.dependencies import get_bot
 
 
-async def main() -> None:
-    bot = aiogram.Bot(token=config.token)
-
+def build_dispatcher() -> aiogram.Dispatcher:
     dp = aiogram.Dispatcher()
+    dp.update.outer_middleware(middleware=middlewares.ChatOrderMiddleware())
     dp.callback_query.middleware(middleware=middlewares.ServiceMiddleware())
     dp.message.middleware(middleware=middlewares.ServiceMiddleware())
     dp.message.register(
@@ -22,7 +26,65 @@ async def main() -> None:
         callbacks.OccurrenceCallbackFactory.filter(),
     )
 
-    await dp.start_polling(bot)
+    return dp
+
+
+async def start_webhook(dp: aiogram.Dispatcher, bot: aiogram.Bot) -> web.AppRunner:
+    """Start a server that receives updates from Telegram and set bot's webhook to it.
+
+    Requests without `config.updates.webhook_secret` token are rejected. Updates are handled
+    in the background, so Telegram gets its answer right away. Any number of replicas can
+    serve the same `config.updates.webhook_url` behind a load balancer.
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=config.updates.webhook_secret,
+    ).register(app, path=config.updates.webhook_path)
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host=config.updates.host, port=config.updates.port).start()
+
+    await bot.set_webhook(
+        url=config.updates.webhook_url,
+        secret_token=config.updates.webhook_secret,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+
+    return runner
+
+
+async def run_webhook(dp: aiogram.Dispatcher, bot: aiogram.Bot) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    runner = await start_webhook(dp=dp, bot=bot)
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+
+
+async def main() -> None:
+    dp = build_dispatcher()
+
+    async with get_bot() as bot:
+        # edits requested by callbacks are sent before bot's session is closed
+        dp["coalescer"] = EditCoalescer(bot=bot)
+        dp.shutdown.register(dp["coalescer"].close)
+
+        match config.updates.mode:
+            case "polling":
+                # updates can't be polled while webhook is set
+                await bot.delete_webhook()
+                await dp.start_polling(bot)
+            case "webhook":
+                await run_webhook(dp=dp, bot=bot)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+import asyncio
+
+import aiogram
+import aiohttp
+import pytest
+from aiogram.types import Message
+from pydantic import ValidationError
+from pytest_mock import MockerFixture
+
+from app.config import UpdatesConfig, config
+from app.main import build_dispatcher, start_webhook
+
+TOKEN = "42:TOKEN"  # noqa: S105
+SECRET = "secret"  # noqa: S105
+UPDATE = {
+    "update_id": 1,
+    "message": {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}, "text": "text"},
+}
+
+
+def test_build_dispatcher_success() -> None:
+    dp = build_dispatcher()
+
+    assert sorted(dp.resolve_used_update_types()) == ["callback_query", "message"]
+
+
+@pytest.mark.parametrize(("secret", "status"), [(SECRET, 200), ("invalid secret", 401), ("", 401)])
+async def test_start_webhook_success(mocker: MockerFixture, secret: str, status: int) -> None:
+    mocker.patch.object(config.updates, "webhook_url", "https://example.com/webhook")
+    mocker.patch.object(config.updates, "webhook_secret", SECRET)
+    mocker.patch.object(config.updates, "host", "127.0.0.1")
+    mocker.patch.object(config.updates, "port", 0)
+    bot = aiogram.Bot(token=TOKEN)
+    set_webhook = mocker.patch.object(bot, "set_webhook", autospec=True)
+
+    handled = asyncio.Event()
+    dp = aiogram.Dispatcher()
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        handled.set()
+
+    runner = await start_webhook(dp=dp, bot=bot)
+    try:
+        host, port = runner.addresses[0]
+        async with (
+            aiohttp.ClientSession() as session,
+            session.post(
+                f"http://{host}:{port}{config.updates.webhook_path}",
+                json=UPDATE,
+                headers={"X-Telegram-Bot-Api-Secret-Token": secret},
+            ) as response,
+        ):
+            assert response.status == status
+
+        if status == 200:
+            await asyncio.wait_for(handled.wait(), timeout=1)
+        assert handled.is_set() is (status == 200)
+    finally:
+        await runner.cleanup()
+        await bot.session.close()
+
+    set_webhook.assert_awaited_once_with(
+        url="https://example.com/webhook",
+        secret_token=SECRET,
+        allowed_updates=["message"],
+    )
+
+
+def test_updates_config_webhook_without_secret_failure() -> None:
+    with pytest.raises(ValidationError, match="webhook_secret is required"):
+        UpdatesConfig(mode="webhook", webhook_url="https://example.com/webhook")
+
+    assert UpdatesConfig(mode="webhook", webhook_secret=SECRET).webhook_secret == SECRET
+    assert UpdatesConfig(mode="polling").webhook_secret == ""
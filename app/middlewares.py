@@ -1,9 +1,13 @@
+import asyncio
+import collections
 from collections.abc import Awaitable, Callable
 from typing import Any
 
 from aiogram import BaseMiddleware
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, Chat, Message, Update
 
+from app import schema
+from app.config import config
 from app.dependencies import get_service
 
 
@@ -18,3 +22,68 @@ class ServiceMiddleware(BaseMiddleware):
             data["service"] = service
 
             return await handler(event, data)
+
+
+class ChatOrderMiddleware(BaseMiddleware):
+    """Handle updates of a chat one by one, in the order they were received.
+
+    Updates of different chats are handled concurrently, no more than
+    `config.updates.concurrency` at a time. Updates waiting for their chat don't count
+    towards the limit, so a busy chat doesn't hold back the others.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._depths: collections.Counter[int] = collections.Counter()
+        self._semaphore = asyncio.Semaphore(config.updates.concurrency)
+        self._in_flight = 0
+        self._max_depth = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Awaitable[Any]:
+        chat: Chat | None = data.get("event_chat")
+        if chat is None:
+            return await self._handle(handler=handler, event=event, data=data)
+
+        # asyncio.Lock is fair, so updates acquire it in the order they arrived
+        lock = self._locks.setdefault(chat.id, asyncio.Lock())
+        self._depths[chat.id] += 1
+        self._max_depth = max(self._max_depth, self._depths[chat.id])
+        try:
+            async with lock:
+                return await self._handle(handler=handler, event=event, data=data)
+        finally:
+            self._depths[chat.id] -= 1
+            if not self._depths[chat.id]:
+                del self._depths[chat.id]
+                del self._locks[chat.id]
+
+    def get_stats(self) -> schema.DispatchStats:
+        """Get depth of chats' queues.
+
+        Counts chats with pending updates, pending updates, updates being handled
+        and the longest queue of a chat seen so far.
+        """
+        return schema.DispatchStats(
+            chats=len(self._depths),
+            pending=self._depths.total(),
+            in_flight=self._in_flight,
+            max_depth=self._max_depth,
+        )
+
+    async def _handle(
+        self,
+        handler: Callable[[Update, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Awaitable[Any]:
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                return await handler(event, data)
+            finally:
+                self._in_flight -= 1
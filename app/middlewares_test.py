@@ -0,0 +1,72 @@
+import asyncio
+
+import aiogram
+from aiogram.types import Message, Update
+from pytest_mock import MockerFixture
+
+from app.config import config
+from app.middlewares import ChatOrderMiddleware
+
+TOKEN = "42:TOKEN"  # noqa: S105
+
+
+def build_update(update_id: int, chat_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "group"},
+                "text": "text",
+            },
+        },
+    )
+
+
+async def feed_updates(
+    middleware: ChatOrderMiddleware,
+    updates: list[Update],
+    handled: list[tuple[int, int]],
+) -> None:
+    dp = aiogram.Dispatcher()
+    dp.update.outer_middleware(middleware=middleware)
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        handled.append((message.chat.id, message.message_id))
+        # the first chat is way slower than the others
+        await asyncio.sleep(0.05 if message.chat.id == 1 else 0.001)
+        handled.append((message.chat.id, message.message_id))
+
+    async with aiogram.Bot(token=TOKEN) as bot:
+        await asyncio.gather(*(dp.feed_update(bot=bot, update=update) for update in updates))
+
+
+async def test_chat_order_middleware_success() -> None:
+    middleware = ChatOrderMiddleware()
+    updates = [build_update(update_id=i, chat_id=i % 2 + 1) for i in range(6)]
+    handled: list[tuple[int, int]] = []
+
+    await feed_updates(middleware=middleware, updates=updates, handled=handled)
+
+    for chat_id in [1, 2]:
+        chat_handled = [message_id for id_, message_id in handled if id_ == chat_id]
+        # updates of a chat are handled one by one and in order
+        assert chat_handled == sorted(chat_handled)
+    # updates of the faster chat are handled while the slower one is busy
+    assert handled.index((2, 5)) < handled.index((1, 2))
+
+    stats = middleware.get_stats()
+    assert (stats.chats, stats.pending, stats.in_flight, stats.max_depth) == (0, 0, 0, 3)
+
+
+async def test_chat_order_middleware_concurrency_success(mocker: MockerFixture) -> None:
+    mocker.patch.object(config.updates, "concurrency", 1)
+    middleware = ChatOrderMiddleware()
+    updates = [build_update(update_id=i, chat_id=i + 1) for i in range(3)]
+    handled: list[tuple[int, int]] = []
+
+    await feed_updates(middleware=middleware, updates=updates, handled=handled)
+
+    assert handled == [(1, 0), (1, 0), (2, 1), (2, 1), (3, 2), (3, 2)]
@@ -2,7 +2,7 @@ import typing
 import uuid
 from datetime import datetime
 
-from sqlalchemy import BIGINT, JSON, ForeignKey
+from sqlalchemy import BIGINT, JSON, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from app import schema
@@ -17,21 +17,25 @@ class Chat(Base):
 
     id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
     timezone: Mapped[str]
+    catch_up_policy: Mapped[str | None]
 
-    config: Mapped[dict[str, typing.Any]] = mapped_column(JSON)
+    # only the chat itself needs the raw configuration, not its events and occurrences
+    config: Mapped[dict[str, typing.Any]] = mapped_column(JSON, deferred=True)
 
     def to_dict(self) -> dict[str, typing.Any]:
         return {
             "id": self.id,
             "timezone": self.timezone,
+            "catch_up_policy": self.catch_up_policy,
             "config": self.config,
         }
 
-    def to_schema(self) -> schema.Chat:
+    def to_schema(self, *, with_config: bool = True) -> schema.Chat:
         return schema.Chat(
             id=self.id,
             timezone=self.timezone,
-            config=self.config,
+            catch_up_policy=self.catch_up_policy,
+            config=self.config if with_config else None,
         )
 
 
@@ -39,13 +43,13 @@ class Event(Base):
     __tablename__ = "event"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
-    chat_id: Mapped[int] = mapped_column(ForeignKey("chat.id", ondelete="CASCADE"))
+    chat_id: Mapped[int] = mapped_column(ForeignKey("chat.id", ondelete="CASCADE"), index=True)
 
     name: Mapped[str]
     description: Mapped[str | None]
 
     initial_date: Mapped[datetime]
-    next_date: Mapped[datetime]
+    next_date: Mapped[datetime] = mapped_column(index=True)
 
     periodicity_years: Mapped[str | None]
     periodicity_months: Mapped[str | None]
@@ -95,7 +99,7 @@ class Event(Base):
     def to_schema(self) -> schema.Event:
         return schema.Event(
             id=self.id,
-            chat=self.chat.to_schema(),
+            chat=self.chat.to_schema(with_config=False),
             name=self.name,
             description=self.description,
             initial_date=self.initial_date,
@@ -126,7 +130,10 @@ class Occurrence(Base):
     __tablename__ = "occurrence"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
-    event_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("event.id", ondelete="CASCADE"))
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("event.id", ondelete="CASCADE"),
+        index=True,
+    )
     message_id: Mapped[int] = mapped_column(BIGINT)
     created_at: Mapped[datetime]
 
@@ -151,6 +158,10 @@ class Occurrence(Base):
 
 class Entry(Base):
     __tablename__ = "entry"
+    # also serves lookups of entries by occurrence and cascading deletes of occurrences
+    __table_args__ = (
+        UniqueConstraint("occurrence_id", "user_id", name="uq_entry_occurrence_id_user_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
     occurrence_id: Mapped[uuid.UUID] = mapped_column(
@@ -187,3 +198,40 @@ class Entry(Base):
             is_skipping=self.is_skipping,
             is_done=self.is_done,
         )
+
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    type: Mapped[str]
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("event.id", ondelete="CASCADE"),
+        index=True,
+    )
+    occurrence_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("occurrence.id", ondelete="CASCADE"),
+        index=True,
+    )
+    times_occurred: Mapped[int | None]
+    eta: Mapped[datetime] = mapped_column(index=True)
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "event_id": self.event_id,
+            "occurrence_id": self.occurrence_id,
+            "times_occurred": self.times_occurred,
+            "eta": self.eta,
+        }
+
+    def to_schema(self) -> schema.Job:
+        return schema.Job(
+            id=self.id,
+            type=schema.JobTypeEnum(self.type),
+            event_id=self.event_id,
+            occurrence_id=self.occurrence_id,
+            times_occurred=self.times_occurred,
+            eta=self.eta,
+        )
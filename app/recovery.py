@@ -0,0 +1,46 @@
+import asyncio
+import logging
+
+from app import schema
+from app.config import config
+from app.dependencies import get_service
+from app.service import Service
+
+logger = logging.getLogger(__name__)
+
+
+async def recover(service: Service) -> int:
+    """Sweep all events in batches of `config.recovery.batch_size` and reschedule lost ones.
+
+    Events are paged by `next_date` and `id`, so every batch is a range scan of the index.
+    Every batch is committed on its own, so that rows aren't locked for the whole sweep.
+
+    Returns number of rescheduled events.
+    """
+    count = 0
+    filter_ = schema.EventGetManyFilter()
+
+    while events := await service.event.get_many(
+        filter_=filter_,
+        limit=config.recovery.batch_size,
+    ):
+        filter_ = schema.EventGetManyFilter(after=(events[-1].next_date, events[-1].id))
+        count += await service.recover_events(events=events)
+        await service.commit()
+
+    return count
+
+
+async def main() -> None:
+    while True:
+        async with get_service() as service:
+            count = await recover(service=service)
+        logger.info("rescheduled %d events.", count)
+
+        if not config.recovery.interval:
+            return
+        await asyncio.sleep(config.recovery.interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
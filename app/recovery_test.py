@@ -0,0 +1,46 @@
+from unittest.mock import call
+
+from pytest_mock import MockerFixture
+
+from app import schema
+from app.config import config
+from app.recovery import recover
+from app.service import Service
+from app.util import RelativeDelta
+
+
+async def test_recover_success(
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+) -> None:
+    events = [
+        event.model_copy(update={"next_date": event.next_date + RelativeDelta(days=i)})
+        for i in range(3)
+    ]
+
+    mocker.patch.object(config.recovery, "batch_size", 2)
+    mocker.patch.object(
+        service.event,
+        "get_many",
+        side_effect=[events[:2], events[2:], []],
+        autospec=True,
+    )
+    mocker.patch.object(service, "recover_events", side_effect=[1, 0], autospec=True)
+
+    assert await recover(service=service) == 1
+
+    service.event.get_many.assert_has_awaits(
+        [
+            call(filter_=schema.EventGetManyFilter(), limit=2),
+            call(
+                filter_=schema.EventGetManyFilter(after=(events[1].next_date, events[1].id)),
+                limit=2,
+            ),
+            call(
+                filter_=schema.EventGetManyFilter(after=(events[2].next_date, events[2].id)),
+                limit=2,
+            ),
+        ],
+    )
+    service.recover_events.assert_has_awaits([call(events=events[:2]), call(events=events[2:])])
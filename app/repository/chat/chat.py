@@ -1,6 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from app import models, schema
 
@@ -17,10 +18,9 @@ class ChatRepository:
                 set_=dict(stmt.excluded),
             ),
         )
-        await self._session.commit()
 
     async def get(self, filter_: schema.ChatGetFilter) -> schema.Chat | None:
-        stmt = select(models.Chat)
+        stmt = select(models.Chat).options(undefer(models.Chat.config))
 
         if id_ := filter_.get("id"):
             stmt = stmt.where(models.Chat.id == id_)
@@ -33,5 +33,6 @@ class ChatRepository:
         return models.Chat(
             id=chat.id,
             timezone=chat.timezone,
+            catch_up_policy=chat.catch_up_policy.value if chat.catch_up_policy else None,
             config=chat.config,
         )
@@ -39,6 +39,7 @@ async def test_chat_repository_upsert_update_success(
     ).scalar_one_or_none() is not None
 
     chat.timezone = "Etc/UTC"
+    chat.catch_up_policy = schema.CatchUpPolicyEnum.ALL
 
     await repository.chat.upsert(chat=chat)
 
@@ -47,9 +48,11 @@ async def test_chat_repository_upsert_update_success(
             select(models.Chat).where(
                 models.Chat.id == chat.id,
                 models.Chat.timezone == chat.timezone,
+                models.Chat.catch_up_policy == chat.catch_up_policy.value,
             ),
         )
     ).scalar_one_or_none() is not None
+    assert await repository.chat.get(filter_=schema.ChatGetFilter(id=chat.id)) == chat
 
 
 async def test_chat_repository_get_by_id_success(
@@ -61,3 +64,19 @@ async def test_chat_repository_get_by_id_success(
     new_chat = await repository.chat.get(filter_=schema.ChatGetFilter(id=chat.id))
 
     assert chat == new_chat
+
+
+async def test_chat_repository_get_by_id_after_event_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+
+    new_event = await repository.event.get(filter_=schema.EventGetFilter(id=event.id))
+    new_chat = await repository.chat.get(filter_=schema.ChatGetFilter(id=chat.id))
+
+    assert new_event is not None
+    assert new_event.chat.config is None
+    assert new_chat == chat
@@ -1,10 +1,81 @@
-from sqlalchemy import delete, select
-from sqlalchemy.dialects.postgresql import insert
+import typing
+import uuid
+
+from sqlalchemy import (
+    ColumnElement,
+    Delete,
+    Select,
+    Update,
+    and_,
+    bindparam,
+    delete,
+    false,
+    not_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schema
 
 
+def select_users_entry(stmt: Insert | Update | Delete) -> Select:
+    """Select user's entry of `queue_occurrence_id` occurrence in the statement that runs `stmt`.
+
+    The entry is read from the snapshot taken before `stmt`, so if `stmt` changed it,
+    the changed version is selected instead and marked by `is_changed` column.
+    """
+    table = models.Entry.__table__
+    changed = stmt.returning(*table.columns).cte("changed")
+    entry = union_all(
+        select(*table.columns, false().label("is_changed")).where(
+            table.columns.occurrence_id == bindparam("queue_occurrence_id"),
+            table.columns.user_id == bindparam("queue_user_id"),
+            table.columns.id.not_in(select(changed.columns.id)),
+        ),
+        select(*changed.columns, true().label("is_changed")),
+    ).subquery("entry")
+
+    return select(entry)
+
+
+def is_users_entry() -> ColumnElement[bool]:
+    # parameters named after columns would be used as values of the columns by `update`
+    return and_(
+        models.Entry.occurrence_id == bindparam("queue_occurrence_id"),
+        models.Entry.user_id == bindparam("queue_user_id"),
+    )
+
+
+# statements are built once, building them takes longer than running them
+JOIN_STMT = select_users_entry(
+    insert(models.Entry)
+    .values(
+        {
+            column.name: bindparam(column.name, type_=column.type)
+            for column in models.Entry.__table__.columns
+        },
+    )
+    .on_conflict_do_nothing(index_elements=["occurrence_id", "user_id"]),
+)
+LEAVE_STMT = select_users_entry(
+    delete(models.Entry).where(is_users_entry(), not_(models.Entry.is_done)),
+)
+TOGGLE_SKIP_STMT = select_users_entry(
+    update(models.Entry)
+    .where(is_users_entry(), not_(models.Entry.is_done))
+    .values(is_skipping=not_(models.Entry.is_skipping)),
+)
+TOGGLE_DONE_STMT = select_users_entry(
+    update(models.Entry)
+    .where(is_users_entry())
+    .values(is_skipping=false(), is_done=not_(models.Entry.is_done)),
+)
+
+
 class EntryRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
@@ -17,7 +88,6 @@ class EntryRepository:
                 set_=dict(stmt.excluded),
             ),
         )
-        await self._session.commit()
 
     async def get(self, filter_: schema.EntryGetFilter) -> schema.Entry | None:
         stmt = select(models.Entry)
@@ -50,7 +120,54 @@ class EntryRepository:
             stmt = stmt.where(models.Entry.user_id == user_id)
 
         await self._session.execute(stmt)
-        await self._session.commit()
+
+    async def join(self, entry: schema.Entry) -> schema.EntryMutation:
+        """Add `entry` to the queue unless its user is already in it."""
+        return await self._mutate(
+            stmt=JOIN_STMT,
+            occurrence_id=entry.occurrence_id,
+            user_id=entry.user_id,
+            params=self._map_entry_schema_to_model(entry=entry).to_dict(),
+        )
+
+    async def leave(self, occurrence_id: uuid.UUID, user_id: int) -> schema.EntryMutation:
+        """Remove user's entry from the queue unless the user is done."""
+        return await self._mutate(
+            stmt=LEAVE_STMT,
+            occurrence_id=occurrence_id,
+            user_id=user_id,
+        )
+
+    async def toggle_skip(self, occurrence_id: uuid.UUID, user_id: int) -> schema.EntryMutation:
+        """Toggle whether the user is skipping unless the user is done."""
+        return await self._mutate(
+            stmt=TOGGLE_SKIP_STMT,
+            occurrence_id=occurrence_id,
+            user_id=user_id,
+        )
+
+    async def toggle_done(self, occurrence_id: uuid.UUID, user_id: int) -> schema.EntryMutation:
+        """Toggle whether the user is done, user that is done isn't skipping."""
+        return await self._mutate(
+            stmt=TOGGLE_DONE_STMT,
+            occurrence_id=occurrence_id,
+            user_id=user_id,
+        )
+
+    async def _mutate(
+        self,
+        stmt: Select,
+        occurrence_id: uuid.UUID,
+        user_id: int,
+        params: dict[str, typing.Any] | None = None,
+    ) -> schema.EntryMutation:
+        params = {"queue_occurrence_id": occurrence_id, "queue_user_id": user_id, **(params or {})}
+        row = (await self._session.execute(stmt, params)).one_or_none()
+
+        return schema.EntryMutation(
+            entry=schema.Entry.model_validate(row._mapping) if row else None,
+            is_changed=row.is_changed if row else False,
+        )
 
     @staticmethod
     def _map_entry_schema_to_model(entry: schema.Entry) -> models.Entry:
@@ -111,7 +111,7 @@ async def test_entry_repository_get_many_success(
         occurrence_id=occurrence.id,
         username=None,
         full_name="Me",
-        user_id=5,
+        user_id=6,
         created_at=now,
         is_skipping=False,
         is_done=False,
@@ -193,3 +193,139 @@ async def test_entry_repository_delete_success(
     )
 
     assert len((await db_session.execute(select(models.Entry))).scalars().all()) == 0
+
+
+async def test_entry_repository_join_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    other_entry = entry.model_copy(
+        update={"id": uuid.uuid4(), "user_id": 2, "created_at": entry.created_at},
+    )
+    entry.created_at -= RelativeDelta(minutes=1)
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+    await repository.entry.upsert(entry=entry)
+
+    mutation = await repository.entry.join(entry=other_entry)
+
+    assert mutation == schema.EntryMutation(entry=other_entry, is_changed=True)
+
+    mutation = await repository.entry.join(
+        entry=other_entry.model_copy(update={"id": uuid.uuid4()}),
+    )
+
+    assert mutation == schema.EntryMutation(entry=other_entry, is_changed=False)
+
+
+async def test_entry_repository_leave_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    entry.is_done = False
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+    await repository.entry.upsert(entry=entry)
+
+    mutation = await repository.entry.leave(occurrence_id=occurrence.id, user_id=entry.user_id)
+
+    assert mutation == schema.EntryMutation(entry=entry, is_changed=True)
+
+    mutation = await repository.entry.leave(occurrence_id=occurrence.id, user_id=entry.user_id)
+
+    assert mutation == schema.EntryMutation(entry=None, is_changed=False)
+
+
+async def test_entry_repository_leave_done_failure(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    entry.is_done = True
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+    await repository.entry.upsert(entry=entry)
+
+    mutation = await repository.entry.leave(occurrence_id=occurrence.id, user_id=entry.user_id)
+
+    assert mutation == schema.EntryMutation(entry=entry, is_changed=False)
+
+
+async def test_entry_repository_toggle_skip_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    entry.is_done = False
+    entry.is_skipping = False
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+    await repository.entry.upsert(entry=entry)
+
+    mutation = await repository.entry.toggle_skip(
+        occurrence_id=occurrence.id,
+        user_id=entry.user_id,
+    )
+
+    skipping = entry.model_copy(update={"is_skipping": True})
+    assert mutation == schema.EntryMutation(entry=skipping, is_changed=True)
+    assert (
+        await repository.entry.get(
+            filter_=schema.EntryGetFilter(occurrence_id=occurrence.id, user_id=entry.user_id),
+        )
+        == skipping
+    )
+
+    mutation = await repository.entry.toggle_skip(occurrence_id=occurrence.id, user_id=2)
+
+    assert mutation == schema.EntryMutation(entry=None, is_changed=False)
+
+
+async def test_entry_repository_toggle_done_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    entry.is_done = False
+    entry.is_skipping = True
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+    await repository.entry.upsert(entry=entry)
+
+    mutation = await repository.entry.toggle_done(
+        occurrence_id=occurrence.id,
+        user_id=entry.user_id,
+    )
+
+    done = entry.model_copy(update={"is_skipping": False, "is_done": True})
+    assert mutation == schema.EntryMutation(entry=done, is_changed=True)
+
+    # done user can't skip
+    mutation = await repository.entry.toggle_skip(
+        occurrence_id=occurrence.id,
+        user_id=entry.user_id,
+    )
+
+    assert mutation == schema.EntryMutation(entry=done, is_changed=False)
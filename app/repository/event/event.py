@@ -1,6 +1,9 @@
-from sqlalchemy import delete, select
+import uuid
+
+from sqlalchemy import delete, select, tuple_
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app import models, schema
 
@@ -17,7 +20,23 @@ class EventRepository:
                 set_=dict(stmt.excluded),
             ),
         )
-        await self._session.commit()
+
+    async def upsert_many(self, events: list[schema.Event]) -> None:
+        """Upsert all events at once.
+
+        With `RETURNING` SQLAlchemy sends rows as multi-row inserts, a page of rows per statement.
+        """
+        if not events:
+            return
+
+        stmt = insert(models.Event)
+        await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_=dict(stmt.excluded),
+            ).returning(models.Event.id),
+            [self._map_event_schema_to_model(event=event).to_dict() for event in events],
+        )
 
     async def get(self, filter_: schema.EventGetFilter) -> schema.Event | None:
         stmt = select(models.Event)
@@ -28,14 +47,57 @@ class EventRepository:
         event = (await self._session.execute(stmt)).scalar_one_or_none()
         return event.to_schema() if event else None
 
-    async def delete(self, filter_: schema.EventDeleteFilter) -> None:
+    async def get_many(
+        self,
+        filter_: schema.EventGetManyFilter,
+        limit: int | None = None,
+    ) -> list[schema.Event]:
+        """Get events ordered by `next_date` and `id`.
+
+        `after` filter takes `next_date` and `id` of the last event of the previous page.
+        """
+        # chat is loaded by a separate query, so that its config isn't decoded for every event
+        stmt = select(models.Event).options(selectinload(models.Event.chat))
+
+        if chat_id := filter_.get("chat_id"):
+            stmt = stmt.where(models.Event.chat_id == chat_id)
+        if after := filter_.get("after"):
+            next_date, id_ = after
+            stmt = stmt.where(
+                tuple_(models.Event.next_date, models.Event.id)
+                > tuple_(next_date.replace(tzinfo=None), id_),
+            )
+
+        stmt = stmt.order_by(models.Event.next_date.asc(), models.Event.id.asc()).limit(limit)
+
+        events = (await self._session.execute(stmt)).scalars().all()
+        return [event.to_schema() for event in events]
+
+    async def lock(self, filter_: schema.EventLockFilter) -> bool:
+        """Lock the event until the transaction ends.
+
+        Returns whether the event exists. A transaction that waited for the lock
+        matches `times_occurred` against the event committed by the one that held it.
+        """
+        stmt = select(models.Event.id).with_for_update()
+
+        if id_ := filter_.get("id"):
+            stmt = stmt.where(models.Event.id == id_)
+        if (times_occurred := filter_.get("times_occurred")) is not None:
+            stmt = stmt.where(models.Event.times_occurred == times_occurred)
+
+        return (await self._session.execute(stmt)).scalar_one_or_none() is not None
+
+    async def delete(self, filter_: schema.EventDeleteFilter) -> list[uuid.UUID]:
         stmt = delete(models.Event)
 
         if chat_id := filter_.get("chat_id"):
             stmt = stmt.where(models.Event.chat_id == chat_id)
+        if (ids := filter_.get("ids")) is not None:
+            stmt = stmt.where(models.Event.id.in_(ids))
 
-        await self._session.execute(stmt)
-        await self._session.commit()
+        ids = (await self._session.execute(stmt.returning(models.Event.id))).scalars().all()
+        return list(ids)
 
     @staticmethod
     def _map_event_schema_to_model(event: schema.Event) -> models.Event:
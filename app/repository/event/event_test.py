@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schema
 from app.repository import Repository
+from app.util import RelativeDelta
 
 
 async def test_event_repository_upsert_insert_success(
@@ -145,12 +146,31 @@ async def test_event_repository_get_success(
 ) -> None:
     await repository.chat.upsert(chat=chat)
     await repository.event.upsert(event=event)
+    # chats of events are read without their configuration
+    chat.config = None
 
     new_event = await repository.event.get(filter_=schema.EventGetFilter(id=event.id))
 
     assert event == new_event
 
 
+async def test_event_repository_lock_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+
+    assert await repository.event.lock(
+        filter_=schema.EventLockFilter(id=event.id, times_occurred=event.times_occurred),
+    )
+    assert not await repository.event.lock(
+        filter_=schema.EventLockFilter(id=event.id, times_occurred=event.times_occurred + 1),
+    )
+    assert not await repository.event.lock(filter_=schema.EventLockFilter(id=uuid.uuid4()))
+
+
 async def test_event_repository_delete_by_chat_id_success(
     db_session: AsyncSession,
     repository: Repository,
@@ -159,7 +179,8 @@ async def test_event_repository_delete_by_chat_id_success(
 ) -> None:
     await repository.chat.upsert(chat=chat)
     await repository.event.upsert(event=event)
-    await repository.event.upsert(event=event.model_copy(update={"id": uuid.uuid4()}, deep=True))
+    other_event = event.model_copy(update={"id": uuid.uuid4()}, deep=True)
+    await repository.event.upsert(event=other_event)
 
     assert (
         len(
@@ -170,7 +191,9 @@ async def test_event_repository_delete_by_chat_id_success(
         == 2
     )
 
-    await repository.event.delete(filter_=schema.EventDeleteFilter(chat_id=chat.id))
+    ids = await repository.event.delete(filter_=schema.EventDeleteFilter(chat_id=chat.id))
+
+    assert sorted(ids) == sorted([event.id, other_event.id])
 
     assert (
         len(
@@ -180,3 +203,113 @@ async def test_event_repository_delete_by_chat_id_success(
         )
         == 0
     )
+
+
+async def test_event_repository_get_many_by_chat_id_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    other_chat = chat.model_copy(update={"id": chat.id + 1}, deep=True)
+    other_event = event.model_copy(update={"id": uuid.uuid4(), "chat": other_chat}, deep=True)
+
+    await repository.chat.upsert(chat=chat)
+    await repository.chat.upsert(chat=other_chat)
+    await repository.event.upsert(event=event)
+    await repository.event.upsert(event=other_event)
+    # chats of events are read without their configuration
+    chat.config = None
+
+    assert await repository.event.get_many(
+        filter_=schema.EventGetManyFilter(chat_id=chat.id),
+    ) == [event]
+
+
+async def test_event_repository_delete_by_ids_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    other_event = event.model_copy(update={"id": uuid.uuid4()}, deep=True)
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.event.upsert(event=other_event)
+
+    assert await repository.event.delete(
+        filter_=schema.EventDeleteFilter(ids=[other_event.id]),
+    ) == [other_event.id]
+    # chats of events are read without their configuration
+    chat.config = None
+
+    assert await repository.event.get_many(
+        filter_=schema.EventGetManyFilter(chat_id=chat.id),
+    ) == [event]
+
+
+async def test_event_repository_delete_by_empty_ids_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+
+    assert await repository.event.delete(filter_=schema.EventDeleteFilter(ids=[])) == []
+
+    assert await repository.event.get(filter_=schema.EventGetFilter(id=event.id)) is not None
+
+
+async def test_event_repository_upsert_many_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    # chats of events are read without their configuration
+    chat.config = None
+
+    events = [
+        event.model_copy(update={"id": uuid.uuid4(), "times_occurred": i}, deep=True)
+        for i in range(3)
+    ]
+
+    await repository.event.upsert_many(events=events[:2])
+    await repository.event.upsert_many(
+        events=[events[0].model_copy(update={"name": "New Event Name"}), events[2]],
+    )
+
+    assert sorted(
+        await repository.event.get_many(filter_=schema.EventGetManyFilter(chat_id=chat.id)),
+        key=lambda event: event.times_occurred,
+    ) == [events[0].model_copy(update={"name": "New Event Name"}), events[1], events[2]]
+
+
+async def test_event_repository_get_many_after_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    # chats of events are read without their configuration
+    chat.config = None
+
+    events = sorted(
+        [
+            event.model_copy(
+                update={"id": uuid.uuid4(), "next_date": event.next_date + RelativeDelta(days=i)},
+                deep=True,
+            )
+            for i in [0, 0, 1, 2]
+        ],
+        key=lambda event: (event.next_date, event.id),
+    )
+
+    await repository.event.upsert_many(events=events[::-1])
+
+    pages, filter_ = [], schema.EventGetManyFilter()
+    while page := await repository.event.get_many(filter_=filter_, limit=3):
+        pages.append(page)
+        filter_ = schema.EventGetManyFilter(after=(page[-1].next_date, page[-1].id))
+
+    assert pages == [events[:3], events[3:]]
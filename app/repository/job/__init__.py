@@ -0,0 +1,5 @@
+from .job import JobRepository
+
+__all__ = [
+    "JobRepository",
+]
@@ -0,0 +1,80 @@
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schema
+
+
+class JobRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def upsert(self, job: schema.Job) -> None:
+        stmt = insert(models.Job).values(self._map_job_schema_to_model(job=job).to_dict())
+        await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_=dict(stmt.excluded),
+            ),
+        )
+
+    async def upsert_many(self, jobs: list[schema.Job]) -> None:
+        """Upsert all jobs at once.
+
+        With `RETURNING` SQLAlchemy sends rows as multi-row inserts, a page of rows per statement.
+        """
+        if not jobs:
+            return
+
+        stmt = insert(models.Job)
+        await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_=dict(stmt.excluded),
+            ).returning(models.Job.id),
+            [self._map_job_schema_to_model(job=job).to_dict() for job in jobs],
+        )
+
+    async def claim(self, filter_: schema.JobClaimFilter, limit: int) -> list[schema.Job]:
+        """Delete and return jobs that are due, skipping the ones locked by other transactions.
+
+        Jobs are locked until the transaction ends, so it should be committed
+        before they are run rather than hold the locks while they run.
+        """
+        due = select(models.Job.id)
+
+        if eta := filter_.get("eta"):
+            due = due.where(models.Job.eta <= eta.replace(tzinfo=None))
+
+        due = due.order_by(models.Job.eta.asc()).limit(limit).with_for_update(skip_locked=True)
+        stmt = delete(models.Job).where(models.Job.id.in_(due)).returning(models.Job)
+
+        jobs = (await self._session.execute(stmt)).scalars().all()
+        return sorted((job.to_schema() for job in jobs), key=lambda job: job.eta)
+
+    async def exists(self, filter_: schema.JobExistsFilter) -> bool:
+        stmt = exists(models.Job)
+
+        if eta := filter_.get("eta"):
+            stmt = stmt.where(models.Job.eta <= eta.replace(tzinfo=None))
+
+        return bool((await self._session.execute(select(stmt))).scalar())
+
+    async def delete(self, filter_: schema.JobDeleteFilter) -> None:
+        stmt = delete(models.Job)
+
+        if (ids := filter_.get("ids")) is not None:
+            stmt = stmt.where(models.Job.id.in_(ids))
+
+        await self._session.execute(stmt)
+
+    @staticmethod
+    def _map_job_schema_to_model(job: schema.Job) -> models.Job:
+        return models.Job(
+            id=job.id,
+            type=job.type.value,
+            event_id=job.event_id,
+            occurrence_id=job.occurrence_id,
+            times_occurred=job.times_occurred,
+            eta=job.eta.replace(tzinfo=None),
+        )
@@ -0,0 +1,158 @@
+import uuid
+from datetime import datetime
+
+import pytz
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schema
+from app.repository import Repository
+from app.util import RelativeDelta
+
+
+async def test_job_repository_upsert_insert_success(
+    db_session: AsyncSession,
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    job: schema.Job,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+
+    await repository.job.upsert(job=job)
+
+    assert (
+        await db_session.execute(
+            select(models.Job).where(
+                models.Job.id == job.id,
+                models.Job.type == job.type.value,
+                models.Job.event_id == job.event_id,
+                models.Job.occurrence_id.is_(None),
+                models.Job.eta == job.eta.replace(tzinfo=None),
+            ),
+        )
+    ).scalar_one_or_none() is not None
+
+
+async def test_job_repository_claim_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+
+    late_job = schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        eta=now - RelativeDelta(minutes=1),
+    )
+    early_job = schema.Job(
+        type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        occurrence_id=occurrence.id,
+        eta=now - RelativeDelta(minutes=10),
+    )
+    future_job = schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        eta=now + RelativeDelta(minutes=1),
+    )
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+
+    for job in [late_job, early_job, future_job]:
+        await repository.job.upsert(job=job)
+
+    jobs = await repository.job.claim(filter_=schema.JobClaimFilter(eta=now), limit=1)
+    assert jobs == [early_job]
+
+    jobs = await repository.job.claim(filter_=schema.JobClaimFilter(eta=now), limit=10)
+    assert jobs == [late_job]
+
+    jobs = await repository.job.claim(filter_=schema.JobClaimFilter(eta=now), limit=10)
+    assert jobs == []
+
+
+async def test_job_repository_delete_success(
+    db_session: AsyncSession,
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    job: schema.Job,
+) -> None:
+    other_job = job.model_copy(update={"id": uuid.uuid4()})
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.job.upsert(job=job)
+    await repository.job.upsert(job=other_job)
+
+    await repository.job.delete(filter_=schema.JobDeleteFilter(ids=[job.id]))
+
+    assert (await db_session.execute(select(models.Job.id))).scalars().all() == [other_job.id]
+
+
+async def test_job_repository_delete_on_event_delete_success(
+    db_session: AsyncSession,
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    job: schema.Job,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.job.upsert(job=job)
+
+    await repository.event.delete(filter_=schema.EventDeleteFilter(chat_id=chat.id))
+
+    assert (await db_session.execute(select(models.Job))).scalars().all() == []
+
+
+async def test_job_repository_upsert_many_success(
+    db_session: AsyncSession,
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    job: schema.Job,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+
+    jobs = [job.model_copy(update={"id": uuid.uuid4()}) for _ in range(3)]
+
+    await repository.job.upsert_many(jobs=jobs)
+
+    assert sorted(
+        (await db_session.execute(select(models.Job.id).where(models.Job.event_id == event.id)))
+        .scalars()
+        .all(),
+    ) == sorted(job.id for job in jobs)
+
+
+async def test_job_repository_exists_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+    job = schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        eta=now,
+    )
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+
+    assert not await repository.job.exists(filter_=schema.JobExistsFilter(eta=now))
+
+    await repository.job.upsert(job=job)
+
+    assert await repository.job.exists(filter_=schema.JobExistsFilter(eta=now))
+    assert not await repository.job.exists(
+        filter_=schema.JobExistsFilter(eta=now - RelativeDelta(seconds=1)),
+    )
@@ -1,5 +1,8 @@
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert
+import typing
+from datetime import datetime
+
+from sqlalchemy import JSON, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schema
@@ -19,7 +22,6 @@ class OccurrenceRepository:
                 set_=dict(stmt.excluded),
             ),
         )
-        await self._session.commit()
 
     async def get(self, filter_: schema.OccurrenceGetFilter) -> schema.Occurrence | None:
         stmt = select(models.Occurrence)
@@ -30,6 +32,46 @@ class OccurrenceRepository:
         occurrence = (await self._session.execute(stmt)).scalar_one_or_none()
         return occurrence.to_schema() if occurrence else None
 
+    async def get_snapshot(
+        self,
+        filter_: schema.OccurrenceGetFilter,
+    ) -> schema.OccurrenceSnapshot | None:
+        """Get occurrence with its entries ordered by `created_at` in one statement.
+
+        Entries are aggregated into a JSON array, so that they don't multiply occurrence's rows.
+        """
+        entry = models.Entry.__table__
+        entries = (
+            select(
+                func.json_agg(
+                    aggregate_order_by(entry.table_valued(), entry.c.created_at.asc()),
+                    type_=JSON,
+                ),
+            )
+            .where(entry.c.occurrence_id == models.Occurrence.id)
+            .scalar_subquery()
+        )
+        stmt = select(models.Occurrence, entries)
+
+        if id_ := filter_.get("id"):
+            stmt = stmt.where(models.Occurrence.id == id_)
+
+        row = (await self._session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+
+        occurrence, entry_rows = row
+        return schema.OccurrenceSnapshot(
+            occurrence=occurrence.to_schema(),
+            entries=[self._map_entry_row_to_schema(row=row) for row in entry_rows or []],
+        )
+
+    @staticmethod
+    def _map_entry_row_to_schema(row: dict[str, typing.Any]) -> schema.Entry:
+        return schema.Entry.model_validate(
+            {**row, "created_at": datetime.fromisoformat(row["created_at"])},
+        )
+
     @staticmethod
     def _map_occurrence_schema_to_model(occurrence: schema.Occurrence) -> models.Occurrence:
         return models.Occurrence(
@@ -1,8 +1,11 @@
+import uuid
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schema
 from app.repository import Repository
+from app.util import RelativeDelta
 
 
 async def test_occurrence_repository_upsert_insert_success(
@@ -78,9 +81,68 @@ async def test_occurrence_repository_get_success(
     await repository.event.upsert(event=event)
 
     await repository.occurrence.upsert(occurrence=occurrence)
+    # chats of occurrences are read without their configuration
+    chat.config = None
 
     new_occurrence = await repository.occurrence.get(
         filter_=schema.OccurrenceGetFilter(id=occurrence.id),
     )
 
     assert new_occurrence == occurrence
+
+
+async def test_occurrence_repository_get_snapshot_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    other_occurrence = occurrence.model_copy(update={"id": uuid.uuid4()})
+    entries = [
+        entry.model_copy(
+            update={
+                "id": uuid.uuid4(),
+                "user_id": i,
+                "username": None if i % 2 else entry.username,
+                "created_at": entry.created_at + RelativeDelta(seconds=i),
+                "is_done": i == 1,
+            },
+        )
+        for i in range(1, 4)
+    ]
+
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+    await repository.occurrence.upsert(occurrence=other_occurrence)
+    for entry_ in [*entries[::-1], entry.model_copy(update={"occurrence_id": other_occurrence.id})]:
+        await repository.entry.join(entry=entry_)
+    # chats of occurrences are read without their configuration
+    chat.config = None
+
+    assert await repository.occurrence.get_snapshot(
+        filter_=schema.OccurrenceGetFilter(id=occurrence.id),
+    ) == schema.OccurrenceSnapshot(occurrence=occurrence, entries=entries)
+
+
+async def test_occurrence_repository_get_snapshot_empty_success(
+    repository: Repository,
+    chat: schema.Chat,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+) -> None:
+    await repository.chat.upsert(chat=chat)
+    await repository.event.upsert(event=event)
+    await repository.occurrence.upsert(occurrence=occurrence)
+    chat.config = None
+
+    assert await repository.occurrence.get_snapshot(
+        filter_=schema.OccurrenceGetFilter(id=occurrence.id),
+    ) == schema.OccurrenceSnapshot(occurrence=occurrence, entries=[])
+    assert (
+        await repository.occurrence.get_snapshot(
+            filter_=schema.OccurrenceGetFilter(id=uuid.uuid4()),
+        )
+        is None
+    )
@@ -1,16 +1,66 @@
+import logging
+import typing
+from contextlib import asynccontextmanager
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repository.chat import ChatRepository
 from app.repository.entry import EntryRepository
 from app.repository.event import EventRepository
+from app.repository.job import JobRepository
 from app.repository.occurrence import OccurrenceRepository
 
+logger = logging.getLogger(__name__)
+
 
 class Repository:
+    """Unit of work over a session shared by all repositories.
+
+    Repositories never commit, everything they do is committed at once by `commit`,
+    which is called by whoever opened the session, see `app.dependencies.get_repository`.
+    """
+
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
+        self._on_commit: list[typing.Callable[[], typing.Awaitable[None]]] = []
 
         self.chat = ChatRepository(session=session)
         self.event = EventRepository(session=session)
         self.occurrence = OccurrenceRepository(session=session)
         self.entry = EntryRepository(session=session)
+        self.job = JobRepository(session=session)
+
+    def on_commit(self, callback: typing.Callable[[], typing.Awaitable[None]]) -> None:
+        """Call `callback` once the changes made so far are committed.
+
+        Side effects that others can observe, like published jobs or invalidated caches,
+        must not get ahead of the changes they depend on.
+        """
+        self._on_commit.append(callback)
+
+    async def commit(self) -> None:
+        """Commit changes made so far and run their `on_commit` callbacks.
+
+        Changes can't be taken back once committed, so a failed callback is logged
+        and doesn't stop the rest of them.
+        """
+        await self._session.commit()
+
+        callbacks, self._on_commit = self._on_commit, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception:
+                logger.exception("failed to run callback: %r after commit.", callback)
+
+    @asynccontextmanager
+    async def savepoint(self) -> typing.AsyncGenerator[None, None]:
+        """Roll back changes made inside if it raises, together with their `on_commit` callbacks."""
+        count = len(self._on_commit)
+
+        try:
+            async with self._session.begin_nested():
+                yield
+        except Exception:
+            del self._on_commit[count:]
+            raise
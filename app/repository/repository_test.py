@@ -1,6 +1,268 @@
-from sqlalchemy import select, text
+import typing
+import uuid
+from datetime import datetime
+
+import pytest
+import pytz
+from sqlalchemy import Select, event, insert, select, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import models, schema
+from app.repository import Repository
+from app.util import RelativeDelta
+
+CHATS = 5
+EVENTS = 4
+USERS = 10
+
 
 async def test_database(db_session: AsyncSession) -> None:
     await db_session.execute(select(text("1")))
+
+
+async def seed(repository: Repository, db_session: AsyncSession) -> schema.Occurrence:
+    """Fill the tables with a few chats, each with events, occurrences, entries and jobs."""
+    now = datetime.now(tz=pytz.utc)
+    occurrences = []
+
+    for chat_id in range(1, CHATS + 1):
+        chat = schema.Chat(id=chat_id, timezone="Etc/UTC", config={"events": []})
+        events = [
+            schema.Event(
+                chat=chat,
+                name="Event",
+                initial_date=now,
+                next_date=now + RelativeDelta(days=i),
+                periodicity=schema.Period(days="1"),
+            )
+            for i in range(EVENTS)
+        ]
+        await repository.chat.upsert(chat=chat)
+        await repository.event.upsert_many(events=events)
+
+        for event_ in events:
+            occurrence = schema.Occurrence(event=event_, message_id=1, created_at=now)
+            await repository.occurrence.upsert(occurrence=occurrence)
+            await repository.job.upsert(
+                job=schema.Job(
+                    type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE,
+                    event_id=event_.id,
+                    occurrence_id=occurrence.id,
+                    eta=now,
+                ),
+            )
+            occurrences.append(occurrence)
+
+    await db_session.execute(
+        insert(models.Entry),
+        [
+            {
+                "id": uuid.uuid4(),
+                "occurrence_id": occurrence.id,
+                "full_name": "Full Name",
+                "user_id": user_id,
+                "created_at": now.replace(tzinfo=None),
+                "is_skipping": False,
+                "is_done": False,
+            }
+            for occurrence in occurrences
+            for user_id in range(1, USERS + 1)
+        ],
+    )
+    await db_session.execute(text("ANALYZE"))
+
+    return occurrences[-1]
+
+
+def find_unindexed_scans(plan: dict[str, typing.Any]) -> list[str]:
+    """Find scans of tables in EXPLAIN plan that don't look up rows by an index condition.
+
+    With seq scans disabled a table with any index is scanned through it whole instead,
+    so an index scan without `Index Cond` is as bad as a seq scan.
+    """
+    is_unindexed = plan["Node Type"] == "Seq Scan" or (
+        plan["Node Type"] in {"Index Scan", "Index Only Scan"} and "Index Cond" not in plan
+    )
+    scans = [f"{plan['Node Type']} on {plan['Relation Name']}"] if is_unindexed else []
+    for subplan in plan.get("Plans", []):
+        scans.extend(find_unindexed_scans(plan=subplan))
+    return scans
+
+
+HOT_CALLS: dict[str, typing.Callable[[Repository, schema.Occurrence], typing.Awaitable[object]]] = {
+    "entry of a user": lambda repository, occurrence: repository.entry.get(
+        filter_=schema.EntryGetFilter(occurrence_id=occurrence.id, user_id=1),
+    ),
+    "entries of an occurrence": lambda repository, occurrence: repository.entry.get_many(
+        filter_=schema.EntryGetManyFilter(occurrence_id=occurrence.id),
+    ),
+    "snapshot of an occurrence": lambda repository, occurrence: repository.occurrence.get_snapshot(
+        filter_=schema.OccurrenceGetFilter(id=occurrence.id),
+    ),
+    "join": lambda repository, occurrence: repository.entry.join(
+        entry=schema.Entry(
+            occurrence_id=occurrence.id,
+            username=None,
+            full_name="Full Name",
+            user_id=USERS + 1,
+            created_at=datetime.now(tz=pytz.utc),
+            is_skipping=False,
+            is_done=False,
+        ),
+    ),
+    "leave": lambda repository, occurrence: repository.entry.leave(
+        occurrence_id=occurrence.id,
+        user_id=1,
+    ),
+    "toggle skip": lambda repository, occurrence: repository.entry.toggle_skip(
+        occurrence_id=occurrence.id,
+        user_id=1,
+    ),
+    "toggle done": lambda repository, occurrence: repository.entry.toggle_done(
+        occurrence_id=occurrence.id,
+        user_id=1,
+    ),
+    "events of a chat": lambda repository, occurrence: repository.event.get_many(
+        filter_=schema.EventGetManyFilter(chat_id=occurrence.event.chat.id),
+    ),
+    "page of events": lambda repository, occurrence: repository.event.get_many(
+        filter_=schema.EventGetManyFilter(
+            after=(occurrence.event.next_date, occurrence.event.id),
+        ),
+        limit=10,
+    ),
+    "due jobs": lambda repository, occurrence: repository.job.claim(
+        filter_=schema.JobClaimFilter(eta=occurrence.event.next_date),
+        limit=10,
+    ),
+    "events of a deleted chat": lambda repository, occurrence: repository.event.delete(
+        filter_=schema.EventDeleteFilter(chat_id=occurrence.event.chat.id),
+    ),
+}
+# queries run by PostgreSQL itself on cascading deletes of chats, events and occurrences
+CASCADE_QUERIES: dict[str, typing.Callable[[schema.Occurrence], Select]] = {
+    "occurrences of an event": lambda occurrence: select(models.Occurrence.id).where(
+        models.Occurrence.event_id == occurrence.event.id,
+    ),
+    "jobs of an event": lambda occurrence: select(models.Job.id).where(
+        models.Job.event_id == occurrence.event.id,
+    ),
+    "jobs of an occurrence": lambda occurrence: select(models.Job.id).where(
+        models.Job.occurrence_id == occurrence.id,
+    ),
+}
+
+
+@pytest.mark.parametrize("name", HOT_CALLS)
+async def test_hot_query_index_success(
+    db_session: AsyncSession,
+    repository: Repository,
+    name: str,
+) -> None:
+    occurrence = await seed(repository=repository, db_session=db_session)
+    # tables this small are cheaper to scan, so only a scan that can't be avoided is chosen
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    statements: list[tuple[str, typing.Any]] = []
+
+    def capture(*args: typing.Any) -> None:  # noqa: ANN401
+        _, _, statement, parameters, _, _ = args
+        statements.append((statement, parameters))
+
+    connection = await db_session.connection()
+    event.listen(connection.sync_connection, "before_cursor_execute", capture)
+    try:
+        await HOT_CALLS[name](repository, occurrence)
+    finally:
+        event.remove(connection.sync_connection, "before_cursor_execute", capture)
+
+    assert statements
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        [[plan]] = result.scalars()
+
+        assert find_unindexed_scans(plan=plan["Plan"]) == [], statement
+
+
+@pytest.mark.parametrize("name", CASCADE_QUERIES)
+async def test_cascade_query_index_success(
+    db_session: AsyncSession,
+    repository: Repository,
+    name: str,
+) -> None:
+    occurrence = await seed(repository=repository, db_session=db_session)
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    stmt = CASCADE_QUERIES[name](occurrence).compile(
+        dialect=postgresql.dialect(),  # type: ignore[no-untyped-call]
+        compile_kwargs={"literal_binds": True},
+    )
+    [[plan]] = (await db_session.execute(text(f"EXPLAIN (FORMAT JSON) {stmt}"))).scalars()
+
+    assert find_unindexed_scans(plan=plan["Plan"]) == [], str(stmt)
+
+
+async def test_repository_commit_on_commit_success(repository: Repository) -> None:
+    committed = []
+
+    async def callback() -> None:
+        committed.append(await repository.chat.get(filter_=schema.ChatGetFilter(id=1)))
+
+    chat = schema.Chat(id=1, timezone="Etc/UTC", config={"events": []})
+    await repository.chat.upsert(chat=chat)
+    repository.on_commit(callback)
+
+    assert committed == []
+
+    await repository.commit()
+
+    assert committed == [chat]
+
+    await repository.commit()
+
+    assert committed == [chat]
+
+
+async def test_repository_commit_callback_failure(
+    repository: Repository,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    called = []
+
+    async def fail() -> None:
+        raise RuntimeError
+
+    async def callback() -> None:
+        called.append(True)
+
+    repository.on_commit(fail)
+    repository.on_commit(callback)
+
+    await repository.commit()
+
+    assert called == [True]
+    assert "failed to run callback" in caplog.text
+
+
+async def test_repository_savepoint_rolled_back_failure(repository: Repository) -> None:
+    called = []
+
+    async def callback() -> None:
+        called.append(True)
+
+    async def change() -> None:
+        async with repository.savepoint():
+            await repository.chat.upsert(chat=schema.Chat(id=2, timezone="Etc/UTC", config={}))
+            repository.on_commit(callback)
+            raise RuntimeError
+
+    await repository.chat.upsert(chat=schema.Chat(id=1, timezone="Etc/UTC", config={}))
+    with pytest.raises(RuntimeError):
+        await change()
+
+    await repository.commit()
+
+    assert called == []
+    assert await repository.chat.get(filter_=schema.ChatGetFilter(id=1)) is not None
+    assert await repository.chat.get(filter_=schema.ChatGetFilter(id=2)) is None
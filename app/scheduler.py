@@ -0,0 +1,62 @@
+import asyncio
+import logging
+
+import aiogram
+
+from app import schema
+from app.config import config
+from app.dependencies import get_bot, get_service
+from app.service import Service
+from app.tasks.tasks import is_job_revoked, run_job
+
+logger = logging.getLogger(__name__)
+
+
+async def run_due_jobs(bot: aiogram.Bot) -> int:
+    """Claim a batch of due jobs and run them one by one.
+
+    Jobs are deleted with `FOR UPDATE SKIP LOCKED` or popped by a Lua script,
+    so any number of schedulers can run concurrently without running the same job twice.
+    Claim is committed before jobs are run, so no job row stays locked while they run.
+    Jobs that are lost because the scheduler stopped are rescheduled by `recovery`.
+    Revoked jobs are completed without being run.
+
+    Returns number of claimed jobs.
+    """
+    async with get_service() as service:
+        jobs = await service.job.claim(limit=config.scheduler.batch_size)
+        await service.commit()
+
+        await run_jobs(service=service, bot=bot, jobs=jobs)
+
+    return len(jobs)
+
+
+async def run_jobs(service: Service, bot: aiogram.Bot, jobs: list[schema.Job]) -> None:
+    """Run claimed jobs one by one and complete them, whether they succeed or not."""
+    for job in jobs:
+        if await is_job_revoked(service=service, job_id=job.id):
+            continue
+
+        try:
+            async with get_service() as worker:
+                await run_job(service=worker, bot=bot, job=job)
+        except Exception:
+            logger.exception("failed to run job with id: %s.", str(job.id))
+
+    await service.job.complete(jobs=jobs)
+
+
+async def main() -> None:
+    if config.scheduler.backend == "celery":
+        logger.info("nothing to schedule, jobs of celery backend are run by celery worker.")
+        return
+
+    async with get_bot() as bot:
+        while True:
+            if await run_due_jobs(bot=bot) < config.scheduler.batch_size:
+                await asyncio.sleep(config.scheduler.poll_interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,79 @@
+import aiogram
+import pytest
+from pytest_mock import MockerFixture
+
+from app import schema
+from app.config import config
+from app.scheduler import main, run_due_jobs
+from app.service import Service
+
+
+@pytest.fixture
+def run_due_jobs_mocks(mock_get_service: None, mocker: MockerFixture, service: Service) -> None:
+    mocker.patch.object(service.job, "claim", autospec=True)
+    mocker.patch.object(service.job, "complete", autospec=True)
+
+
+async def test_run_due_jobs_success(
+    run_due_jobs_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    jobs = [
+        schema.Job(
+            type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=event.next_date,
+        )
+        for _ in range(2)
+    ]
+    service.job.claim.return_value = jobs
+    commit = mocker.patch.object(service, "commit", autospec=True)
+    commits = []
+
+    async def run_job(**_: object) -> None:
+        commits.append(commit.await_count)
+        if len(commits) == 1:
+            raise ValueError
+
+    mocker.patch("app.scheduler.run_job", autospec=True, side_effect=run_job)
+
+    assert await run_due_jobs(bot=bot) == len(jobs)
+
+    # claim is committed before jobs are run, so they aren't locked while they run
+    assert commits == [1, 1]
+    service.job.complete.assert_awaited_once_with(jobs=jobs)
+
+
+async def test_run_due_jobs_revoked_job_skipped(
+    run_due_jobs_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+) -> None:
+    bot = mocker.create_autospec(spec=aiogram.Bot)
+    job = schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        eta=event.next_date,
+    )
+    service.job.claim.return_value = [job]
+    mocker.patch.object(service.job, "is_revoked", return_value=True, autospec=True)
+    run_job = mocker.patch("app.scheduler.run_job", autospec=True)
+
+    assert await run_due_jobs(bot=bot) == 1
+
+    run_job.assert_not_awaited()
+    service.job.is_revoked.assert_awaited_once_with(job_id=job.id)
+    service.job.complete.assert_awaited_once_with(jobs=[job])
+
+
+async def test_main_celery_skipped(mocker: MockerFixture) -> None:
+    mocker.patch.object(config.scheduler, "backend", "celery")
+    get_bot = mocker.patch("app.scheduler.get_bot", autospec=True)
+
+    await main()
+
+    get_bot.assert_not_called()
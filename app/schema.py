@@ -1,3 +1,4 @@
+import enum
 import typing
 import uuid
 from datetime import datetime
@@ -7,16 +8,26 @@ from pydantic import BaseModel, Field, ValidationInfo
 from pydantic.functional_validators import AfterValidator, BeforeValidator
 
 from app.config import config
+from app.util import compile_expression
+
+
+def validate_expression(v: str | None, _: ValidationInfo) -> str | None:
+    if v is not None:
+        compile_expression(v)
+    return v
+
+
+PeriodExpression = typing.Annotated[str | None, AfterValidator(validate_expression)]
 
 
 class Period(BaseModel):
-    years: str | None = None
-    months: str | None = None
-    weeks: str | None = None
-    days: str | None = None
-    hours: str | None = None
-    minutes: str | None = None
-    seconds: str | None = None
+    years: PeriodExpression = None
+    months: PeriodExpression = None
+    weeks: PeriodExpression = None
+    days: PeriodExpression = None
+    hours: PeriodExpression = None
+    minutes: PeriodExpression = None
+    seconds: PeriodExpression = None
 
 
 def validate_date(v: str | datetime | None, _: ValidationInfo) -> datetime | None:
@@ -48,15 +59,24 @@ def validate_timezone(v: str, _: ValidationInfo) -> str | None:
     return pytz.timezone(zone=v).zone
 
 
+class CatchUpPolicyEnum(enum.Enum):
+    SKIP = "skip"
+    LATEST = "latest"
+    ALL = "all"
+
+
 class ConfigurationInput(BaseModel):
     timezone: typing.Annotated[str, AfterValidator(validate_timezone)] = "Etc/UTC"
+    catch_up_policy: CatchUpPolicyEnum | None = None
     events: list[EventInput]
 
 
 class Chat(BaseModel):
     id: int
     timezone: str
-    config: dict[str, typing.Any]
+    catch_up_policy: CatchUpPolicyEnum | None = None
+    # raw configuration, `None` in chats of events and occurrences read from the database
+    config: dict[str, typing.Any] | None = None
 
 
 class ChatGetFilter(typing.TypedDict, total=False):
@@ -79,8 +99,19 @@ class EventGetFilter(typing.TypedDict, total=False):
     id: uuid.UUID
 
 
+class EventGetManyFilter(typing.TypedDict, total=False):
+    chat_id: int
+    after: tuple[datetime, uuid.UUID]
+
+
 class EventDeleteFilter(typing.TypedDict, total=False):
     chat_id: int
+    ids: list[uuid.UUID]
+
+
+class EventLockFilter(typing.TypedDict, total=False):
+    id: uuid.UUID
+    times_occurred: int
 
 
 class Occurrence(BaseModel):
@@ -105,6 +136,24 @@ class Entry(BaseModel):
     is_done: bool
 
 
+class EntryMutation(BaseModel):
+    """Outcome of a change of user's entry.
+
+    `entry` is user's entry after the change, or before it if nothing changed
+    or the entry was deleted, `None` if the user isn't in the queue.
+    """
+
+    entry: Entry | None
+    is_changed: bool
+
+
+class OccurrenceSnapshot(BaseModel):
+    """Occurrence together with its queue, everything its message is rendered from."""
+
+    occurrence: Occurrence
+    entries: list[Entry]
+
+
 class EntryGetFilter(typing.TypedDict, total=False):
     occurrence_id: uuid.UUID
     user_id: int
@@ -117,3 +166,45 @@ class EntryGetManyFilter(typing.TypedDict, total=False):
 class EntryDeleteFilter(typing.TypedDict, total=False):
     occurrence_id: uuid.UUID
     user_id: int
+
+
+class JobTypeEnum(enum.Enum):
+    SEND_NOTIFICATION_MESSAGE = "SEND_NOTIFICATION_MESSAGE"
+    RESEND_NOTIFICATION_MESSAGE = "RESEND_NOTIFICATION_MESSAGE"
+    CATCH_UP_NOTIFICATION_MESSAGE = "CATCH_UP_NOTIFICATION_MESSAGE"
+
+
+class Job(BaseModel):
+    id: uuid.UUID = Field(default_factory=lambda: uuid.uuid4())
+    type: JobTypeEnum
+    event_id: uuid.UUID
+    occurrence_id: uuid.UUID | None = None
+    # `times_occurred` of the event the notification is sent for, see `EventRepository.lock`
+    times_occurred: int | None = None
+    eta: typing.Annotated[datetime, BeforeValidator(validate_date)]
+
+
+class JobClaimFilter(typing.TypedDict, total=False):
+    eta: datetime
+
+
+class JobExistsFilter(typing.TypedDict, total=False):
+    eta: datetime
+
+
+class JobDeleteFilter(typing.TypedDict, total=False):
+    ids: list[uuid.UUID]
+
+
+class RateLimitStats(BaseModel):
+    requests: int = 0
+    delayed: int = 0
+    wait_time: float = 0.0
+    retry_after: int = 0
+
+
+class DispatchStats(BaseModel):
+    chats: int = 0
+    pending: int = 0
+    in_flight: int = 0
+    max_depth: int = 0
@@ -1,4 +1,4 @@
-from functools import update_wrapper
+from functools import partial, update_wrapper
 
 import ring
 from redis.asyncio import Redis as AsyncRedis
@@ -27,7 +27,9 @@ class ChatService:
 
     async def upsert(self, chat: schema.Chat) -> None:
         await self._repository.chat.upsert(chat=chat)
-        await self.get.delete(filter_=schema.ChatGetFilter(id=chat.id))
+        self._repository.on_commit(
+            partial(self.get.delete, filter_=schema.ChatGetFilter(id=chat.id)),
+        )
 
     async def get(self, filter_: schema.ChatGetFilter) -> schema.Chat | None:
         return await self._repository.chat.get(filter_=filter_)
@@ -80,6 +80,7 @@ async def test_chat_service_get_by_id_cache_delete_on_upsert_success(
     result1 = await service.chat.get(filter_=filter_)
 
     await service.chat.upsert(chat=new_chat)
+    await service.commit()
 
     result2 = await service.chat.get(filter_=filter_)
 
@@ -1,3 +1,5 @@
+import uuid
+
 from app import schema
 from app.repository import Repository
 
@@ -17,3 +19,21 @@ class EntryService:
 
     async def delete(self, filter_: schema.EntryDeleteFilter) -> None:
         await self._repository.entry.delete(filter_=filter_)
+
+    async def join(self, entry: schema.Entry) -> schema.EntryMutation:
+        return await self._repository.entry.join(entry=entry)
+
+    async def leave(self, occurrence_id: uuid.UUID, user_id: int) -> schema.EntryMutation:
+        return await self._repository.entry.leave(occurrence_id=occurrence_id, user_id=user_id)
+
+    async def toggle_skip(self, occurrence_id: uuid.UUID, user_id: int) -> schema.EntryMutation:
+        return await self._repository.entry.toggle_skip(
+            occurrence_id=occurrence_id,
+            user_id=user_id,
+        )
+
+    async def toggle_done(self, occurrence_id: uuid.UUID, user_id: int) -> schema.EntryMutation:
+        return await self._repository.entry.toggle_done(
+            occurrence_id=occurrence_id,
+            user_id=user_id,
+        )
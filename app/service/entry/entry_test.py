@@ -1,5 +1,6 @@
 import uuid
 
+import pytest
 from pytest_mock import MockerFixture
 
 from app import schema
@@ -74,3 +75,38 @@ async def test_entry_service_delete_by_occurrence_id_and_user_id_success(
     await service.entry.delete(filter_=filter_)
 
     repository.entry.delete.assert_awaited_once_with(filter_=filter_)
+
+
+async def test_entry_service_join_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    entry: schema.Entry,
+) -> None:
+    mutation = schema.EntryMutation(entry=entry, is_changed=True)
+    mocker.patch.object(repository.entry, "join", return_value=mutation, autospec=True)
+
+    result = await service.entry.join(entry=entry)
+
+    repository.entry.join.assert_awaited_once_with(entry=entry)
+    assert mutation == result
+
+
+@pytest.mark.parametrize("method", ["leave", "toggle_skip", "toggle_done"])
+async def test_entry_service_mutation_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    entry: schema.Entry,
+    method: str,
+) -> None:
+    mutation = schema.EntryMutation(entry=entry, is_changed=False)
+    mocker.patch.object(repository.entry, method, return_value=mutation, autospec=True)
+
+    result = await getattr(service.entry, method)(occurrence_id=entry.occurrence_id, user_id=1)
+
+    getattr(repository.entry, method).assert_awaited_once_with(
+        occurrence_id=entry.occurrence_id,
+        user_id=1,
+    )
+    assert mutation == result
@@ -1,4 +1,5 @@
-from functools import update_wrapper
+import uuid
+from functools import partial, update_wrapper
 
 import ring
 from redis.asyncio import Redis as AsyncRedis
@@ -24,10 +25,32 @@ class EventService:
 
     async def upsert(self, event: schema.Event) -> None:
         await self._repository.event.upsert(event=event)
-        await self.get.delete(filter_=schema.EventGetFilter(id=event.id))
+        self.forget(ids=[event.id])
+
+    async def upsert_many(self, events: list[schema.Event]) -> None:
+        await self._repository.event.upsert_many(events=events)
+        self.forget(ids=[event.id for event in events])
 
     async def get(self, filter_: schema.EventGetFilter) -> schema.Event | None:
         return await self._repository.event.get(filter_=filter_)
 
-    async def delete(self, filter_: schema.EventDeleteFilter) -> None:
-        await self._repository.event.delete(filter_=filter_)
+    async def get_many(
+        self,
+        filter_: schema.EventGetManyFilter,
+        limit: int | None = None,
+    ) -> list[schema.Event]:
+        return await self._repository.event.get_many(filter_=filter_, limit=limit)
+
+    async def lock(self, filter_: schema.EventLockFilter) -> bool:
+        return await self._repository.event.lock(filter_=filter_)
+
+    async def delete(self, filter_: schema.EventDeleteFilter) -> list[uuid.UUID]:
+        ids = await self._repository.event.delete(filter_=filter_)
+        self.forget(ids=ids)
+        return ids
+
+    def forget(self, ids: list[uuid.UUID]) -> None:
+        """Drop cached events with `ids` once the changes made so far are committed."""
+        keys = [self.get.key(filter_=schema.EventGetFilter(id=id_)) for id_ in ids]
+        if keys:
+            self._repository.on_commit(partial(self._redis.delete, *keys))
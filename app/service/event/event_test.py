@@ -79,6 +79,7 @@ async def test_event_service_get_by_id_cache_delete_on_upsert_success(
     result1 = await service.event.get(filter_=filter_)
 
     await service.event.upsert(event=new_event)
+    await service.commit()
 
     result2 = await service.event.get(filter_=filter_)
 
@@ -104,3 +105,44 @@ async def test_event_service_delete_by_chat_id_success(
     await service.event.delete(filter_=filter_)
 
     repository.event.delete.assert_awaited_once_with(filter_=filter_)
+
+
+async def test_event_service_get_many_by_chat_id_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    event: schema.Event,
+) -> None:
+    mocker.patch.object(repository.event, "get_many", return_value=[event], autospec=True)
+
+    filter_ = schema.EventGetManyFilter(chat_id=event.chat.id)
+
+    assert await service.event.get_many(filter_=filter_) == [event]
+
+    repository.event.get_many.assert_awaited_once_with(filter_=filter_, limit=None)
+
+
+async def test_event_service_get_by_id_cache_delete_on_upsert_many_success(
+    event_service_get_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    event: schema.Event,
+) -> None:
+    mocker.patch.object(repository.event, "upsert_many", autospec=True)
+
+    new_event = event.model_copy(update={"name": "New Event Name"}, deep=True)
+    repository.event.get.side_effect = [event, new_event]
+
+    filter_ = schema.EventGetFilter(id=event.id)
+
+    result1 = await service.event.get(filter_=filter_)
+
+    await service.event.upsert_many(events=[new_event])
+    await service.commit()
+
+    result2 = await service.event.get(filter_=filter_)
+
+    repository.event.upsert_many.assert_awaited_once_with(events=[new_event])
+    assert event == result1
+    assert new_event == result2
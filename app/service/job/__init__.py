@@ -0,0 +1,5 @@
+from .job import JobService
+
+__all__ = [
+    "JobService",
+]
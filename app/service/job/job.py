@@ -0,0 +1,377 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from functools import partial
+
+import pytz
+from redis.asyncio import Redis as AsyncRedis
+
+from app import schema
+from app.config import config
+from app.repository import Repository
+from app.util import RelativeDelta
+
+QUEUE_KEY = "job_queue"
+BACKLOG_KEY = "job_backlog"
+# ids of `celery` tasks that haven't finished yet scored by their eta timestamp, see `has_due`
+PENDING_KEY = "job_pending"
+EVENT_JOBS_KEY = "event_jobs:{event_id}"
+REVOKED_JOB_KEY = "revoked_job:{job_id}"
+
+# how long event's jobs and revoked job ids are kept in redis after job's eta
+FENCE_TTL = 24 * 60 * 60
+
+# pops up to ARGV[2] members with score up to ARGV[1] from the sorted set in one atomic step
+CLAIM_SCRIPT = """
+local jobs = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+for _, job in ipairs(jobs) do
+    redis.call("ZREM", KEYS[1], job)
+end
+return jobs
+"""
+
+# stores ARGV[2] member under ARGV[1] job type, replacing the job of that type tracked before,
+# and extends hash's ttl up to ARGV[3] seconds;
+# jobs of that type tracked under their ids, the way they used to be, are replaced as well
+TRACK_SCRIPT = """
+local fields = redis.call("HGETALL", KEYS[1])
+for i = 1, #fields, 2 do
+    if fields[i] ~= ARGV[1] and cjson.decode(fields[i + 1])["type"] == ARGV[1] then
+        redis.call("HDEL", KEYS[1], fields[i])
+    end
+end
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+if redis.call("TTL", KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call("EXPIRE", KEYS[1], ARGV[3])
+end
+"""
+
+# removes ARGV[2] member stored under ARGV[1] job type unless another job replaced it,
+# or under ARGV[3] job id the way it used to be stored
+UNTRACK_SCRIPT = """
+if redis.call("HGET", KEYS[1], ARGV[1]) == ARGV[2] then
+    redis.call("HDEL", KEYS[1], ARGV[1])
+end
+redis.call("HDEL", KEYS[1], ARGV[3])
+"""
+
+
+class JobService:
+    def __init__(self, repository: Repository, redis: AsyncRedis) -> None:
+        self._repository = repository
+        self._redis = redis
+
+        self._claim_script = redis.register_script(CLAIM_SCRIPT)
+        self._track_script = redis.register_script(TRACK_SCRIPT)
+        self._untrack_script = redis.register_script(UNTRACK_SCRIPT)
+
+    async def schedule(self, job: schema.Job) -> None:
+        """Schedule job to be run at `job.eta` by the configured scheduler backend.
+
+        `celery` backend publishes a task with ETA,
+        `postgres` backend stores the job until `app.scheduler` claims it,
+        `redis` backend adds the job to a sorted set scored by `job.eta` timestamp.
+
+        Catch-up jobs are added to the backlog instead, see `claim_backlog`.
+
+        Job is tracked under its event, so that it can be cancelled once the event is gone.
+        Event tracks one job of each type, the job replaces the one of its type scheduled before.
+        Job id is passed to `celery` as task id and serves as a fencing token, see `is_revoked`.
+
+        `postgres` jobs are committed together with the changes made so far, the rest
+        are scheduled once those are committed, so that a job never runs ahead of them.
+        """
+        if self._is_stored(job=job):
+            await self._repository.job.upsert(job=job)
+
+        self._repository.on_commit(partial(self._schedule, job=job))
+
+    async def _schedule(self, job: schema.Job) -> None:
+        await self._track(job=job)
+
+        if job.type == schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE:
+            await self._redis.zadd(
+                BACKLOG_KEY,
+                {self._map_job_schema_to_member(job=job): job.eta.timestamp()},
+            )
+            return
+
+        match config.scheduler.backend:
+            case "celery":
+                self._publish(job=job)
+                await self._redis.zadd(PENDING_KEY, {str(job.id): job.eta.timestamp()})
+            case "redis":
+                await self._redis.zadd(
+                    QUEUE_KEY,
+                    {self._map_job_schema_to_member(job=job): job.eta.timestamp()},
+                )
+
+    async def schedule_many(self, jobs: list[schema.Job]) -> None:
+        """Schedule all jobs the same way `schedule` does, but in as few round trips as possible.
+
+        Jobs are tracked in one pipeline, `celery` tasks are published through one producer,
+        `postgres` jobs are inserted by multi-row statements and `redis` jobs are added
+        in one command.
+        """
+        if not jobs:
+            return
+
+        if stored := [job for job in jobs if self._is_stored(job=job)]:
+            await self._repository.job.upsert_many(jobs=stored)
+
+        self._repository.on_commit(partial(self._schedule_many, jobs=jobs))
+
+    async def _schedule_many(self, jobs: list[schema.Job]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for job in jobs:
+                await self._track(job=job, client=pipe)
+            await pipe.execute()
+
+        backlog, jobs = self._split_backlog_jobs(jobs=jobs)
+        if backlog:
+            await self._redis.zadd(
+                BACKLOG_KEY,
+                {self._map_job_schema_to_member(job=job): job.eta.timestamp() for job in backlog},
+            )
+        if not jobs:
+            return
+
+        match config.scheduler.backend:
+            case "celery":
+                from app import tasks
+
+                with tasks.celery.producer_or_acquire() as producer:
+                    for job in jobs:
+                        self._publish(job=job, producer=producer)
+                await self._redis.zadd(
+                    PENDING_KEY,
+                    {str(job.id): job.eta.timestamp() for job in jobs},
+                )
+            case "redis":
+                await self._redis.zadd(
+                    QUEUE_KEY,
+                    {self._map_job_schema_to_member(job=job): job.eta.timestamp() for job in jobs},
+                )
+
+    async def claim(self, limit: int) -> list[schema.Job]:
+        """Claim up to `limit` due jobs, removing them so that no other claim gets them.
+
+        Jobs claimed from `redis` backend are removed right away, `postgres` jobs
+        are removed once claim is committed, which should be done before they are run.
+        """
+        now = datetime.now(tz=pytz.utc)
+
+        if config.scheduler.backend == "redis":
+            jobs = await self._claim_script(keys=[QUEUE_KEY], args=[now.timestamp(), limit])
+            return [self._map_member_to_job_schema(member=job) for job in jobs]
+
+        return await self._repository.job.claim(
+            filter_=schema.JobClaimFilter(eta=now),
+            limit=limit,
+        )
+
+    async def claim_backlog(self, limit: int) -> list[schema.Job]:
+        """Claim up to `limit` catch-up jobs that were in the backlog the longest.
+
+        Jobs are popped atomically, so any number of drains can run concurrently.
+        """
+        members = await self._redis.zpopmin(BACKLOG_KEY, count=limit)
+        return [self._map_member_to_job_schema(member=member) for member, _ in members]
+
+    async def has_due(self) -> bool:
+        """Check whether any job is due.
+
+        `celery` tasks can't be inspected, so their ids are kept until they finish,
+        see `finish`. Task that is overdue by more than `config.catch_up.grace_period`
+        is caught up when it runs or by `recovery`, so it isn't waited for and is forgotten.
+        """
+        now = datetime.now(tz=pytz.utc)
+
+        match config.scheduler.backend:
+            case "postgres":
+                return await self._repository.job.exists(filter_=schema.JobExistsFilter(eta=now))
+            case "redis":
+                return bool(await self._redis.zcount(QUEUE_KEY, "-inf", now.timestamp()))
+
+        deadline = now - RelativeDelta(seconds=config.catch_up.grace_period)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(PENDING_KEY, "-inf", f"({deadline.timestamp()}")
+            pipe.zcount(PENDING_KEY, "-inf", now.timestamp())
+            _, count = await pipe.execute()
+        return bool(count)
+
+    async def finish(self, job_id: uuid.UUID | str) -> None:
+        """Forget `celery` task of the job once it has run, see `has_due`."""
+        await self._redis.zrem(PENDING_KEY, str(job_id))
+
+    async def cancel(self, event_ids: list[uuid.UUID]) -> None:
+        """Cancel all jobs scheduled for events with `event_ids`, see `revoke`."""
+        if not event_ids:
+            return
+
+        tracked = await self.get_tracked(event_ids=event_ids)
+        await self.revoke(jobs=[job for jobs in tracked.values() for job in jobs])
+        self._repository.on_commit(
+            partial(
+                self._redis.delete,
+                *[EVENT_JOBS_KEY.format(event_id=id_) for id_ in event_ids],
+            ),
+        )
+
+    async def revoke(self, jobs: list[schema.Job]) -> None:
+        """Revoke jobs and stop tracking them.
+
+        Jobs are marked as revoked first, so a job that can't be removed from the backend
+        is still dropped by `is_revoked` check before it touches the database.
+        `celery` tasks are revoked, `postgres` and `redis` jobs as well as catch-up jobs
+        are removed right away.
+
+        `postgres` jobs are deleted together with the changes made so far, the rest
+        are revoked once those are committed, so that a rolled back change keeps its jobs.
+        """
+        if not jobs:
+            return
+
+        if stored := [job for job in jobs if self._is_stored(job=job)]:
+            await self._repository.job.delete(
+                filter_=schema.JobDeleteFilter(ids=[job.id for job in stored]),
+            )
+
+        self._repository.on_commit(partial(self._revoke, jobs=jobs))
+
+    async def _revoke(self, jobs: list[schema.Job]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for job in jobs:
+                pipe.set(REVOKED_JOB_KEY.format(job_id=job.id), 1, ex=self._fence_ttl(job=job))
+                await self._untrack(job=job, client=pipe)
+            await pipe.execute()
+
+        backlog, jobs = self._split_backlog_jobs(jobs=jobs)
+        if backlog:
+            await self._redis.zrem(
+                BACKLOG_KEY,
+                *[self._map_job_schema_to_member(job=job) for job in backlog],
+            )
+        if not jobs:
+            return
+
+        match config.scheduler.backend:
+            case "celery":
+                from app import tasks
+
+                await asyncio.to_thread(
+                    tasks.celery.control.revoke,
+                    [str(job.id) for job in jobs],
+                )
+                await self._redis.zrem(PENDING_KEY, *[str(job.id) for job in jobs])
+            case "redis":
+                await self._redis.zrem(
+                    QUEUE_KEY,
+                    *[self._map_job_schema_to_member(job=job) for job in jobs],
+                )
+
+    async def get_tracked(self, event_ids: list[uuid.UUID]) -> dict[uuid.UUID, list[schema.Job]]:
+        """Get the last job of each type scheduled for events with `event_ids`.
+
+        Jobs are tracked until they are replaced or a day after their eta,
+        so some of them may be already done.
+        """
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for event_id in event_ids:
+                pipe.hvals(EVENT_JOBS_KEY.format(event_id=event_id))
+            members = await pipe.execute()
+
+        return {
+            event_id: [self._map_member_to_job_schema(member=member) for member in values]
+            for event_id, values in zip(event_ids, members, strict=True)
+            if values
+        }
+
+    async def is_revoked(self, job_id: uuid.UUID | str) -> bool:
+        return bool(await self._redis.exists(REVOKED_JOB_KEY.format(job_id=job_id)))
+
+    async def complete(self, jobs: list[schema.Job]) -> None:
+        """Complete jobs that were run.
+
+        Catch-up jobs stop being tracked, so that the event can be caught up again
+        if the job has failed.
+        """
+        backlog, _ = self._split_backlog_jobs(jobs=jobs)
+        if not backlog:
+            return
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for job in backlog:
+                await self._untrack(job=job, client=pipe)
+            await pipe.execute()
+
+    async def _track(self, job: schema.Job, client: AsyncRedis | None = None) -> None:
+        await self._track_script(
+            keys=[EVENT_JOBS_KEY.format(event_id=job.event_id)],
+            args=[
+                job.type.value,
+                self._map_job_schema_to_member(job=job),
+                self._fence_ttl(job=job),
+            ],
+            client=client,
+        )
+
+    async def _untrack(self, job: schema.Job, client: AsyncRedis | None = None) -> None:
+        await self._untrack_script(
+            keys=[EVENT_JOBS_KEY.format(event_id=job.event_id)],
+            args=[job.type.value, self._map_job_schema_to_member(job=job), str(job.id)],
+            client=client,
+        )
+
+    @staticmethod
+    def _publish(job: schema.Job, **options: object) -> None:
+        from app import tasks
+
+        match job.type:
+            case schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE:
+                tasks.send_notification_message_task.apply_async(
+                    kwargs={"event_id": job.event_id, "times_occurred": job.times_occurred},
+                    eta=job.eta,
+                    task_id=str(job.id),
+                    **options,
+                )
+            case schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE:
+                tasks.resend_notification_message_task.apply_async(
+                    kwargs={"occurrence_id": job.occurrence_id},
+                    eta=job.eta,
+                    task_id=str(job.id),
+                    **options,
+                )
+
+    @staticmethod
+    def _is_stored(job: schema.Job) -> bool:
+        """Check whether job is stored in the database rather than published somewhere else."""
+        return (
+            config.scheduler.backend == "postgres"
+            and job.type != schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE
+        )
+
+    @staticmethod
+    def _split_backlog_jobs(jobs: list[schema.Job]) -> tuple[list[schema.Job], list[schema.Job]]:
+        backlog, rest = [], []
+        for job in jobs:
+            if job.type == schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE:
+                backlog.append(job)
+            else:
+                rest.append(job)
+        return backlog, rest
+
+    @staticmethod
+    def _fence_ttl(job: schema.Job) -> int:
+        return max(int((job.eta - datetime.now(tz=pytz.utc)).total_seconds()), 0) + FENCE_TTL
+
+    @staticmethod
+    def _map_job_schema_to_member(job: schema.Job) -> str:
+        return job.model_dump_json()
+
+    @staticmethod
+    def _map_member_to_job_schema(member: bytes) -> schema.Job:
+        job = json.loads(member)
+        job["eta"] = datetime.fromisoformat(job["eta"])
+        return schema.Job.model_validate(job)
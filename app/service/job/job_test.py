@@ -0,0 +1,451 @@
+import contextlib
+import uuid
+from datetime import datetime
+from unittest.mock import ANY, call
+
+import pytz
+from pytest_mock import MockerFixture
+from redis.asyncio import Redis as AsyncRedis
+
+from app import schema, tasks
+from app.config import config
+from app.repository import Repository
+from app.service import Service
+from app.service.job.job import EVENT_JOBS_KEY
+from app.util import RelativeDelta
+
+
+async def test_job_service_schedule_celery_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    job: schema.Job,
+    occurrence: schema.Occurrence,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "celery")
+    mocker.patch.object(tasks.send_notification_message_task, "apply_async", autospec=True)
+    mocker.patch.object(tasks.resend_notification_message_task, "apply_async", autospec=True)
+    mocker.patch.object(repository.job, "upsert", autospec=True)
+
+    resend_job = schema.Job(
+        type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE,
+        event_id=job.event_id,
+        occurrence_id=occurrence.id,
+        eta=job.eta,
+    )
+
+    await service.job.schedule(job=job)
+    await service.job.schedule(job=resend_job)
+
+    tasks.send_notification_message_task.apply_async.assert_not_called()
+
+    await service.commit()
+
+    tasks.send_notification_message_task.apply_async.assert_called_once_with(
+        kwargs={"event_id": job.event_id, "times_occurred": job.times_occurred},
+        eta=job.eta,
+        task_id=str(job.id),
+    )
+    tasks.resend_notification_message_task.apply_async.assert_called_once_with(
+        kwargs={"occurrence_id": occurrence.id},
+        eta=job.eta,
+        task_id=str(resend_job.id),
+    )
+    repository.job.upsert.assert_not_called()
+
+
+async def test_job_service_schedule_postgres_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "postgres")
+    mocker.patch.object(tasks.send_notification_message_task, "apply_async", autospec=True)
+    mocker.patch.object(repository.job, "upsert", autospec=True)
+
+    await service.job.schedule(job=job)
+
+    repository.job.upsert.assert_awaited_once_with(job=job)
+    tasks.send_notification_message_task.apply_async.assert_not_called()
+
+
+async def test_job_service_schedule_and_claim_redis_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "redis")
+    mocker.patch.object(repository.job, "upsert", autospec=True)
+    mocker.patch.object(repository.job, "claim", autospec=True)
+    mocker.patch.object(repository.job, "delete", autospec=True)
+
+    now = datetime.now(tz=pytz.utc)
+    late_job = schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        eta=now - RelativeDelta(minutes=1),
+    )
+    early_job = schema.Job(
+        type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        occurrence_id=occurrence.id,
+        eta=now - RelativeDelta(minutes=10),
+    )
+    future_job = schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        eta=now + RelativeDelta(minutes=10),
+    )
+
+    for job in [late_job, early_job, future_job]:
+        await service.job.schedule(job=job)
+    await service.commit()
+
+    assert await service.job.claim(limit=1) == [early_job]
+    assert await service.job.claim(limit=10) == [late_job]
+    assert await service.job.claim(limit=10) == []
+
+    await service.job.complete(jobs=[early_job, late_job])
+
+    repository.job.upsert.assert_not_called()
+    repository.job.claim.assert_not_called()
+    repository.job.delete.assert_not_called()
+
+
+async def test_job_service_claim_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "postgres")
+    mocker.patch.object(repository.job, "claim", return_value=[job], autospec=True)
+
+    before = datetime.now(tz=pytz.utc)
+    jobs = await service.job.claim(limit=10)
+    after = datetime.now(tz=pytz.utc)
+
+    assert jobs == [job]
+    repository.job.claim.assert_awaited_once()
+    assert before <= repository.job.claim.await_args.kwargs["filter_"]["eta"] <= after
+    assert repository.job.claim.await_args.kwargs["limit"] == 10
+
+
+async def test_job_service_complete_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "postgres")
+    mocker.patch.object(repository.job, "delete", autospec=True)
+
+    await service.job.complete(jobs=[job])
+
+    # jobs are deleted when they are claimed
+    repository.job.delete.assert_not_called()
+
+
+async def test_job_service_cancel_celery_success(
+    mocker: MockerFixture,
+    service: Service,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "celery")
+    mocker.patch.object(tasks.send_notification_message_task, "apply_async", autospec=True)
+    revoke = mocker.patch.object(tasks.celery.control, "revoke", autospec=True)
+
+    other_job = job.model_copy(update={"id": uuid.uuid4(), "event_id": uuid.uuid4()})
+
+    await service.job.schedule(job=job)
+    await service.job.schedule(job=other_job)
+    await service.commit()
+
+    assert not await service.job.is_revoked(job_id=job.id)
+
+    await service.job.cancel(event_ids=[job.event_id])
+
+    assert not await service.job.is_revoked(job_id=job.id)
+
+    await service.commit()
+
+    assert await service.job.is_revoked(job_id=job.id)
+    assert await service.job.is_revoked(job_id=str(job.id))
+    assert not await service.job.is_revoked(job_id=other_job.id)
+    revoke.assert_called_once_with([str(job.id)])
+
+    revoke.reset_mock()
+    await service.job.cancel(event_ids=[job.event_id])
+    await service.commit()
+
+    revoke.assert_not_called()
+
+
+async def test_job_service_cancel_postgres_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "postgres")
+    mocker.patch.object(repository.job, "upsert", autospec=True)
+    mocker.patch.object(repository.job, "delete", autospec=True)
+
+    await service.job.schedule(job=job)
+    await service.commit()
+    await service.job.cancel(event_ids=[job.event_id])
+    await service.commit()
+
+    assert await service.job.is_revoked(job_id=job.id)
+    repository.job.delete.assert_awaited_once_with(
+        filter_=schema.JobDeleteFilter(ids=[job.id]),
+    )
+
+
+async def test_job_service_cancel_redis_success(
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "redis")
+
+    eta = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=1)
+    job = schema.Job(type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE, event_id=event.id, eta=eta)
+    other_job = schema.Job(
+        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+        event_id=uuid.uuid4(),
+        eta=eta,
+    )
+
+    await service.job.schedule(job=job)
+    await service.job.schedule(job=other_job)
+    await service.commit()
+    await service.job.cancel(event_ids=[event.id])
+    await service.commit()
+
+    assert await service.job.is_revoked(job_id=job.id)
+    assert await service.job.claim(limit=10) == [other_job]
+
+
+async def test_job_service_schedule_many_celery_success(
+    mocker: MockerFixture,
+    service: Service,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "celery")
+    mocker.patch.object(tasks.send_notification_message_task, "apply_async", autospec=True)
+    revoke = mocker.patch.object(tasks.celery.control, "revoke", autospec=True)
+
+    jobs = [job, job.model_copy(update={"id": uuid.uuid4(), "event_id": uuid.uuid4()})]
+
+    await service.job.schedule_many(jobs=jobs)
+    await service.commit()
+
+    tasks.send_notification_message_task.apply_async.assert_has_calls(
+        [
+            call(
+                kwargs={"event_id": job.event_id, "times_occurred": job.times_occurred},
+                eta=job.eta,
+                task_id=str(job.id),
+                producer=ANY,
+            )
+            for job in jobs
+        ],
+    )
+    producers = {
+        mock_call.kwargs["producer"]
+        for mock_call in tasks.send_notification_message_task.apply_async.call_args_list
+    }
+    assert len(producers) == 1
+
+    await service.job.cancel(event_ids=[job.event_id for job in jobs])
+    await service.commit()
+
+    revoke.assert_called_once()
+    assert sorted(revoke.call_args.args[0]) == sorted(str(job.id) for job in jobs)
+
+
+async def test_job_service_schedule_many_postgres_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "postgres")
+    mocker.patch.object(repository.job, "upsert_many", autospec=True)
+
+    await service.job.schedule_many(jobs=[job])
+    await service.job.schedule_many(jobs=[])
+
+    repository.job.upsert_many.assert_awaited_once_with(jobs=[job])
+
+
+async def test_job_service_schedule_many_redis_success(
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "redis")
+
+    now = datetime.now(tz=pytz.utc)
+    jobs = [
+        schema.Job(
+            type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=now - RelativeDelta(minutes=i),
+        )
+        for i in range(1, 4)
+    ]
+
+    await service.job.schedule_many(jobs=jobs)
+    await service.commit()
+
+    assert await service.job.claim(limit=10) == jobs[::-1]
+
+
+async def test_job_service_backlog_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    event: schema.Event,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "postgres")
+    mocker.patch.object(repository.job, "upsert_many", autospec=True)
+    mocker.patch.object(repository.job, "delete", autospec=True)
+
+    now = datetime.now(tz=pytz.utc)
+    first, second, cancelled = (
+        schema.Job(
+            type=schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE,
+            event_id=event.id if i < 2 else uuid.uuid4(),
+            eta=now + RelativeDelta(seconds=i),
+        )
+        for i in range(3)
+    )
+
+    await service.job.schedule(job=second)
+    await service.job.schedule_many(jobs=[first, cancelled])
+    await service.commit()
+    await service.job.cancel(event_ids=[cancelled.event_id])
+    await service.commit()
+
+    assert await service.job.get_tracked(event_ids=[event.id]) == {event.id: ANY}
+    assert await service.job.claim_backlog(limit=1) == [first]
+    assert await service.job.claim_backlog(limit=10) == [second]
+    assert await service.job.claim_backlog(limit=10) == []
+
+    await service.job.complete(jobs=[first, second])
+
+    assert await service.job.get_tracked(event_ids=[event.id]) == {}
+    repository.job.upsert_many.assert_not_called()
+    repository.job.delete.assert_not_called()
+
+
+async def test_job_service_track_replaced_success(
+    mocker: MockerFixture,
+    service: Service,
+    redis: AsyncRedis,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "redis")
+
+    now = datetime.now(tz=pytz.utc)
+    sends = [
+        schema.Job(
+            type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=now + RelativeDelta(minutes=i),
+        )
+        for i in range(3)
+    ]
+    resend = schema.Job(
+        type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE,
+        event_id=event.id,
+        occurrence_id=occurrence.id,
+        eta=now,
+    )
+    # job tracked under its id the way it used to be
+    await redis.hset(
+        EVENT_JOBS_KEY.format(event_id=event.id),
+        str(sends[0].id),
+        sends[0].model_dump_json(),
+    )
+
+    for job in sends[1:]:
+        await service.job.schedule(job=job)
+    await service.job.schedule(job=resend)
+    await service.commit()
+
+    assert await redis.hlen(EVENT_JOBS_KEY.format(event_id=event.id)) == 2
+    tracked = await service.job.get_tracked(event_ids=[event.id])
+    assert {job.id for job in tracked[event.id]} == {sends[2].id, resend.id}
+
+    # a job that was already replaced doesn't stop the one that replaced it from being tracked
+    await service.job.revoke(jobs=[sends[1]])
+    await service.commit()
+
+    tracked = await service.job.get_tracked(event_ids=[event.id])
+    assert {job.id for job in tracked[event.id]} == {sends[2].id, resend.id}
+
+
+async def test_job_service_has_due_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    event: schema.Event,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+    job = schema.Job(type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE, event_id=event.id, eta=now)
+
+    mocker.patch.object(config.scheduler, "backend", "celery")
+    mocker.patch.object(tasks.send_notification_message_task, "apply_async", autospec=True)
+    mocker.patch.object(tasks.celery.control, "revoke", autospec=True)
+    overdue, future = (
+        job.model_copy(update={"id": uuid.uuid4(), "eta": now + RelativeDelta(minutes=minutes)})
+        for minutes in [-10, 10]
+    )
+    await service.job.schedule_many(jobs=[job, overdue, future])
+    await service.commit()
+    assert await service.job.has_due()
+    await service.job.finish(job_id=job.id)
+    assert not await service.job.has_due()
+
+    await service.job.schedule(job=job)
+    await service.commit()
+    assert await service.job.has_due()
+    await service.job.revoke(jobs=[job, future])
+    await service.commit()
+    assert not await service.job.has_due()
+
+    mocker.patch.object(config.scheduler, "backend", "postgres")
+    mocker.patch.object(repository.job, "exists", return_value=True, autospec=True)
+    assert await service.job.has_due()
+    assert repository.job.exists.await_args.kwargs["filter_"]["eta"] >= now
+
+    mocker.patch.object(config.scheduler, "backend", "redis")
+    assert not await service.job.has_due()
+    await service.job.schedule(job=job)
+    await service.commit()
+    assert await service.job.has_due()
+
+
+async def test_job_service_schedule_rolled_back_failure(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    job: schema.Job,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "redis")
+
+    with contextlib.suppress(ValueError):
+        async with repository.savepoint():
+            await service.job.schedule(job=job)
+            raise ValueError
+    await service.commit()
+
+    assert await service.job.get_tracked(event_ids=[job.event_id]) == {}
+    assert await service.job.claim(limit=10) == []
@@ -1,6 +1,9 @@
+import hashlib
+import uuid
 from datetime import datetime
-from functools import update_wrapper
+from functools import partial, update_wrapper
 
+import aiogram
 import pytz
 import ring
 from redis.asyncio import Redis as AsyncRedis
@@ -9,6 +12,22 @@ from app import schema
 from app.config import config
 from app.repository import Repository
 
+RENDERED_KEY = "occurrence_rendered:{occurrence_id}"
+SKIPPED_EDITS_KEY = "skipped_edits"
+
+# how long fingerprint of occurrence's message is kept, message is edited anyway once it's gone
+RENDERED_TTL = 24 * 60 * 60
+
+# stores ARGV[1] fingerprint under KEYS[1] for ARGV[2] seconds,
+# returns 0 and counts a skipped edit in KEYS[2] if it was already stored
+RENDER_SCRIPT = """
+if redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[2], "GET") == ARGV[1] then
+    redis.call("INCR", KEYS[2])
+    return 0
+end
+return 1
+"""
+
 
 class OccurrenceService:
     def __init__(self, repository: Repository, redis: AsyncRedis) -> None:
@@ -24,13 +43,54 @@ class OccurrenceService:
             self.get,
         )
 
+        self._render_script = redis.register_script(RENDER_SCRIPT)
+
     async def upsert(self, occurrence: schema.Occurrence) -> None:
         await self._repository.occurrence.upsert(occurrence=occurrence)
-        await self.get.delete(filter_=schema.OccurrenceGetFilter(id=occurrence.id))
+        self._repository.on_commit(
+            partial(self.get.delete, filter_=schema.OccurrenceGetFilter(id=occurrence.id)),
+        )
 
     async def get(self, filter_: schema.OccurrenceGetFilter) -> schema.Occurrence | None:
         return await self._repository.occurrence.get(filter_=filter_)
 
+    async def get_snapshot(
+        self,
+        filter_: schema.OccurrenceGetFilter,
+    ) -> schema.OccurrenceSnapshot | None:
+        """Get occurrence with its queue from the database, it's never cached."""
+        return await self._repository.occurrence.get_snapshot(filter_=filter_)
+
+    async def update_rendered(
+        self,
+        occurrence_id: uuid.UUID,
+        text: str,
+        reply_markup: aiogram.types.InlineKeyboardMarkup,
+    ) -> bool:
+        """Remember fingerprint of occurrence's message rendered with `text` and `reply_markup`.
+
+        Returns whether the message changed since it was last rendered, so that edits
+        that don't change it are skipped. Skipped edits are counted, see `get_skipped_edits`.
+        """
+        fingerprint = hashlib.blake2b(
+            (text + reply_markup.model_dump_json()).encode(),
+            digest_size=16,
+        ).digest()
+
+        return bool(
+            await self._render_script(
+                keys=[RENDERED_KEY.format(occurrence_id=occurrence_id), SKIPPED_EDITS_KEY],
+                args=[fingerprint, RENDERED_TTL],
+            ),
+        )
+
+    async def forget_rendered(self, occurrence_id: uuid.UUID) -> None:
+        """Forget fingerprint of occurrence's message after it failed to be edited."""
+        await self._redis.delete(RENDERED_KEY.format(occurrence_id=occurrence_id))
+
+    async def get_skipped_edits(self) -> int:
+        return int(await self._redis.get(SKIPPED_EDITS_KEY) or 0)
+
     def generate_notification_message_text(
         self,
         occurrence: schema.Occurrence,
@@ -7,6 +7,7 @@ import pytz
 from pytest_mock import MockerFixture
 
 from app import schema
+from app.keyboards import build_occurrence_keyboard
 from app.repository import Repository
 from app.service import Service
 from app.util.util import RelativeDelta
@@ -83,6 +84,7 @@ async def test_occurrence_service_get_by_id_cache_delete_on_upsert_success(
     result1 = await service.occurrence.get(filter_=filter_)
 
     await service.occurrence.upsert(occurrence=new_occurrence)
+    await service.commit()
 
     result2 = await service.occurrence.get(filter_=filter_)
 
@@ -96,6 +98,52 @@ async def test_occurrence_service_get_by_id_cache_delete_on_upsert_success(
     assert new_occurrence == result2
 
 
+async def test_occurrence_service_get_snapshot_not_cached_success(
+    mocker: MockerFixture,
+    service: Service,
+    repository: Repository,
+    occurrence: schema.Occurrence,
+    entry: schema.Entry,
+) -> None:
+    snapshot = schema.OccurrenceSnapshot(occurrence=occurrence, entries=[entry])
+    mocker.patch.object(
+        repository.occurrence,
+        "get_snapshot",
+        return_value=snapshot.model_copy(deep=True),
+        autospec=True,
+    )
+    filter_ = schema.OccurrenceGetFilter(id=occurrence.id)
+
+    assert await service.occurrence.get_snapshot(filter_=filter_) == snapshot
+    assert await service.occurrence.get_snapshot(filter_=filter_) == snapshot
+
+    assert repository.occurrence.get_snapshot.await_args_list == [call(filter_=filter_)] * 2
+
+
+async def test_occurrence_service_update_rendered_success(
+    service: Service,
+    occurrence: schema.Occurrence,
+) -> None:
+    reply_markup = build_occurrence_keyboard(occurrence_id=occurrence.id)
+
+    async def update_rendered(text: str) -> bool:
+        return await service.occurrence.update_rendered(
+            occurrence_id=occurrence.id,
+            text=text,
+            reply_markup=reply_markup,
+        )
+
+    assert await update_rendered(text="text") is True
+    assert await update_rendered(text="text") is False
+    assert await update_rendered(text="other text") is True
+    assert await service.occurrence.get_skipped_edits() == 1
+
+    await service.occurrence.forget_rendered(occurrence_id=occurrence.id)
+
+    assert await update_rendered(text="other text") is True
+    assert await service.occurrence.get_skipped_edits() == 1
+
+
 async def test_occurrence_service_generate_notification_message_text_success(
     service: Service,
     chat: schema.Chat,
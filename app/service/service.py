@@ -1,8 +1,12 @@
+import collections
+import logging
 import typing
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import numexpr
+import numpy as np
 import pytz
+from pydantic import ValidationError
 from redis.asyncio import Redis as AsyncRedis
 
 from app import schema
@@ -11,8 +15,22 @@ from app.repository import Repository
 from app.service.chat import ChatService
 from app.service.entry import EntryService
 from app.service.event import EventService
+from app.service.job import JobService
 from app.service.occurrence import OccurrenceService
-from app.util import RelativeDelta
+from app.util import RelativeDelta, compile_expression, linearize
+
+logger = logging.getLogger(__name__)
+
+PERIOD_UNITS_IN_SECONDS = {
+    "weeks": 7 * 24 * 60 * 60,
+    "days": 24 * 60 * 60,
+    "hours": 60 * 60,
+    "minutes": 60,
+    "seconds": 1,
+}
+
+MIN_BATCH_SIZE = 16
+MAX_BATCH_SIZE = 4096
 
 
 class Service:
@@ -23,6 +41,15 @@ class Service:
         self.event = EventService(repository=repository, redis=redis)
         self.occurrence = OccurrenceService(repository=repository, redis=redis)
         self.entry = EntryService(repository=repository)
+        self.job = JobService(repository=repository, redis=redis)
+
+    def on_commit(self, callback: typing.Callable[[], typing.Awaitable[None]]) -> None:
+        """Call `callback` once changes made so far are committed, see `Repository.on_commit`."""
+        self._repository.on_commit(callback)
+
+    async def commit(self) -> None:
+        """Commit changes made so far, see `Repository.commit`."""
+        await self._repository.commit()
 
     async def load_configuration(
         self,
@@ -30,19 +57,58 @@ class Service:
         configuration: schema.ConfigurationInput,
         configuration_raw: dict[str, typing.Any],
     ) -> None:
-        from app import tasks
+        """Load chat's configuration, only touching events that changed.
 
-        await self.event.delete(filter_=schema.EventDeleteFilter(chat_id=chat_id))
+        Stored event is kept together with its occurrences and scheduled jobs
+        if the new configuration still has the event input it was created from.
+        Other stored events are deleted and the rest of event inputs are created.
+        Nothing is changed if loading fails.
+        """
+        async with self._repository.savepoint():
+            await self._load_configuration(
+                chat_id=chat_id,
+                configuration=configuration,
+                configuration_raw=configuration_raw,
+            )
 
+    async def _load_configuration(
+        self,
+        chat_id: int,
+        configuration: schema.ConfigurationInput,
+        configuration_raw: dict[str, typing.Any],
+    ) -> None:
         chat = schema.Chat(
             id=chat_id,
             timezone=configuration.timezone,
+            catch_up_policy=configuration.catch_up_policy,
             config=configuration_raw,
         )
 
-        await self.chat.upsert(chat=chat)
+        stored_chat = await self.chat.get(filter_=schema.ChatGetFilter(id=chat_id))
+        stored_events = (
+            await self.event.get_many(filter_=schema.EventGetManyFilter(chat_id=chat_id))
+            if stored_chat is not None
+            else []
+        )
+
+        kept_events, deleted_events, created_inputs = self.diff_configuration(
+            configuration=configuration,
+            stored_configuration=self.parse_configuration(chat=stored_chat),
+            stored_events=stored_events,
+        )
 
-        for event_input in configuration.events:
+        if deleted_events:
+            event_ids = await self.event.delete(
+                filter_=schema.EventDeleteFilter(ids=[event.id for event in deleted_events]),
+            )
+            await self.job.cancel(event_ids=event_ids)
+
+        if chat != stored_chat:
+            await self.chat.upsert(chat=chat)
+            self.event.forget(ids=[event.id for event in kept_events])
+
+        events = []
+        for event_input in created_inputs:
             event = schema.Event(
                 chat=chat,
                 name=event_input.name,
@@ -54,15 +120,243 @@ class Service:
                 times_occurred=event_input.times_occurred,
             )
             event = self.update_event_next_date(event=event)
-            if event is None:
+            if event is not None:
+                events.append(event)
+
+        await self.event.upsert_many(events=events)
+
+        await self.job.schedule_many(
+            jobs=[
+                schema.Job(
+                    type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+                    event_id=event.id,
+                    times_occurred=event.times_occurred,
+                    eta=event.next_date - self.evaluate_event_offset(event=event),
+                )
+                for event in events
+            ],
+        )
+
+    async def recover_events(self, events: list[schema.Event]) -> int:
+        """Reschedule events whose notification was lost.
+
+        Notification is overdue if it had to be sent more than `config.catch_up.grace_period`
+        seconds ago. Overdue event is caught up with `catch_up_event` and its stale
+        jobs are revoked, so they are dropped if they ever come back.
+        Event that isn't overdue is rescheduled only if it has no tracked job due within
+        the grace period or later. Event waiting in the backlog is left as is.
+
+        Returns number of rescheduled events.
+        """
+        deadline = datetime.now(tz=pytz.utc) - RelativeDelta(seconds=config.catch_up.grace_period)
+        tracked = await self.job.get_tracked(event_ids=[event.id for event in events])
+
+        stale_jobs, updated_events, jobs = [], [], []
+        for event in events:
+            types = collections.defaultdict(list)
+            for job in tracked.get(event.id, []):
+                types[job.type].append(job)
+
+            if types[schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE]:
                 continue
+            send_jobs = types[schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE]
+
+            eta = event.next_date - self.evaluate_event_offset(event=event)
+            if eta < deadline:
+                stale_jobs.extend(job for job in send_jobs if job.eta < deadline)
+                if (caught_up := self.catch_up_event(event=event)) is None:
+                    continue
+                updated_event, job = caught_up
+                updated_events.append(updated_event)
+                jobs.append(job)
+            elif not any(job.eta >= deadline for job in send_jobs):
+                jobs.append(
+                    schema.Job(
+                        type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+                        event_id=event.id,
+                        times_occurred=event.times_occurred,
+                        eta=eta,
+                    ),
+                )
+
+        await self.job.revoke(jobs=stale_jobs)
+        await self.event.upsert_many(events=updated_events)
+        await self.job.schedule_many(jobs=jobs)
+
+        return len(jobs)
+
+    def get_catch_up_policy(self, chat: schema.Chat) -> schema.CatchUpPolicyEnum:
+        """Get chat's catch-up policy, `config.catch_up.policy` is used if chat has none."""
+        return chat.catch_up_policy or schema.CatchUpPolicyEnum(config.catch_up.policy)
+
+    def is_event_overdue(self, event: schema.Event) -> bool:
+        """Check whether event's notification is due for more than grace period.
+
+        Grace period is set with `config.catch_up.grace_period` in seconds.
+        """
+        deadline = datetime.now(tz=pytz.utc) - RelativeDelta(seconds=config.catch_up.grace_period)
+        return event.next_date - self.evaluate_event_offset(event=event) < deadline
 
-            tasks.send_notification_message_task.apply_async(
-                kwargs={"event_id": event.id},
-                eta=event.next_date - self.evaluate_event_offset(event=event),
-            )
+    def catch_up_event(self, event: schema.Event) -> tuple[schema.Event, schema.Job] | None:
+        """Catch up overdue event according to chat's catch-up policy.
+
+        `skip` policy updates event with `update_event_next_date` and returns
+        notification job for the next occurrence.
+        `latest` policy skips every missed occurrence but the latest one and
+        `all` policy keeps event as is, both return catch-up job that sends
+        missed notification once the backlog is drained, see `step_caught_up_event`.
 
-            await self.event.upsert(event=event)
+        Returns `None` if event will never occur again, its missed notifications are skipped then.
+        """
+        next_event = self.update_event_next_date(event=event.model_copy())
+        if next_event is None:
+            return None
+
+        match self.get_catch_up_policy(chat=event.chat):
+            case schema.CatchUpPolicyEnum.SKIP:
+                return next_event, schema.Job(
+                    type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+                    event_id=next_event.id,
+                    times_occurred=next_event.times_occurred,
+                    eta=next_event.next_date - self.evaluate_event_offset(event=next_event),
+                )
+            case schema.CatchUpPolicyEnum.LATEST:
+                self.skip_event_occurrences(
+                    event=event,
+                    count=next_event.times_occurred - event.times_occurred - 1,
+                    ts=next_event.next_date,
+                )
+
+        return event, schema.Job(
+            type=schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=datetime.now(tz=pytz.utc),
+        )
+
+    def step_caught_up_event(self, event: schema.Event) -> tuple[schema.Event, schema.Job] | None:
+        """Move caught up event past the occurrence whose missed notification was sent.
+
+        With `all` policy event steps to the next occurrence and gets another catch-up job
+        if that one is overdue as well. Otherwise event is updated with `update_event_next_date`.
+
+        Returns `None` if event will never occur again.
+        """
+        if self.get_catch_up_policy(chat=event.chat) == schema.CatchUpPolicyEnum.ALL:
+            if not (periodicity := self.evaluate_event_periodicity(event=event)):
+                return None
+
+            event.next_date += periodicity
+            event.times_occurred += 1
+
+            if self.is_event_overdue(event=event):
+                return event, schema.Job(
+                    type=schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE,
+                    event_id=event.id,
+                    eta=datetime.now(tz=pytz.utc),
+                )
+        elif (updated_event := self.update_event_next_date(event=event)) is None:
+            return None
+        else:
+            event = updated_event
+
+        return event, schema.Job(
+            type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            times_occurred=event.times_occurred,
+            eta=event.next_date - self.evaluate_event_offset(event=event),
+        )
+
+    def skip_event_occurrences(self, event: schema.Event, count: int, ts: datetime) -> None:
+        """Skip exactly `count` occurrences of event, every one of them has to be due by `ts`.
+
+        Occurrences are skipped the same way `update_event_next_date` skips them.
+        """
+        start = event.times_occurred
+
+        self.jump_event_next_date(event=event, ts=ts, count=count)
+        self.advance_event_next_date(
+            event=event,
+            ts=ts,
+            limit=count - (event.times_occurred - start),
+        )
+        while event.times_occurred - start < count:
+            if not (periodicity := self.evaluate_event_periodicity(event=event)):
+                return
+
+            event.next_date += periodicity
+            event.times_occurred += 1
+
+    @staticmethod
+    def parse_configuration(chat: schema.Chat | None) -> schema.ConfigurationInput | None:
+        """Parse configuration stored in `chat.config`.
+
+        Returns `None` if there is no chat or its configuration is no longer valid.
+        """
+        if chat is None:
+            return None
+
+        try:
+            return schema.ConfigurationInput.model_validate(obj=chat.config)
+        except ValidationError:
+            return None
+
+    @classmethod
+    def diff_configuration(
+        cls,
+        configuration: schema.ConfigurationInput,
+        stored_configuration: schema.ConfigurationInput | None,
+        stored_events: list[schema.Event],
+    ) -> tuple[list[schema.Event], list[schema.Event], list[schema.EventInput]]:
+        """Diff new `configuration` against the stored one.
+
+        Stored event is matched to the stored event input by fields that never change
+        after the event is created, event input's `times_occurred` is matched as is.
+
+        Returns a tuple of kept events, deleted events and event inputs to create.
+        """
+        events_by_key = collections.defaultdict(list)
+        for event in stored_events:
+            events_by_key[cls._get_event_key(event=event)].append(event)
+
+        inputs_count = collections.Counter(
+            cls._get_event_input_key(event_input=event_input)
+            for event_input in configuration.events
+        )
+
+        kept_events = []
+        kept_count: collections.Counter[tuple[typing.Any, ...]] = collections.Counter()
+        for event_input in stored_configuration.events if stored_configuration else []:
+            key = cls._get_event_input_key(event_input=event_input)
+            events = events_by_key[cls._get_event_key(event=event_input)]
+            if kept_count[key] < inputs_count[key] and events:
+                kept_count[key] += 1
+                kept_events.append(events.pop())
+
+        created_inputs = []
+        for event_input in configuration.events:
+            key = cls._get_event_input_key(event_input=event_input)
+            if kept_count[key] > 0:
+                kept_count[key] -= 1
+            else:
+                created_inputs.append(event_input)
+
+        deleted_events = [event for events in events_by_key.values() for event in events]
+
+        return kept_events, deleted_events, created_inputs
+
+    @staticmethod
+    def _get_event_key(event: schema.Event | schema.EventInput) -> tuple[typing.Any, ...]:
+        return (
+            event.name,
+            event.description,
+            event.initial_date,
+            event.periodicity.model_dump_json() if event.periodicity else None,
+            event.offset.model_dump_json() if event.offset else None,
+        )
+
+    @classmethod
+    def _get_event_input_key(cls, event_input: schema.EventInput) -> tuple[typing.Any, ...]:
+        return (*cls._get_event_key(event=event_input), event_input.times_occurred)
 
     def update_event_next_date(self, event: schema.Event) -> schema.Event | None:
         """Update event's `next_date` to be the closest possible occurrence date.
@@ -70,20 +364,203 @@ class Service:
         Returns `None` if an event will never occur again,
         which is when `periodicity` is `None` and `next_date` already passed
         or `periodicity` end up being outside of the allowed range.
+        `None` is also returned if catching up takes more than `config.max_catch_up_steps`
+        steps, which can only happen for periodicity rules that can't be jumped ahead.
 
         Else `schema.Event` object is returned.
         """
         ts = datetime.now(tz=pytz.utc) + RelativeDelta(seconds=30)
 
+        self.jump_event_next_date(event=event, ts=ts)
+
+        steps = self.advance_event_next_date(
+            event=event,
+            ts=ts,
+            limit=config.max_catch_up_steps,
+        )
         while event.next_date <= ts + self.evaluate_event_offset(event=event):
             if not (periodicity := self.evaluate_event_periodicity(event=event)):
                 return None
 
+            if steps >= config.max_catch_up_steps:
+                logger.warning(
+                    "can't update next date: event with id: %s is too far behind.",
+                    str(event.id),
+                )
+                return None
+
             event.next_date += periodicity
             event.times_occurred += 1
+            steps += 1
 
         return event
 
+    def jump_event_next_date(
+        self,
+        event: schema.Event,
+        ts: datetime,
+        count: int | None = None,
+    ) -> None:
+        """Advance event's `next_date` without evaluating every period in between.
+
+        Works only for events with periodicity linear in `t` (`a + b * t`) and
+        without `years` and `months` rules. Every skipped occurrence is guaranteed to satisfy
+        the same condition `update_event_next_date` checks, so the result of stepping
+        from here on is identical to stepping from the start.
+        No more than `count` occurrences are skipped if it's given.
+
+        Event is left untouched if its periodicity can't be jumped ahead.
+        """
+        if not event.periodicity:
+            return
+
+        if (periodicity := self.linearize_period(period=event.periodicity)) is None:
+            return
+
+        # lowest offset any of the skipped occurrences can have
+        if event.offset and self.is_constant_period(period=event.offset):
+            limit = ts + self.evaluate_event_offset(event=event)
+        else:
+            limit = ts + min(config.min_offset, RelativeDelta())
+
+        if event.next_date > limit:
+            return
+
+        a, b = periodicity
+        t = event.times_occurred
+        p = a + b * t
+
+        min_s, max_s = config.min_periodicity.s, config.max_periodicity.s
+        if not (min_s <= p <= max_s):
+            return
+
+        # every occurrence after `last` is either past the limit or has periodicity
+        # outside of the allowed range, so it must be handled by stepping
+        last = int((limit - event.next_date).total_seconds()) // min_s
+        if b > 0:
+            last = min(last, (max_s - p) // b)
+        elif b < 0:
+            last = min(last, (p - min_s) // -b)
+        if count is not None:
+            last = min(last, count - 1)
+
+        def elapsed(k: int) -> int:
+            return k * p + b * k * (k - 1) // 2
+
+        # far away occurrences are rejected before they can overflow `datetime`
+        horizon = (limit - event.next_date).total_seconds() + 1
+
+        def is_skipped(k: int) -> bool:
+            seconds = elapsed(k)
+            return seconds <= horizon and event.next_date + RelativeDelta(seconds=seconds) <= limit
+
+        lo, hi = 0, last + 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if is_skipped(mid):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        event.next_date += RelativeDelta(seconds=elapsed(lo))
+        event.times_occurred += lo
+
+    def advance_event_next_date(self, event: schema.Event, ts: datetime, limit: int) -> int:
+        """Advance event's `next_date` evaluating periodicity and offset in batches.
+
+        Periods are evaluated for a growing range of `t` at once and summed up, so only
+        occurrences without `years` and `months` rules can be advanced this way.
+        Stops right before the first occurrence `update_event_next_date` has to handle
+        by itself: the one that is not in the past, has periodicity outside of the allowed
+        range or that can't be evaluated in seconds.
+
+        Returns number of skipped occurrences, which is never greater than `limit`.
+        """
+        if not event.periodicity or event.next_date > ts + self.evaluate_event_offset(event=event):
+            return 0
+
+        steps, size = 0, MIN_BATCH_SIZE
+        while steps < limit:
+            size = min(size, limit - steps)
+            t = np.arange(event.times_occurred, event.times_occurred + size, dtype=np.int64)
+
+            periodicity = self.evaluate_period_seconds(
+                period=self.evaluate_period_batch(period=event.periodicity, t=t),
+            )
+            offset = np.zeros(size)
+            if event.offset:
+                offset = self.evaluate_period_seconds(
+                    period=self.evaluate_period_batch(period=event.offset, t=t),
+                )
+                offset = np.where(
+                    (config.min_offset.s <= offset) & (offset <= config.max_offset.s),
+                    offset,
+                    np.where(np.isnan(offset), offset, 0),
+                )
+
+            elapsed = np.concatenate(([0], np.cumsum(periodicity[:-1])))
+            threshold = (ts - event.next_date) // timedelta(seconds=1)
+
+            taken = (
+                (config.min_periodicity.s <= periodicity)
+                & (periodicity <= config.max_periodicity.s)
+                & ~np.isnan(offset)
+                & (elapsed - offset <= threshold)
+            )
+            count = size if taken.all() else int(np.argmin(taken))
+
+            event.next_date += RelativeDelta(seconds=int(periodicity[:count].sum()))
+            event.times_occurred += count
+            steps += count
+
+            if count < size:
+                break
+
+            size = min(size * 2, MAX_BATCH_SIZE)
+
+        return steps
+
+    @staticmethod
+    def linearize_period(period: schema.Period) -> tuple[int, int] | None:
+        """Represent `schema.Period` object as `a + b * t` number of seconds.
+
+        Returns `None` if any of the rules is not linear in `t`, has non-integer coefficients
+        or if `years` or `months` rules are used.
+        """
+        a, b = 0, 0
+        for key, value in period.model_dump().items():
+            if value is None:
+                continue
+
+            if (linear := linearize(value)) is None:
+                return None
+
+            x, y = linear
+            if y == 0:
+                x = round(x)
+            elif not (float(x).is_integer() and float(y).is_integer()):
+                return None
+
+            if key not in PERIOD_UNITS_IN_SECONDS:
+                if x != 0 or y != 0:
+                    return None
+                continue
+
+            a += int(x) * PERIOD_UNITS_IN_SECONDS[key]
+            b += int(y) * PERIOD_UNITS_IN_SECONDS[key]
+
+        return a, b
+
+    @staticmethod
+    def is_constant_period(period: schema.Period) -> bool:
+        """Check whether `schema.Period` object evaluates to the same value for any `t`."""
+        for value in period.model_dump().values():
+            if value is None:
+                continue
+            if (linear := linearize(value)) is None or linear[1] != 0:
+                return False
+        return True
+
     def evaluate_event_periodicity(self, event: schema.Event) -> RelativeDelta | None:
         """Evaluate `util.RelativeDelta` object for next event occurrance.
 
@@ -119,15 +596,43 @@ class Service:
         return offset
 
     @staticmethod
-    def evaluate_period(period: schema.Period, t: int) -> RelativeDelta:
-        """Evaluate `schema.Period` object with `t` and `n` variables. Where `n = t + 1`.
+    def evaluate_period_batch(period: schema.Period, t: np.ndarray) -> dict[str, np.ndarray]:
+        """Evaluate `schema.Period` object for every value of `t` array. Where `n = t + 1`.
 
-        Returns `util.RelativeDelta` object.
+        Every rule is evaluated by `numexpr` once for the whole array.
+
+        Returns dictionary with an array of rounded values for every `schema.Period` field,
+        fields without rules are filled with zeros. Values that can't be rounded are `nan`.
         """
 
-        def evaluate(ex: str | None) -> int:
+        def evaluate(ex: str | None) -> np.ndarray:
             if ex is None:
-                return 0
-            return round(numexpr.evaluate(ex, {"t": t, "n": t + 1}, {}).item())
+                return np.zeros(t.shape)
+            values = numexpr.evaluate(ex, {"t": t, "n": t + 1}, {}).astype(np.float64)
+            values = np.where(np.isfinite(values), values, np.nan)
+            return np.broadcast_to(np.rint(values), t.shape)
+
+        return {key: evaluate(getattr(period, key)) for key in schema.Period.model_fields}
+
+    @staticmethod
+    def evaluate_period_seconds(period: dict[str, np.ndarray]) -> np.ndarray:
+        """Convert evaluated `schema.Period` fields to number of seconds.
+
+        Values that use `years` or `months` can't be converted and are `nan`.
+        """
+        seconds = sum(period[key] * unit for key, unit in PERIOD_UNITS_IN_SECONDS.items())
+        return np.where((period["years"] == 0) & (period["months"] == 0), seconds, np.nan)
+
+    @staticmethod
+    def evaluate_period(period: schema.Period, t: int) -> RelativeDelta:
+        """Evaluate `schema.Period` object with `t` and `n` variables. Where `n = t + 1`.
 
-        return RelativeDelta(**{key: evaluate(value) for key, value in period.model_dump().items()})
+        Returns `util.RelativeDelta` object.
+        """
+        return RelativeDelta(
+            **{
+                key: round(compile_expression(value)(t))
+                for key in schema.Period.model_fields
+                if (value := getattr(period, key)) is not None
+            },
+        )
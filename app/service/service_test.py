@@ -1,12 +1,15 @@
+import copy
 import uuid
 from datetime import datetime
-from unittest.mock import call
+from unittest.mock import ANY, call
 
+import numpy as np
 import pytest
 import pytz
 from pytest_mock import MockerFixture
 
 from app import schema, tasks
+from app.config import config
 from app.service import Service
 from app.util import RelativeDelta
 
@@ -14,9 +17,12 @@ from app.util import RelativeDelta
 @pytest.fixture
 def load_configuration_mocks(mocker: MockerFixture, service: Service) -> None:
     mocker.patch.object(tasks.send_notification_message_task, "apply_async", autospec=True)
-    mocker.patch.object(service.event, "delete", autospec=True)
+    mocker.patch.object(service.chat, "get", return_value=None, autospec=True)
+    mocker.patch.object(service.event, "get_many", return_value=[], autospec=True)
+    mocker.patch.object(service.event, "delete", return_value=[], autospec=True)
+    mocker.patch.object(service.job, "cancel", autospec=True)
     mocker.patch.object(service.chat, "upsert", autospec=True)
-    mocker.patch.object(service.event, "upsert", autospec=True)
+    mocker.patch.object(service.event, "upsert_many", autospec=True)
 
 
 async def test_service_load_configuration_success(
@@ -71,28 +77,384 @@ async def test_service_load_configuration_success(
         configuration=configuration,
         configuration_raw=configuration_raw,
     )
+    await service.commit()
 
-    service.event.delete.assert_called_once_with(
-        filter_=schema.EventDeleteFilter(chat_id=chat_id),
-    )
+    service.chat.get.assert_awaited_once_with(filter_=schema.ChatGetFilter(id=chat_id))
+    service.event.get_many.assert_not_called()
+    service.event.delete.assert_not_called()
+    service.job.cancel.assert_not_called()
     service.chat.upsert.assert_called_once_with(chat=chat)
     tasks.send_notification_message_task.apply_async.assert_has_calls(
         [
             call(
-                kwargs={"event_id": event_id},
+                kwargs={"event_id": event_id, "times_occurred": 0},
                 eta=good_event.initial_date - RelativeDelta(days=1),
+                task_id=str(event_id),
+                producer=ANY,
+            ),
+        ],
+    )
+    service.event.upsert_many.assert_called_once_with(
+        events=[
+            schema.Event(
+                id=event_id,
+                chat=chat,
+                name=good_event.name,
+                initial_date=good_event.initial_date,
+                next_date=good_event.initial_date,
+                offset=good_event.offset,
             ),
         ],
     )
-    service.event.upsert.assert_called_once_with(
-        event=schema.Event(
-            id=event_id,
+
+
+async def test_service_load_configuration_diff_success(
+    load_configuration_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    chat: schema.Chat,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+
+    configuration_raw = {
+        "events": [
+            {
+                "name": "kept",
+                "initial_date": (now + RelativeDelta(days=1)).strftime(config.date_format),
+            },
+            {
+                "name": "changed",
+                "initial_date": (now + RelativeDelta(days=2)).strftime(config.date_format),
+            },
+        ],
+    }
+    stored_configuration = schema.ConfigurationInput.model_validate(obj=configuration_raw)
+    kept_input, changed_input = stored_configuration.events
+    stored_chat = chat.model_copy(update={"config": configuration_raw}, deep=True)
+
+    kept_event = schema.Event(
+        chat=stored_chat,
+        name=kept_input.name,
+        initial_date=kept_input.initial_date,
+        next_date=kept_input.initial_date,
+    )
+    changed_event = schema.Event(
+        chat=stored_chat,
+        name=changed_input.name,
+        initial_date=changed_input.initial_date,
+        next_date=changed_input.initial_date,
+    )
+
+    service.chat.get.return_value = stored_chat
+    service.event.get_many.return_value = [kept_event, changed_event]
+    service.event.delete.return_value = [changed_event.id]
+
+    await service.load_configuration(
+        chat_id=stored_chat.id,
+        configuration=stored_configuration,
+        configuration_raw=stored_chat.config,
+    )
+    await service.commit()
+
+    service.event.delete.assert_not_called()
+    service.chat.upsert.assert_not_called()
+    service.event.upsert_many.assert_awaited_once_with(events=[])
+    tasks.send_notification_message_task.apply_async.assert_not_called()
+
+    configuration_raw = copy.deepcopy(configuration_raw)
+    configuration_raw["events"][1]["times_occurred"] = 1
+    configuration = schema.ConfigurationInput.model_validate(obj=configuration_raw)
+    new_input = configuration.events[1]
+
+    await service.load_configuration(
+        chat_id=stored_chat.id,
+        configuration=configuration,
+        configuration_raw=configuration_raw,
+    )
+    await service.commit()
+
+    service.event.delete.assert_awaited_once_with(
+        filter_=schema.EventDeleteFilter(ids=[changed_event.id]),
+    )
+    service.job.cancel.assert_awaited_once_with(event_ids=[changed_event.id])
+    service.chat.upsert.assert_awaited_once()
+    (event,) = service.event.upsert_many.await_args.kwargs["events"]
+    assert event.name == new_input.name
+    assert event.times_occurred == 1
+    tasks.send_notification_message_task.apply_async.assert_called_once()
+
+
+async def test_service_recover_events_success(
+    mocker: MockerFixture,
+    service: Service,
+    chat: schema.Chat,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+    chat.catch_up_policy = schema.CatchUpPolicyEnum.SKIP
+
+    def build_event(next_date: datetime, periodicity: schema.Period | None) -> schema.Event:
+        return schema.Event(
             chat=chat,
-            name=good_event.name,
-            initial_date=good_event.initial_date,
-            next_date=good_event.initial_date,
-            offset=good_event.offset,
-        ),
+            name="Test",
+            initial_date=next_date,
+            next_date=next_date,
+            periodicity=periodicity,
+        )
+
+    def build_job(event: schema.Event, job_type: schema.JobTypeEnum) -> schema.Job:
+        return schema.Job(type=job_type, event_id=event.id, eta=event.next_date)
+
+    hour_ago, minute_ago = now - RelativeDelta(hours=1), now - RelativeDelta(minutes=1)
+    overdue = build_event(next_date=hour_ago, periodicity=schema.Period(days="1"))
+    overdue_once = build_event(next_date=hour_ago, periodicity=None)
+    pending = build_event(next_date=minute_ago, periodicity=None)
+    lost = build_event(next_date=now + RelativeDelta(hours=1), periodicity=None)
+
+    stale_job = build_job(event=overdue, job_type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE)
+    resend_job = build_job(event=overdue, job_type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE)
+    pending_job = build_job(event=pending, job_type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE)
+
+    mocker.patch.object(
+        service.job,
+        "get_tracked",
+        return_value={overdue.id: [stale_job, resend_job], pending.id: [pending_job]},
+        autospec=True,
+    )
+    mocker.patch.object(service.job, "revoke", autospec=True)
+    mocker.patch.object(service.job, "schedule_many", autospec=True)
+    mocker.patch.object(service.event, "upsert_many", autospec=True)
+
+    events = [overdue, overdue_once, pending, lost]
+    assert await service.recover_events(events=[event.model_copy() for event in events]) == 2
+
+    service.job.get_tracked.assert_awaited_once_with(event_ids=[event.id for event in events])
+    service.job.revoke.assert_awaited_once_with(jobs=[stale_job])
+
+    (updated,) = service.event.upsert_many.await_args.kwargs["events"]
+    assert updated.id == overdue.id
+    assert updated.next_date == overdue.next_date + RelativeDelta(days=1)
+    assert updated.times_occurred == 1
+
+    jobs = service.job.schedule_many.await_args.kwargs["jobs"]
+    assert [(job.event_id, job.eta) for job in jobs] == [
+        (overdue.id, updated.next_date),
+        (lost.id, lost.next_date),
+    ]
+
+
+async def test_service_recover_events_catch_up_success(
+    mocker: MockerFixture,
+    service: Service,
+    chat: schema.Chat,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+    next_date = now - RelativeDelta(hours=1)
+
+    overdue, waiting = (
+        schema.Event(
+            chat=chat,
+            name="Test",
+            initial_date=next_date,
+            next_date=next_date,
+            periodicity=schema.Period(minutes="25"),
+        )
+        for _ in range(2)
+    )
+    catch_up_job = schema.Job(
+        type=schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE,
+        event_id=waiting.id,
+        eta=now,
+    )
+
+    mocker.patch.object(
+        service.job,
+        "get_tracked",
+        return_value={waiting.id: [catch_up_job]},
+        autospec=True,
+    )
+    mocker.patch.object(service.job, "revoke", autospec=True)
+    mocker.patch.object(service.job, "schedule_many", autospec=True)
+    mocker.patch.object(service.event, "upsert_many", autospec=True)
+
+    events = [overdue, waiting]
+    assert await service.recover_events(events=[event.model_copy() for event in events]) == 1
+
+    (updated,) = service.event.upsert_many.await_args.kwargs["events"]
+    assert updated.id == overdue.id
+    assert updated.next_date == overdue.next_date + RelativeDelta(minutes=50)
+    assert updated.times_occurred == 2
+
+    (job,) = service.job.schedule_many.await_args.kwargs["jobs"]
+    assert job.type == schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE
+    assert job.event_id == overdue.id
+
+
+@pytest.mark.parametrize(
+    ("policy", "job_type", "times_occurred"),
+    [
+        (schema.CatchUpPolicyEnum.SKIP, schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE, 7),
+        (schema.CatchUpPolicyEnum.LATEST, schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE, 6),
+        (schema.CatchUpPolicyEnum.ALL, schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE, 0),
+    ],
+)
+@pytest.mark.parametrize(
+    "periodicity",
+    [schema.Period(hours="1"), schema.Period(hours="1", minutes="0 * sin(t)")],
+)
+def test_service_catch_up_event(
+    service: Service,
+    event: schema.Event,
+    policy: schema.CatchUpPolicyEnum,
+    job_type: schema.JobTypeEnum,
+    times_occurred: int,
+    periodicity: schema.Period,
+) -> None:
+    start = datetime.now(tz=pytz.utc) - RelativeDelta(hours=6, minutes=30)
+    event.chat.catch_up_policy = policy
+    event.next_date, event.periodicity, event.offset = start, periodicity, None
+    event.times_occurred = 0
+
+    caught_up = service.catch_up_event(event=event)
+
+    assert caught_up is not None
+    updated, job = caught_up
+    assert updated.times_occurred == times_occurred
+    assert updated.next_date == start + RelativeDelta(hours=times_occurred)
+    assert job.type == job_type
+    assert job.event_id == event.id
+
+
+def test_service_catch_up_event_latest_months(service: Service, event: schema.Event) -> None:
+    now = datetime.now(tz=pytz.utc)
+    event.chat.catch_up_policy = schema.CatchUpPolicyEnum.LATEST
+    event.next_date = datetime(now.year - 1, 1, 31, tzinfo=pytz.utc)
+    event.periodicity, event.offset, event.times_occurred = schema.Period(months="1"), None, 0
+
+    latest = event.model_copy()
+    while (periodicity := service.evaluate_event_periodicity(event=latest)) is not None and (
+        latest.next_date + periodicity <= now
+    ):
+        latest.next_date += periodicity
+        latest.times_occurred += 1
+
+    caught_up = service.catch_up_event(event=event)
+
+    assert caught_up is not None
+    assert caught_up[0] == latest
+
+
+def test_service_catch_up_event_once(service: Service, event: schema.Event) -> None:
+    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(hours=1)
+    event.periodicity = None
+
+    assert service.catch_up_event(event=event) is None
+
+
+@pytest.mark.parametrize(
+    ("policy", "job_type", "times_occurred"),
+    [
+        (schema.CatchUpPolicyEnum.LATEST, schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE, 3),
+        (schema.CatchUpPolicyEnum.ALL, schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE, 1),
+    ],
+)
+def test_service_step_caught_up_event(
+    mocker: MockerFixture,
+    service: Service,
+    event: schema.Event,
+    policy: schema.CatchUpPolicyEnum,
+    job_type: schema.JobTypeEnum,
+    times_occurred: int,
+) -> None:
+    mocker.patch.object(config.catch_up, "policy", policy.value)
+    event.chat.catch_up_policy = None
+    start = datetime.now(tz=pytz.utc) - RelativeDelta(hours=2, minutes=30)
+    event.next_date, event.periodicity, event.offset = start, schema.Period(hours="1"), None
+    event.times_occurred = 0
+
+    caught_up = service.step_caught_up_event(event=event)
+
+    assert caught_up is not None
+    updated, job = caught_up
+    assert updated.times_occurred == times_occurred
+    assert updated.next_date == start + RelativeDelta(hours=times_occurred)
+    assert job.type == job_type
+    if job_type == schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE:
+        assert job.eta == updated.next_date
+
+
+def test_service_diff_configuration(service: Service, chat: schema.Chat) -> None:
+    now = datetime.now(tz=pytz.utc)
+
+    first = schema.EventInput(name="first", initial_date=now, periodicity=schema.Period(days="1"))
+    second = schema.EventInput(name="second", initial_date=now)
+    stored_configuration = schema.ConfigurationInput(events=[first, first, second])
+
+    first_events = [
+        schema.Event(
+            chat=chat,
+            name=first.name,
+            initial_date=first.initial_date,
+            next_date=now + RelativeDelta(days=i),
+            periodicity=first.periodicity,
+            times_occurred=i,
+        )
+        for i in range(1, 3)
+    ]
+    second_event = schema.Event(
+        chat=chat,
+        name=second.name,
+        initial_date=second.initial_date,
+        next_date=second.initial_date,
+    )
+    stored_events = [*first_events, second_event]
+
+    assert service.diff_configuration(
+        configuration=stored_configuration,
+        stored_configuration=stored_configuration,
+        stored_events=stored_events,
+    ) == ([first_events[1], first_events[0], second_event], [], [])
+
+    second_changed = second.model_copy(update={"description": "description"})
+    configuration = schema.ConfigurationInput(events=[second_changed, first])
+
+    assert service.diff_configuration(
+        configuration=configuration,
+        stored_configuration=stored_configuration,
+        stored_events=stored_events,
+    ) == ([first_events[1]], [first_events[0], second_event], [second_changed])
+
+    assert service.diff_configuration(
+        configuration=configuration,
+        stored_configuration=None,
+        stored_events=stored_events,
+    ) == ([], stored_events, configuration.events)
+
+
+def test_service_parse_configuration(service: Service, chat: schema.Chat) -> None:
+    configuration = schema.ConfigurationInput(
+        timezone="Europe/Kyiv",
+        events=[schema.EventInput(name="name", initial_date="03-10-2024 16:00:00 +0200")],
+    )
+
+    assert service.parse_configuration(chat=None) is None
+    assert (
+        service.parse_configuration(
+            chat=chat.model_copy(update={"config": {"timezone": "Europe/Kyiv", "events": [{}]}}),
+        )
+        is None
+    )
+    assert (
+        service.parse_configuration(
+            chat=chat.model_copy(
+                update={
+                    "config": {
+                        "timezone": "Europe/Kyiv",
+                        "events": [{"name": "name", "initial_date": "03-10-2024 16:00:00 +0200"}],
+                    },
+                },
+            ),
+        )
+        == configuration
     )
 
 
@@ -361,3 +723,252 @@ def test_service_evaluate_period(service: Service) -> None:
     for times_occurred, period, expected in cases:
         actual = service.evaluate_period(period=period, t=times_occurred)
         assert expected == actual
+
+
+def test_service_jump_event_next_date(service: Service, chat: schema.Chat) -> None:
+    ts = datetime(year=2024, month=11, day=18, hour=9, minute=40, second=0, tzinfo=pytz.utc)
+
+    cases = [
+        (
+            schema.Period(minutes="1"),
+            None,
+            ts - RelativeDelta(days=10),
+            (ts + RelativeDelta(minutes=1), 14401),
+        ),
+        (
+            schema.Period(minutes="1"),
+            schema.Period(minutes="5"),
+            ts - RelativeDelta(days=10),
+            (ts + RelativeDelta(minutes=6), 14406),
+        ),
+        (
+            schema.Period(minutes="1"),
+            schema.Period(minutes="t"),
+            ts - RelativeDelta(days=10),
+            (ts + RelativeDelta(minutes=1), 14401),
+        ),
+        (
+            schema.Period(minutes="n"),
+            None,
+            ts - RelativeDelta(minutes=10),
+            (ts + RelativeDelta(minutes=5), 5),
+        ),
+        (
+            schema.Period(hours="1"),
+            None,
+            ts + RelativeDelta(minutes=10),
+            (ts + RelativeDelta(minutes=10), 0),
+        ),
+        (
+            schema.Period(minutes="1 + t % 2"),
+            None,
+            ts - RelativeDelta(days=10),
+            (ts - RelativeDelta(days=10), 0),
+        ),
+        (
+            schema.Period(months="1"),
+            None,
+            ts - RelativeDelta(days=10),
+            (ts - RelativeDelta(days=10), 0),
+        ),
+        (
+            schema.Period(seconds="10"),
+            None,
+            ts - RelativeDelta(days=10),
+            (ts - RelativeDelta(days=10), 0),
+        ),
+    ]
+
+    for periodicity, offset, next_date, (expected_next_date, expected_times_occurred) in cases:
+        event = schema.Event(
+            chat=chat,
+            name="Test",
+            initial_date=next_date,
+            next_date=next_date,
+            periodicity=periodicity,
+            offset=offset,
+        )
+
+        service.jump_event_next_date(event=event, ts=ts)
+
+        assert event.next_date == expected_next_date
+        assert event.times_occurred == expected_times_occurred
+
+
+def test_service_update_event_next_date_jump_ahead_matches_stepping(
+    service: Service,
+    chat: schema.Chat,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+
+    cases = [
+        (schema.Period(minutes="1"), schema.Period(minutes="1 + 0 * (t % 2)"), None),
+        (schema.Period(minutes="n"), schema.Period(minutes="n + 0 * (t % 2)"), None),
+        (
+            schema.Period(hours="2", minutes="t"),
+            schema.Period(hours="2", minutes="t + 0 * (t % 2)"),
+            schema.Period(minutes="30"),
+        ),
+    ]
+
+    for linear, opaque, offset in cases:
+        event = schema.Event(
+            chat=chat,
+            name="Test",
+            initial_date=now - RelativeDelta(days=2),
+            next_date=now - RelativeDelta(days=2),
+            periodicity=linear,
+            offset=offset,
+        )
+        expected = service.update_event_next_date(
+            event=event.model_copy(update={"periodicity": opaque}, deep=True),
+        )
+        actual = service.update_event_next_date(event=event)
+
+        assert expected is not None
+        assert actual is not None
+        assert expected.next_date == actual.next_date
+        assert expected.times_occurred == actual.times_occurred
+
+
+def test_service_jump_event_next_date_long_periodicity(
+    service: Service,
+    chat: schema.Chat,
+) -> None:
+    now = datetime.now(tz=pytz.utc)
+
+    event = schema.Event(
+        chat=chat,
+        name="Test",
+        initial_date=now - RelativeDelta(years=2),
+        next_date=now - RelativeDelta(years=2),
+        periodicity=schema.Period(weeks="1"),
+        offset=schema.Period(minutes="5"),
+    )
+
+    service.jump_event_next_date(event=event, ts=now)
+
+    assert now < event.next_date <= now + RelativeDelta(weeks=1, minutes=5)
+    assert event.next_date == event.initial_date + RelativeDelta(weeks=event.times_occurred)
+
+
+def test_service_linearize_period(service: Service) -> None:
+    cases = [
+        (schema.Period(minutes="1"), (60, 0)),
+        (schema.Period(days="1", hours="-1"), (23 * 60 * 60, 0)),
+        (schema.Period(weeks="n", seconds="2 * t"), (7 * 24 * 60 * 60, 7 * 24 * 60 * 60 + 2)),
+        (schema.Period(minutes="1.4"), (60, 0)),
+        (schema.Period(years="0", months="0", minutes="1"), (60, 0)),
+        (schema.Period(minutes="t / 2"), None),
+        (schema.Period(minutes="t % 2"), None),
+        (schema.Period(months="1"), None),
+        (schema.Period(years="t"), None),
+    ]
+
+    for period, expected in cases:
+        assert service.linearize_period(period=period) == expected
+
+
+def test_service_is_constant_period(service: Service) -> None:
+    cases = [
+        (schema.Period(minutes="1"), True),
+        (schema.Period(years="1", months="2 * 3"), True),
+        (schema.Period(minutes="1", seconds="t"), False),
+        (schema.Period(minutes="t % 2"), False),
+    ]
+
+    for period, expected in cases:
+        assert service.is_constant_period(period=period) == expected
+
+
+def test_service_advance_event_next_date(service: Service, chat: schema.Chat) -> None:
+    ts = datetime(year=2024, month=11, day=18, hour=9, minute=40, second=0, tzinfo=pytz.utc)
+
+    cases = [
+        (
+            schema.Period(minutes="1 + 0 * (t % 2)"),
+            None,
+            ts - RelativeDelta(days=1),
+            10_000,
+            (ts + RelativeDelta(minutes=1), 1441),
+        ),
+        (
+            schema.Period(minutes="1 + t % 2"),
+            schema.Period(minutes="2 + 0 * (t % 2)"),
+            ts - RelativeDelta(minutes=30),
+            10_000,
+            (ts + RelativeDelta(minutes=3), 22),
+        ),
+        (
+            schema.Period(minutes="1 + 0 * (t % 2)"),
+            None,
+            ts - RelativeDelta(days=1),
+            100,
+            (ts - RelativeDelta(days=1) + RelativeDelta(minutes=100), 100),
+        ),
+        (
+            schema.Period(minutes="10 - t % 20"),
+            None,
+            ts - RelativeDelta(days=1),
+            10_000,
+            (ts - RelativeDelta(days=1) + RelativeDelta(minutes=55), 10),
+        ),
+        (
+            schema.Period(months="1 + 0 * (t % 2)"),
+            None,
+            ts - RelativeDelta(days=100),
+            10_000,
+            (ts - RelativeDelta(days=100), 0),
+        ),
+    ]
+
+    for periodicity, offset, next_date, limit, (expected_next_date, expected_times) in cases:
+        event = schema.Event(
+            chat=chat,
+            name="Test",
+            initial_date=next_date,
+            next_date=next_date,
+            periodicity=periodicity,
+            offset=offset,
+        )
+
+        steps = service.advance_event_next_date(event=event, ts=ts, limit=limit)
+
+        assert steps == expected_times
+        assert event.next_date == expected_next_date
+        assert event.times_occurred == expected_times
+
+
+def test_service_evaluate_period_batch(service: Service) -> None:
+    periods = [
+        schema.Period(days="4"),
+        schema.Period(days="2 + 3 * (n % 2)", minutes="t * 1.5"),
+        schema.Period(years="t + 1", months="n", weeks="t % 3", hours="where(t > 2, 1, 2)"),
+    ]
+    t = np.arange(10, dtype=np.int64)
+
+    for period in periods:
+        actual = service.evaluate_period_batch(period=period, t=t)
+
+        for i in range(len(t)):
+            assert RelativeDelta(**{key: int(value[i]) for key, value in actual.items()}) == (
+                service.evaluate_period(period=period, t=i)
+            )
+
+
+def test_service_evaluate_period_seconds(service: Service) -> None:
+    t = np.arange(3, dtype=np.int64)
+
+    actual = service.evaluate_period_seconds(
+        period=service.evaluate_period_batch(
+            period=schema.Period(days="1", minutes="t", seconds="n"),
+            t=t,
+        ),
+    )
+    assert actual.tolist() == [86401, 86462, 86523]
+
+    actual = service.evaluate_period_seconds(
+        period=service.evaluate_period_batch(period=schema.Period(months="t"), t=t),
+    )
+    assert actual[0] == 0
+    assert np.isnan(actual[1:]).all()
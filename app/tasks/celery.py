@@ -1,22 +1,143 @@
 import asyncio
+import contextvars
+import threading
 import typing
+from contextlib import asynccontextmanager
 
-from celery import Celery, Task
+import aiogram
+from celery import Celery, Task, signals
+from redis.asyncio import Redis as AsyncRedis
 
 from app.config import config
+from app.database import engine
+from app.dependencies import build_bot, get_repository
+from app.service import Service
+from app.tasks import serialization
+
+T = typing.TypeVar("T")
+
+# id of the task whose coroutine is running, `Task.request` is local to the pool's thread
+# and is empty on the `runtime` loop
+current_job_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_job_id",
+    default=None,
+)
+
+
+class WorkerRuntime:
+    """Event loop and async resources shared by all tasks of a worker process.
+
+    Started once per process on `worker_process_init` and stopped on shutdown, so tasks reuse
+    database connections, Redis connections and Bot's HTTP session instead of opening new ones.
+    Worker pools that don't fork processes start the runtime on the first task.
+
+    The loop runs in a thread of its own and `run` submits coroutines to it, so tasks
+    called from different threads of the `threads` pool run concurrently on the same loop.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    redis: AsyncRedis
+    bot: aiogram.Bot
+
+    def __init__(self) -> None:
+        self.is_started = False
+
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_started:
+                return
+
+            # connections inherited from the parent process must not be used by the child
+            engine.sync_engine.dispose(close=False)
+
+            self.loop = asyncio.new_event_loop()
+            self.redis = AsyncRedis(host=config.redis.host, port=config.redis.port)
+            self.bot = build_bot(redis=self.redis)
+
+            self._thread = threading.Thread(target=self._run_loop, name="runtime", daemon=True)
+            self._thread.start()
+            self.is_started = True
+
+    def stop(self) -> None:
+        with self._lock:
+            if not self.is_started or self._thread is None:
+                return
+
+            asyncio.run_coroutine_threadsafe(self._close(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+            self.is_started = False
+
+    def run(self, coro: typing.Coroutine[typing.Any, typing.Any, T]) -> T:
+        if not self.is_started:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    @asynccontextmanager
+    async def get_service(self) -> typing.AsyncGenerator[Service, None]:
+        async with get_repository() as repository:
+            yield Service(repository=repository, redis=self.redis)
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _close(self) -> None:
+        await self.bot.session.close()
+        await self.redis.aclose()
+        await engine.dispose()
+
+
+runtime = WorkerRuntime()
 
 
 class AsyncTask(Task):
-    """Allow running `async` celery tasks natively."""
+    """Allow running `async` celery tasks natively on the worker's `runtime` event loop."""
 
     def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:  # noqa: ANN401
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self.run(*args, **kwargs))
+        return runtime.run(self._run_as(job_id=self.request.id, coro=self.run(*args, **kwargs)))
+
+    @staticmethod
+    async def _run_as(
+        job_id: str | None,
+        coro: typing.Coroutine[typing.Any, typing.Any, T],
+    ) -> T:
+        """Run `coro` with `current_job_id` set to `job_id`.
+
+        It's set on the loop, tasks there copy the loop thread's context rather than the caller's.
+        """
+        current_job_id.set(job_id)
+        return await coro
+
+
+@signals.worker_process_init.connect
+def start_runtime(**_: object) -> None:
+    runtime.start()
+
+
+@signals.worker_process_shutdown.connect
+@signals.worker_shutdown.connect
+def stop_runtime(**_: object) -> None:
+    runtime.stop()
 
 
 celery = Celery(broker=config.rabbitmq_url, task_cls=AsyncTask)
 
-celery.conf.event_serializer = "pickle"
-celery.conf.task_serializer = "pickle"
-celery.conf.result_serializer = "pickle"
-celery.conf.accept_content = ["application/json", "application/x-python-serialize"]
+serialization.register_serializer()
+
+celery.conf.event_serializer = serialization.NAME
+celery.conf.task_serializer = serialization.NAME
+celery.conf.result_serializer = serialization.NAME
+# pickled messages are rejected, events they were scheduled for are rescheduled by `recovery`
+celery.conf.accept_content = [serialization.CONTENT_TYPE]
+celery.conf.result_accept_content = [serialization.CONTENT_TYPE]
+
+# with `threads` pool a single process runs many tasks at the same time on its `runtime` loop,
+# one per thread of the pool, see README for when to choose another pool
+celery.conf.worker_pool = config.worker.pool
+celery.conf.worker_concurrency = config.worker.concurrency
+celery.conf.worker_prefetch_multiplier = config.worker.prefetch_multiplier
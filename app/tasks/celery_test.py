@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+from pytest_mock import MockerFixture
+
+from app.config import config
+from app.tasks.celery import WorkerRuntime
+
+
+def test_worker_runtime_success(mocker: MockerFixture) -> None:
+    mocker.patch.object(config, "token", "42:TOKEN")
+    runtime = WorkerRuntime()
+
+    async def get_resources() -> tuple[object, ...]:
+        async with runtime.get_service() as service:
+            return asyncio.get_running_loop(), runtime.redis, runtime.bot, service.job._redis
+
+    first = runtime.run(get_resources())
+    second = runtime.run(get_resources())
+
+    assert all(a is b for a, b in zip(first, second, strict=True))
+    assert first[1] is first[3]
+
+    close_bot = mocker.spy(runtime.bot.session, "close")
+    close_redis = mocker.spy(runtime.redis, "aclose")
+    loop = runtime.loop
+
+    runtime.stop()
+    runtime.stop()
+
+    close_bot.assert_awaited_once()
+    close_redis.assert_awaited_once()
+    assert loop.is_closed()
+    assert not runtime.is_started
+
+
+def test_worker_runtime_concurrent_success(mocker: MockerFixture) -> None:
+    mocker.patch.object(config, "token", "42:TOKEN")
+    runtime = WorkerRuntime()
+    loops = []
+
+    async def wait() -> None:
+        loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(0.2)
+
+    threads = [threading.Thread(target=runtime.run, args=(wait(),)) for _ in range(10)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    runtime.stop()
+
+    assert elapsed < 1
+    assert len(loops) == len(threads)
+    assert all(loop is loops[0] for loop in loops)
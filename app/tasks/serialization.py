@@ -0,0 +1,56 @@
+"""Versioned msgpack format of Celery task, result and event messages.
+
+Every message is a msgpack array `[version, payload]`, UUIDs in the payload are stored
+as msgpack extension type `UUID_EXT_TYPE` with 16 raw bytes of the UUID.
+Unlike pickle, decoding a message never runs code of its producer.
+"""
+
+import typing
+import uuid
+
+import msgpack
+from kombu.serialization import register
+
+NAME = "periodic-queue-bot"
+CONTENT_TYPE = "application/x-periodic-queue-bot"
+VERSION = 1
+
+UUID_EXT_TYPE = 1
+
+
+def dumps(payload: typing.Any) -> bytes:  # noqa: ANN401
+    return msgpack.packb([VERSION, payload], default=_encode_ext, use_bin_type=True)
+
+
+def loads(message: bytes) -> typing.Any:  # noqa: ANN401
+    decoded = msgpack.unpackb(message, ext_hook=_decode_ext, raw=False)
+    if not isinstance(decoded, list) or len(decoded) != 2:
+        msg = "message is not a versioned payload"
+        raise ValueError(msg)
+
+    version, payload = decoded
+    if version != VERSION:
+        msg = f"unsupported message version: {version}"
+        raise ValueError(msg)
+
+    return payload
+
+
+def register_serializer() -> None:
+    register(NAME, dumps, loads, content_type=CONTENT_TYPE, content_encoding="binary")
+
+
+def _encode_ext(obj: object) -> msgpack.ExtType:
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, obj.bytes)
+
+    msg = f"object of type {type(obj).__name__} can't be serialized"
+    raise TypeError(msg)
+
+
+def _decode_ext(code: int, data: bytes) -> uuid.UUID:
+    if code == UUID_EXT_TYPE:
+        return uuid.UUID(bytes=data)
+
+    msg = f"unknown extension type: {code}"
+    raise ValueError(msg)
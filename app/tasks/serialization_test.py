@@ -0,0 +1,69 @@
+import uuid
+
+import msgpack
+import pytest
+from kombu.serialization import dumps, loads
+
+from app.tasks import celery, send_notification_message_task, serialization
+
+
+def test_serialization_roundtrip_success() -> None:
+    payload = {"event_id": uuid.uuid4(), "ids": [uuid.uuid4(), None], "count": 1, "name": "Name"}
+
+    message = serialization.dumps(payload)
+
+    assert serialization.loads(message) == payload
+    assert msgpack.unpackb(message)[0] == serialization.VERSION
+
+
+def test_serialization_uuid_as_bytes_success() -> None:
+    event_id = uuid.uuid4()
+
+    message = serialization.dumps(event_id)
+    ext = msgpack.unpackb(message)[1]
+
+    assert ext == msgpack.ExtType(serialization.UUID_EXT_TYPE, event_id.bytes)
+    # array header and version, extension header, uuid
+    assert len(message) == 2 + 2 + 16
+
+
+def test_serialization_unsupported_type_failure() -> None:
+    with pytest.raises(TypeError):
+        serialization.dumps(object())
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        msgpack.packb([serialization.VERSION + 1, {}]),
+        msgpack.packb({"event_id": "id"}),
+        msgpack.packb([serialization.VERSION, msgpack.ExtType(42, b"")]),
+    ],
+)
+def test_serialization_invalid_message_failure(message: bytes) -> None:
+    with pytest.raises(ValueError):  # noqa: PT011
+        serialization.loads(message)
+
+
+def test_serialization_celery_task_message_success() -> None:
+    event_id = uuid.uuid4()
+    message = celery.amqp.as_task_v2(
+        str(uuid.uuid4()),
+        send_notification_message_task.name,
+        kwargs={"event_id": event_id},
+    )
+
+    content_type, content_encoding, data = dumps(
+        message.body,
+        serializer=celery.conf.task_serializer,
+    )
+    args, kwargs, _ = loads(
+        data,
+        content_type,
+        content_encoding,
+        accept=celery.conf.accept_content,
+    )
+
+    assert content_type == serialization.CONTENT_TYPE
+    assert args == []
+    assert kwargs == {"event_id": event_id}
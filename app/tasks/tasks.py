@@ -1,37 +1,90 @@
 import contextlib
 import logging
+import typing
 import uuid
 
 import aiogram
 import aiogram.exceptions
 
 from app import schema
-from app.config import config
-from app.dependencies import get_service
 from app.keyboards import build_occurrence_keyboard
 from app.service import Service
-from app.tasks.celery import celery
+from app.tasks.celery import celery, current_job_id, runtime
 
 logger = logging.getLogger(__name__)
 
 
-@celery.task(serializer="pickle")
-async def send_notification_message_task(event_id: uuid.UUID) -> None:
-    async with get_service() as service, aiogram.Bot(token=config.token) as bot:
-        await send_notification_message(service=service, bot=bot, event_id=event_id)
+@celery.task
+async def send_notification_message_task(
+    event_id: uuid.UUID,
+    times_occurred: int | None = None,
+) -> None:
+    job_id = current_job_id.get()
+    async with runtime.get_service() as service, finishing_job(service=service, job_id=job_id):
+        if await is_job_revoked(service=service, job_id=job_id):
+            return
+
+        await send_notification_message(
+            service=service,
+            bot=runtime.bot,
+            event_id=event_id,
+            times_occurred=times_occurred,
+        )
 
 
-@celery.task(serializer="pickle")
+@celery.task
 async def resend_notification_message_task(occurrence_id: uuid.UUID) -> None:
-    async with get_service() as service, aiogram.Bot(token=config.token) as bot:
-        await resend_notification_message(service=service, bot=bot, occurrence_id=occurrence_id)
+    job_id = current_job_id.get()
+    async with runtime.get_service() as service, finishing_job(service=service, job_id=job_id):
+        if await is_job_revoked(service=service, job_id=job_id):
+            return
+
+        await resend_notification_message(
+            service=service,
+            bot=runtime.bot,
+            occurrence_id=occurrence_id,
+        )
+
+
+@contextlib.asynccontextmanager
+async def finishing_job(
+    service: Service,
+    job_id: uuid.UUID | str | None,
+) -> typing.AsyncGenerator[None, None]:
+    """Finish the job once its task has run, whether it succeeded or not."""
+    try:
+        yield
+    finally:
+        if job_id is not None:
+            await service.job.finish(job_id=job_id)
+
+
+async def is_job_revoked(service: Service, job_id: uuid.UUID | str | None) -> bool:
+    if job_id is None or not await service.job.is_revoked(job_id=job_id):
+        return False
+
+    logger.info("skipping revoked job with id: %s.", str(job_id))
+    return True
 
 
 async def send_notification_message(
     service: Service,
     bot: aiogram.Bot,
     event_id: uuid.UUID,
+    times_occurred: int | None = None,
 ) -> None:
+    # a job scheduled twice, e.g. by `recovery` after Redis lost tracked jobs, sends one message:
+    # the event is locked and the job is dropped if the event has occurred since it was scheduled
+    if times_occurred is not None and not await service.event.lock(
+        filter_=schema.EventLockFilter(id=event_id, times_occurred=times_occurred),
+    ):
+        logger.info(
+            "skipping notification message: event with id: %s isn't at occurrence %d.",
+            str(event_id),
+            times_occurred,
+        )
+        return
+
     event = await service.event.get(filter_=schema.EventGetFilter(id=event_id))
     if event is None:
         logger.warning(
@@ -40,36 +93,99 @@ async def send_notification_message(
         )
         return
 
+    if service.is_event_overdue(event=event):
+        logger.info("event with id: %s is overdue, catching it up.", str(event.id))
+        await schedule_caught_up_event(
+            service=service,
+            caught_up=service.catch_up_event(event=event),
+        )
+        return
+
+    occurrence = await send_occurrence_message(service=service, bot=bot, event=event)
+
+    if service.evaluate_event_offset(event=event).s != 0:
+        await service.job.schedule(
+            job=schema.Job(
+                type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE,
+                event_id=event.id,
+                occurrence_id=occurrence.id,
+                eta=event.next_date,
+            ),
+        )
+
+    event = service.update_event_next_date(event=event)
+    if event is None:
+        return
+    await service.event.upsert(event=event)
+
+    await service.job.schedule(
+        job=schema.Job(
+            type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            times_occurred=event.times_occurred,
+            eta=event.next_date - service.evaluate_event_offset(event=event),
+        ),
+    )
+
+
+async def catch_up_notification_message(
+    service: Service,
+    bot: aiogram.Bot,
+    event_id: uuid.UUID,
+) -> None:
+    event = await service.event.get(filter_=schema.EventGetFilter(id=event_id))
+    if event is None:
+        logger.warning(
+            "can't catch up notification message: event with id: %s not found.",
+            str(event_id),
+        )
+        return
+
+    await send_occurrence_message(service=service, bot=bot, event=event)
+
+    await schedule_caught_up_event(
+        service=service,
+        caught_up=service.step_caught_up_event(event=event),
+    )
+
+
+async def send_occurrence_message(
+    service: Service,
+    bot: aiogram.Bot,
+    event: schema.Event,
+) -> schema.Occurrence:
     occurrence = schema.Occurrence(
         event=event,
         message_id=-1,
         created_at=event.next_date,
     )
 
-    message = await bot.send_message(
-        chat_id=event.chat.id,
-        text=service.occurrence.generate_notification_message_text(occurrence=occurrence),
-        reply_markup=build_occurrence_keyboard(occurrence_id=occurrence.id),
-    )
+    text = service.occurrence.generate_notification_message_text(occurrence=occurrence)
+    reply_markup = build_occurrence_keyboard(occurrence_id=occurrence.id)
+
+    message = await bot.send_message(chat_id=event.chat.id, text=text, reply_markup=reply_markup)
 
     occurrence.message_id = message.message_id
     await service.occurrence.upsert(occurrence=occurrence)
+    await service.occurrence.update_rendered(
+        occurrence_id=occurrence.id,
+        text=text,
+        reply_markup=reply_markup,
+    )
 
-    if service.evaluate_event_offset(event=event).s != 0:
-        resend_notification_message_task.apply_async(
-            kwargs={"occurrence_id": occurrence.id},
-            eta=event.next_date,
-        )
+    return occurrence
 
-    event = service.update_event_next_date(event=event)
-    if event is None:
+
+async def schedule_caught_up_event(
+    service: Service,
+    caught_up: tuple[schema.Event, schema.Job] | None,
+) -> None:
+    if caught_up is None:
         return
-    await service.event.upsert(event=event)
 
-    send_notification_message_task.apply_async(
-        kwargs={"event_id": event.id},
-        eta=event.next_date - service.evaluate_event_offset(event=event),
-    )
+    event, job = caught_up
+    await service.event.upsert(event=event)
+    await service.job.schedule(job=job)
 
 
 async def resend_notification_message(
@@ -77,19 +193,17 @@ async def resend_notification_message(
     bot: aiogram.Bot,
     occurrence_id: uuid.UUID,
 ) -> None:
-    occurrence = await service.occurrence.get(
+    snapshot = await service.occurrence.get_snapshot(
         filter_=schema.OccurrenceGetFilter(id=occurrence_id),
     )
-    if occurrence is None:
+    if snapshot is None:
         logger.warning(
             "can't resend notification message: occurrence with id: %s not found.",
             str(occurrence_id),
         )
         return
 
-    entries = await service.entry.get_many(
-        filter_=schema.EntryGetManyFilter(occurrence_id=occurrence.id),
-    )
+    occurrence, entries = snapshot.occurrence, snapshot.entries
 
     with contextlib.suppress(aiogram.exceptions.TelegramBadRequest):
         await bot.delete_message(
@@ -97,14 +211,41 @@ async def resend_notification_message(
             message_id=occurrence.message_id,
         )
 
+    text = service.occurrence.generate_notification_message_text(
+        occurrence=occurrence,
+        entries=entries,
+    )
+    reply_markup = build_occurrence_keyboard(occurrence_id=occurrence.id)
+
     message = await bot.send_message(
         chat_id=occurrence.event.chat.id,
-        text=service.occurrence.generate_notification_message_text(
-            occurrence=occurrence,
-            entries=entries,
-        ),
-        reply_markup=build_occurrence_keyboard(occurrence_id=occurrence.id),
+        text=text,
+        reply_markup=reply_markup,
     )
 
     occurrence.message_id = message.message_id
     await service.occurrence.upsert(occurrence=occurrence)
+    await service.occurrence.update_rendered(
+        occurrence_id=occurrence.id,
+        text=text,
+        reply_markup=reply_markup,
+    )
+
+
+async def run_job(service: Service, bot: aiogram.Bot, job: schema.Job) -> None:
+    match job.type:
+        case schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE:
+            await send_notification_message(
+                service=service,
+                bot=bot,
+                event_id=job.event_id,
+                times_occurred=job.times_occurred,
+            )
+        case schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE:
+            await catch_up_notification_message(service=service, bot=bot, event_id=job.event_id)
+        case schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE if job.occurrence_id is not None:
+            await resend_notification_message(
+                service=service,
+                bot=bot,
+                occurrence_id=job.occurrence_id,
+            )
@@ -3,35 +3,27 @@ from datetime import datetime
 
 import aiogram
 import aiogram.exceptions
+import celery
 import pytest
 import pytz
 from pytest_mock import MockerFixture
-from redis.asyncio import Redis as AsyncRedis
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schema
+from app.config import config
 from app.keyboards import build_occurrence_keyboard
-from app.repository import Repository
 from app.service import Service
+from app.tasks.celery import runtime
 from app.tasks.tasks import (
+    catch_up_notification_message,
     resend_notification_message,
     resend_notification_message_task,
+    run_job,
     send_notification_message,
     send_notification_message_task,
 )
 from app.util.util import RelativeDelta
 
 
-@pytest.fixture
-def repository(mocker: MockerFixture) -> Repository:
-    return Repository(session=mocker.create_autospec(spec=AsyncSession))
-
-
-@pytest.fixture
-def service(repository: Repository, redis: AsyncRedis) -> Service:
-    return Service(repository=repository, redis=redis)
-
-
 @pytest.fixture
 def bot(mocker: MockerFixture) -> aiogram.Bot:
     return mocker.create_autospec(spec=aiogram.Bot)
@@ -63,7 +55,7 @@ async def test_send_notification_message_without_offset_success(
     event: schema.Event,
     occurrence: schema.Occurrence,
 ) -> None:
-    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=5)
+    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=1)
     event.periodicity = schema.Period(minutes="10")
     event.offset = None
     next_date = event.next_date + RelativeDelta(minutes=10)
@@ -82,6 +74,7 @@ async def test_send_notification_message_without_offset_success(
     mocker.patch.object(uuid, "uuid4", return_value=occurrence.id)
 
     await send_notification_message(service=service, bot=bot, event_id=event.id)
+    await service.commit()
 
     service.event.get.assert_awaited_once_with(filter_=schema.EventGetFilter(id=event.id))
     bot.send_message.assert_awaited_once_with(
@@ -97,8 +90,9 @@ async def test_send_notification_message_without_offset_success(
     service.occurrence.upsert.assert_awaited_once_with(occurrence=occurrence)
     service.event.upsert.assert_awaited_once_with(event=event)
     send_notification_message_task.apply_async.assert_called_once_with(
-        kwargs={"event_id": event.id},
+        kwargs={"event_id": event.id, "times_occurred": event.times_occurred},
         eta=next_date,
+        task_id=str(occurrence.id),
     )
 
 
@@ -110,7 +104,7 @@ async def test_send_notification_message_with_offset_success(
     event: schema.Event,
     occurrence: schema.Occurrence,
 ) -> None:
-    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=5)
+    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=1)
     event.periodicity = schema.Period(minutes="10")
     event.offset = schema.Period(minutes="2")
     next_date = event.next_date + RelativeDelta(minutes=10)
@@ -129,6 +123,7 @@ async def test_send_notification_message_with_offset_success(
     mocker.patch.object(uuid, "uuid4", return_value=occurrence.id)
 
     await send_notification_message(service=service, bot=bot, event_id=event.id)
+    await service.commit()
 
     service.event.get.assert_awaited_once_with(filter_=schema.EventGetFilter(id=event.id))
     bot.send_message.assert_awaited_once_with(
@@ -139,6 +134,7 @@ async def test_send_notification_message_with_offset_success(
     resend_notification_message_task.apply_async.assert_called_once_with(
         kwargs={"occurrence_id": occurrence.id},
         eta=event.next_date,
+        task_id=str(occurrence.id),
     )
 
     event.next_date = next_date
@@ -147,11 +143,36 @@ async def test_send_notification_message_with_offset_success(
     service.occurrence.upsert.assert_awaited_once_with(occurrence=occurrence)
     service.event.upsert.assert_awaited_once_with(event=event)
     send_notification_message_task.apply_async.assert_called_once_with(
-        kwargs={"event_id": event.id},
+        kwargs={"event_id": event.id, "times_occurred": event.times_occurred},
         eta=next_date - RelativeDelta(minutes=2),
+        task_id=str(occurrence.id),
     )
 
 
+async def test_send_notification_message_occurred_skipped(
+    send_notification_message_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    bot: aiogram.Bot,
+    event: schema.Event,
+) -> None:
+    mocker.patch.object(service.event, "lock", return_value=False, autospec=True)
+
+    await send_notification_message(
+        service=service,
+        bot=bot,
+        event_id=event.id,
+        times_occurred=event.times_occurred,
+    )
+
+    service.event.lock.assert_awaited_once_with(
+        filter_=schema.EventLockFilter(id=event.id, times_occurred=event.times_occurred),
+    )
+    service.event.get.assert_not_called()
+    bot.send_message.assert_not_called()
+    send_notification_message_task.apply_async.assert_not_called()
+
+
 async def test_send_notification_message_event_not_found_failure(
     send_notification_message_mocks: None,
     mocker: MockerFixture,
@@ -167,6 +188,102 @@ async def test_send_notification_message_event_not_found_failure(
     bot.send_message.assert_not_called()
 
 
+async def test_send_notification_message_overdue_success(
+    send_notification_message_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    bot: aiogram.Bot,
+    event: schema.Event,
+) -> None:
+    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=25)
+    event.periodicity = schema.Period(minutes="10")
+    event.offset = None
+    event.times_occurred = 0
+
+    service.event.get.return_value = event.model_copy(deep=True)
+    mocker.patch.object(service.job, "schedule", autospec=True)
+
+    await send_notification_message(service=service, bot=bot, event_id=event.id)
+
+    bot.send_message.assert_not_called()
+    service.occurrence.upsert.assert_not_called()
+
+    event.next_date += RelativeDelta(minutes=20)
+    event.times_occurred = 2
+
+    service.event.upsert.assert_awaited_once_with(event=event)
+    job = service.job.schedule.await_args.kwargs["job"]
+    assert job.type == schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE
+    assert job.event_id == event.id
+
+
+@pytest.mark.parametrize(
+    ("policy", "job_type", "times_occurred"),
+    [
+        (schema.CatchUpPolicyEnum.LATEST, schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE, 3),
+        (schema.CatchUpPolicyEnum.ALL, schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE, 1),
+    ],
+)
+async def test_catch_up_notification_message_success(
+    send_notification_message_mocks: None,
+    mocker: MockerFixture,
+    service: Service,
+    bot: aiogram.Bot,
+    event: schema.Event,
+    policy: schema.CatchUpPolicyEnum,
+    job_type: schema.JobTypeEnum,
+    times_occurred: int,
+) -> None:
+    event.chat.catch_up_policy = policy
+    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=25)
+    event.periodicity = schema.Period(minutes="10")
+    event.offset = schema.Period(minutes="2")
+    event.times_occurred = 0
+    next_date = event.next_date + RelativeDelta(minutes=10 * times_occurred)
+
+    service.event.get.return_value = event.model_copy(deep=True)
+    mocker.patch.object(service.job, "schedule", autospec=True)
+
+    occurrence = schema.Occurrence(event=event, message_id=1, created_at=event.next_date)
+    bot.send_message.return_value = aiogram.types.Message(
+        message_id=occurrence.message_id,
+        date=datetime.now(tz=pytz.utc),
+        chat=aiogram.types.Chat(id=event.chat.id, type="type"),
+    )
+    mocker.patch.object(uuid, "uuid4", return_value=occurrence.id)
+
+    await catch_up_notification_message(service=service, bot=bot, event_id=event.id)
+
+    bot.send_message.assert_awaited_once_with(
+        chat_id=event.chat.id,
+        text=service.occurrence.generate_notification_message_text(occurrence=occurrence),
+        reply_markup=build_occurrence_keyboard(occurrence_id=occurrence.id),
+    )
+
+    event.next_date = next_date
+    event.times_occurred = times_occurred
+
+    service.occurrence.upsert.assert_awaited_once_with(occurrence=occurrence)
+    service.event.upsert.assert_awaited_once_with(event=event)
+    job = service.job.schedule.await_args.kwargs["job"]
+    assert job.type == job_type
+    if job_type == schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE:
+        assert job.eta == next_date - RelativeDelta(minutes=2)
+
+
+async def test_catch_up_notification_message_event_not_found_failure(
+    send_notification_message_mocks: None,
+    service: Service,
+    bot: aiogram.Bot,
+    event: schema.Event,
+) -> None:
+    service.event.get.return_value = None
+
+    await catch_up_notification_message(service=service, bot=bot, event_id=event.id)
+
+    bot.send_message.assert_not_called()
+
+
 @pytest.fixture
 def resend_notification_message_mocks(
     mocker: MockerFixture,
@@ -174,13 +291,13 @@ def resend_notification_message_mocks(
     occurrence: schema.Occurrence,
     entry: schema.Entry,
 ) -> None:
+    snapshot = schema.OccurrenceSnapshot(occurrence=occurrence, entries=[entry])
     mocker.patch.object(
         service.occurrence,
-        "get",
-        return_value=occurrence.model_copy(deep=True),
+        "get_snapshot",
+        return_value=snapshot.model_copy(deep=True),
         autospec=True,
     )
-    mocker.patch.object(service.entry, "get_many", return_value=[entry.model_copy(deep=True)])
     mocker.patch.object(service.occurrence, "upsert", autospec=True)
 
 
@@ -204,12 +321,9 @@ async def test_resend_notification_message_full_success(
 
     await resend_notification_message(service=service, bot=bot, occurrence_id=occurrence.id)
 
-    service.occurrence.get.assert_awaited_once_with(
+    service.occurrence.get_snapshot.assert_awaited_once_with(
         filter_=schema.OccurrenceGetFilter(id=occurrence.id),
     )
-    service.entry.get_many.assert_awaited_once_with(
-        filter_=schema.EntryGetManyFilter(occurrence_id=occurrence.id),
-    )
     bot.delete_message.assert_awaited_once_with(
         chat_id=occurrence.event.chat.id,
         message_id=old_message_id,
@@ -254,12 +368,9 @@ async def test_resend_notification_message_delete_message_throws_success(
 
     await resend_notification_message(service=service, bot=bot, occurrence_id=occurrence.id)
 
-    service.occurrence.get.assert_awaited_once_with(
+    service.occurrence.get_snapshot.assert_awaited_once_with(
         filter_=schema.OccurrenceGetFilter(id=occurrence.id),
     )
-    service.entry.get_many.assert_awaited_once_with(
-        filter_=schema.EntryGetManyFilter(occurrence_id=occurrence.id),
-    )
     bot.delete_message.assert_awaited_once_with(
         chat_id=occurrence.event.chat.id,
         message_id=old_message_id,
@@ -283,8 +394,105 @@ async def test_resend_notification_message_occurrence_not_found_failure(
     bot: aiogram.Bot,
     occurrence: schema.Occurrence,
 ) -> None:
-    service.occurrence.get.return_value = None
+    service.occurrence.get_snapshot.return_value = None
 
     await resend_notification_message(service=service, bot=bot, occurrence_id=occurrence.id)
 
     bot.send_message.assert_not_called()
+
+
+async def test_run_job_success(
+    mocker: MockerFixture,
+    service: Service,
+    bot: aiogram.Bot,
+    event: schema.Event,
+    occurrence: schema.Occurrence,
+) -> None:
+    send = mocker.patch("app.tasks.tasks.send_notification_message", autospec=True)
+    resend = mocker.patch("app.tasks.tasks.resend_notification_message", autospec=True)
+    catch_up = mocker.patch("app.tasks.tasks.catch_up_notification_message", autospec=True)
+
+    await run_job(
+        service=service,
+        bot=bot,
+        job=schema.Job(
+            type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=event.next_date,
+        ),
+    )
+    await run_job(
+        service=service,
+        bot=bot,
+        job=schema.Job(
+            type=schema.JobTypeEnum.RESEND_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            occurrence_id=occurrence.id,
+            eta=event.next_date,
+        ),
+    )
+
+    await run_job(
+        service=service,
+        bot=bot,
+        job=schema.Job(
+            type=schema.JobTypeEnum.CATCH_UP_NOTIFICATION_MESSAGE,
+            event_id=event.id,
+            eta=event.next_date,
+        ),
+    )
+
+    send.assert_awaited_once_with(
+        service=service,
+        bot=bot,
+        event_id=event.id,
+        times_occurred=None,
+    )
+    resend.assert_awaited_once_with(service=service, bot=bot, occurrence_id=occurrence.id)
+    catch_up.assert_awaited_once_with(service=service, bot=bot, event_id=event.id)
+
+
+@pytest.mark.parametrize(
+    ("task", "target", "kwargs"),
+    [
+        (send_notification_message_task, "send_notification_message", "event_id"),
+        (resend_notification_message_task, "resend_notification_message", "occurrence_id"),
+    ],
+)
+def test_task_revoked_success(
+    mock_get_service: None,
+    mocker: MockerFixture,
+    service: Service,
+    task: celery.Task,
+    target: str,
+    kwargs: str,
+) -> None:
+    mocker.patch.object(config, "token", "42:TOKEN")
+    revoked_id, job_id = str(uuid.uuid4()), str(uuid.uuid4())
+
+    async def is_revoked(job_id: str) -> bool:
+        return job_id == revoked_id
+
+    mocker.patch.object(service.job, "is_revoked", side_effect=is_revoked, autospec=True)
+    mocker.patch.object(service.job, "finish", autospec=True)
+    run = mocker.patch(f"app.tasks.tasks.{target}", autospec=True)
+
+    try:
+        # tasks are run the way the worker runs them, request is set on the calling thread
+        task.apply(kwargs={kwargs: uuid.uuid4()}, task_id=revoked_id).get()
+        run.assert_not_called()
+
+        task.apply(kwargs={kwargs: uuid.uuid4()}, task_id=job_id).get()
+        run.assert_awaited_once()
+    finally:
+        runtime.stop()
+
+    assert service.job.is_revoked.call_args_list == [
+        mocker.call(job_id=revoked_id),
+        mocker.call(job_id=job_id),
+    ]
+    # revoked tasks are finished as well, so that they aren't waited for
+    assert service.job.finish.call_args_list == [
+        mocker.call(job_id=revoked_id),
+        mocker.call(job_id=job_id),
+    ]
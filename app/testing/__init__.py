@@ -0,0 +1,5 @@
+from .telegram import FakeTelegram
+
+__all__ = [
+    "FakeTelegram",
+]
@@ -0,0 +1,264 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+import typing
+import uuid
+
+import aiogram
+import aiohttp
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+
+BOT_USER = {"id": 42, "is_bot": True, "first_name": "Bot", "username": "bot"}
+TOKEN = "42:TOKEN"  # noqa: S105
+
+MAX_UPDATES = 100
+
+
+class TelegramError(Exception):
+    def __init__(self, error_code: int, description: str, **parameters: object) -> None:
+        super().__init__(description)
+        self.error_code = error_code
+        self.description = description
+        self.parameters = parameters
+
+
+class FakeTelegram:
+    """Fake of Telegram Bot API served by aiohttp on localhost, that `aiogram.Bot` can use.
+
+    Keeps sent messages, callback answers and files in memory. Every request takes `latency`
+    seconds more, half of it on the way to the fake and half on the way back, and so does
+    delivery of an update to the webhook. Requests fail with `RetryAfter` once `flood` was called
+    or at random with `flood_rate` probability. Updates pushed by `push_update` are served
+    by `getUpdates` or sent to the webhook if it's set.
+    """
+
+    def __init__(self, latency: float = 0.0, flood_rate: float = 0.0, seed: int = 0) -> None:
+        self.latency = latency
+        self.flood_rate = flood_rate
+        self.retry_after = 1
+
+        self.messages: dict[tuple[int, int], dict[str, typing.Any]] = {}
+        self.callback_answers: dict[str, str | None] = {}
+        self.files: dict[str, bytes] = {}
+        self.updates: list[dict[str, typing.Any]] = []
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.connections: set[tuple[str, int]] = set()
+        self.webhook: tuple[str, str] | None = None
+        self.port = 0
+
+        self._random = random.Random(seed)  # noqa: S311
+        self._flooded = 0
+        self._message_ids: dict[int, itertools.count[int]] = {}
+        self._update_ids = itertools.count(1)
+        self._condition = asyncio.Condition()
+        self._runner: web.AppRunner | None = None
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle_method)
+        app.router.add_get("/file/bot{token}/{file_path}", self._handle_file)
+
+        self._session = aiohttp.ClientSession()
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host="127.0.0.1", port=0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    async def stop(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self) -> typing.Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.stop()
+
+    def build_bot(self) -> aiogram.Bot:
+        return aiogram.Bot(
+            token=TOKEN,
+            session=AiohttpSession(api=TelegramAPIServer.from_base(self.url)),
+        )
+
+    def flood(self, count: int = 1) -> None:
+        """Answer next `count` requests with `RetryAfter` of `retry_after` seconds."""
+        self._flooded += count
+
+    def add_file(self, content: bytes) -> str:
+        file_id = str(uuid.uuid4())
+        self.files[file_id] = content
+        return file_id
+
+    def get_messages(self, chat_id: int) -> list[dict[str, typing.Any]]:
+        return [message for (id_, _), message in self.messages.items() if id_ == chat_id]
+
+    async def push_update(self, update: dict[str, typing.Any]) -> None:
+        update = {"update_id": next(self._update_ids), **update}
+
+        if self.webhook is None:
+            async with self._condition:
+                self.updates.append(update)
+                self._condition.notify_all()
+            return
+
+        url, secret = self.webhook
+        await asyncio.sleep(self.latency / 2)
+        assert self._session is not None
+        async with self._session.post(
+            url,
+            data=json.dumps(update),
+            headers={
+                "Content-Type": "application/json",
+                "X-Telegram-Bot-Api-Secret-Token": secret,
+            },
+        ):
+            pass
+
+    async def _handle_method(self, request: web.Request) -> web.Response:
+        params = {key: str(value) for key, value in (await request.post()).items()}
+        method = request.match_info["method"]
+        self.requests.append((method, params))
+        if request.transport is not None:
+            self.connections.add(request.transport.get_extra_info("peername"))
+
+        await asyncio.sleep(self.latency / 2)
+        try:
+            self._check_flood()
+            result = await self._call(method=method, params=params)
+        except TelegramError as e:
+            body: dict[str, typing.Any] = {
+                "ok": False,
+                "error_code": e.error_code,
+                "description": e.description,
+            }
+            if e.parameters:
+                body["parameters"] = e.parameters
+            response = web.json_response(body, status=e.error_code)
+        else:
+            response = web.json_response({"ok": True, "result": result})
+
+        await asyncio.sleep(self.latency / 2)
+        return response
+
+    async def _handle_file(self, request: web.Request) -> web.Response:
+        content = self.files.get(request.match_info["file_path"])
+        if content is None:
+            raise web.HTTPNotFound
+        return web.Response(body=content)
+
+    def _check_flood(self) -> None:
+        if self._flooded:
+            self._flooded -= 1
+        elif not self._random.random() < self.flood_rate:
+            return
+
+        raise TelegramError(
+            429,
+            f"Too Many Requests: retry after {self.retry_after}",
+            retry_after=self.retry_after,
+        )
+
+    async def _call(self, method: str, params: dict[str, str]) -> typing.Any:  # noqa: ANN401
+        match method:
+            case "getMe":
+                return BOT_USER
+            case "sendMessage":
+                return self._send_message(params=params)
+            case "editMessageText":
+                return self._edit_message_text(params=params)
+            case "deleteMessage":
+                self._get_message(params=params, action="delete")
+                del self.messages[int(params["chat_id"]), int(params["message_id"])]
+                return True
+            case "answerCallbackQuery":
+                self.callback_answers[params["callback_query_id"]] = params.get("text")
+                return True
+            case "getUpdates":
+                return await self._get_updates(
+                    offset=int(params.get("offset", 0)),
+                    limit=int(params.get("limit", MAX_UPDATES)),
+                    wait=float(params.get("timeout", 0)),
+                )
+            case "getFile":
+                if params["file_id"] not in self.files:
+                    raise TelegramError(400, "Bad Request: invalid file_id")
+                return {
+                    "file_id": params["file_id"],
+                    "file_unique_id": params["file_id"],
+                    "file_size": len(self.files[params["file_id"]]),
+                    "file_path": params["file_id"],
+                }
+            case "setWebhook":
+                self.webhook = (params["url"], params.get("secret_token", ""))
+                return True
+            case "deleteWebhook":
+                self.webhook = None
+                return True
+
+        raise TelegramError(404, "Not Found")
+
+    def _send_message(self, params: dict[str, str]) -> dict[str, typing.Any]:
+        chat_id = int(params["chat_id"])
+        message_ids = self._message_ids.setdefault(chat_id, itertools.count(1))
+
+        message = {
+            "message_id": next(message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "group" if chat_id < 0 else "private"},
+            "from": BOT_USER,
+            "text": params["text"],
+        }
+        if "reply_markup" in params:
+            message["reply_markup"] = json.loads(params["reply_markup"])
+
+        self.messages[chat_id, message["message_id"]] = message
+        return message
+
+    def _edit_message_text(self, params: dict[str, str]) -> dict[str, typing.Any]:
+        message = self._get_message(params=params, action="edit")
+        reply_markup = json.loads(params["reply_markup"]) if "reply_markup" in params else None
+
+        if message["text"] == params["text"] and message.get("reply_markup") == reply_markup:
+            raise TelegramError(
+                400,
+                "Bad Request: message is not modified: specified new message content and "
+                "reply markup are exactly the same as a current content and reply markup "
+                "of the message",
+            )
+
+        message["text"] = params["text"]
+        message["edit_date"] = int(time.time())
+        message.pop("reply_markup", None)
+        if reply_markup is not None:
+            message["reply_markup"] = reply_markup
+        return message
+
+    def _get_message(self, params: dict[str, str], action: str) -> dict[str, typing.Any]:
+        message = self.messages.get((int(params["chat_id"]), int(params["message_id"])))
+        if message is None:
+            raise TelegramError(400, f"Bad Request: message to {action} not found")
+        return message
+
+    async def _get_updates(self, offset: int, limit: int, wait: float) -> list[dict[str, object]]:
+        # updates before `offset` are confirmed and never served again
+        self.updates = [update for update in self.updates if update["update_id"] >= offset]
+
+        async with self._condition:
+            try:
+                await asyncio.wait_for(self._condition.wait_for(lambda: self.updates), wait)
+            except TimeoutError:
+                return []
+            return self.updates[:limit]
@@ -0,0 +1,194 @@
+import asyncio
+import typing
+import uuid
+from datetime import datetime
+
+import aiogram
+import pytest
+import pytz
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from pytest_mock import MockerFixture
+from redis.asyncio import Redis as AsyncRedis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import callbacks, schema
+from app.coalescer import EditCoalescer
+from app.config import config
+from app.handlers import occurrence_callback_handler
+from app.keyboards import build_occurrence_keyboard
+from app.repository import Repository
+from app.service import Service
+from app.tasks.tasks import resend_notification_message, send_notification_message
+from app.testing import FakeTelegram
+from app.util import RelativeDelta
+
+
+@pytest.fixture
+async def telegram() -> typing.AsyncGenerator[FakeTelegram, None]:
+    async with FakeTelegram() as telegram:
+        yield telegram
+
+
+@pytest.fixture
+async def bot(telegram: FakeTelegram) -> typing.AsyncGenerator[aiogram.Bot, None]:
+    async with telegram.build_bot() as bot:
+        yield bot
+
+
+@pytest.fixture
+def service(db_session: AsyncSession, redis: AsyncRedis) -> Service:
+    return Service(repository=Repository(session=db_session), redis=redis)
+
+
+async def test_fake_telegram_messages_success(telegram: FakeTelegram, bot: aiogram.Bot) -> None:
+    reply_markup = build_occurrence_keyboard(occurrence_id=uuid.uuid4())
+    message = await bot.send_message(chat_id=-1, text="text")
+
+    assert telegram.get_messages(chat_id=-1) == [
+        telegram.messages[-1, message.message_id],
+    ]
+    assert message.chat.type == "group"
+
+    edited = await bot.edit_message_text(
+        text="edited",
+        chat_id=-1,
+        message_id=message.message_id,
+        reply_markup=reply_markup,
+    )
+
+    assert isinstance(edited, aiogram.types.Message)
+    assert edited.text == "edited"
+    assert edited.reply_markup is not None
+    assert edited.reply_markup.model_dump(exclude_none=True) == reply_markup.model_dump(
+        exclude_none=True,
+    )
+
+    with pytest.raises(TelegramBadRequest, match="message is not modified"):
+        await bot.edit_message_text(
+            text="edited",
+            chat_id=-1,
+            message_id=message.message_id,
+            reply_markup=reply_markup,
+        )
+
+    assert await bot.delete_message(chat_id=-1, message_id=message.message_id) is True
+    assert telegram.get_messages(chat_id=-1) == []
+
+    with pytest.raises(TelegramBadRequest, match="message to delete not found"):
+        await bot.delete_message(chat_id=-1, message_id=message.message_id)
+
+
+async def test_fake_telegram_flood_failure(telegram: FakeTelegram, bot: aiogram.Bot) -> None:
+    telegram.retry_after = 3
+    telegram.flood(count=1)
+
+    with pytest.raises(TelegramRetryAfter) as e:
+        await bot.send_message(chat_id=1, text="text")
+
+    assert e.value.retry_after == telegram.retry_after
+    assert (await bot.send_message(chat_id=1, text="text")).message_id == 1
+
+
+async def test_fake_telegram_latency_success(telegram: FakeTelegram, bot: aiogram.Bot) -> None:
+    telegram.latency = 0.1
+    start = asyncio.get_running_loop().time()
+
+    await bot.send_message(chat_id=1, text="text")
+
+    assert asyncio.get_running_loop().time() - start >= telegram.latency
+
+
+async def test_fake_telegram_updates_success(telegram: FakeTelegram, bot: aiogram.Bot) -> None:
+    updates = asyncio.create_task(bot.get_updates(offset=0, timeout=1))
+    await telegram.push_update(
+        update={
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 1, "type": "private"},
+                "text": "text",
+            },
+        },
+    )
+
+    [update] = await updates
+    assert update.message is not None
+    assert update.message.text == "text"
+    assert await bot.get_updates(offset=update.update_id + 1, timeout=0) == []
+
+
+async def test_fake_telegram_files_success(telegram: FakeTelegram, bot: aiogram.Bot) -> None:
+    file_id = telegram.add_file(content=b'{"events": []}')
+
+    file = await bot.get_file(file_id=file_id)
+    assert file.file_path is not None
+    data = await bot.download_file(file_path=file.file_path)
+
+    assert data is not None
+    assert data.read() == b'{"events": []}'
+
+
+async def test_notification_message_end_to_end_success(
+    mock_get_service: None,
+    mocker: MockerFixture,
+    telegram: FakeTelegram,
+    bot: aiogram.Bot,
+    service: Service,
+    chat: schema.Chat,
+    event: schema.Event,
+) -> None:
+    mocker.patch.object(config.scheduler, "backend", "redis")
+    mocker.patch.object(config, "edit_window", 0)
+
+    event.next_date = datetime.now(tz=pytz.utc) - RelativeDelta(minutes=1)
+    event.periodicity = schema.Period(days="1")
+    event.offset = None
+    event.times_occurred = 0
+    await service.chat.upsert(chat=chat)
+    await service.event.upsert(event=event)
+
+    await send_notification_message(service=service, bot=bot, event_id=event.id)
+
+    [message] = telegram.get_messages(chat_id=chat.id)
+    assert message["text"].startswith(f"{event.name} starts on")
+
+    data = message["reply_markup"]["inline_keyboard"][0][0]["callback_data"]
+    callback_data = callbacks.OccurrenceCallbackFactory.unpack(data)
+    callback = aiogram.types.CallbackQuery.model_validate(
+        {
+            "id": "1",
+            "from": {"id": 7, "is_bot": False, "first_name": "Full", "last_name": "Name"},
+            "chat_instance": "1",
+            "data": data,
+        },
+    ).as_(bot)
+    coalescer = EditCoalescer(bot=bot)
+
+    await occurrence_callback_handler(
+        callback=callback,
+        service=service,
+        callback_data=callback_data,
+        coalescer=coalescer,
+    )
+    await coalescer.close()
+
+    # the edit is requested once the change is committed
+    [message] = telegram.get_messages(chat_id=chat.id)
+    assert "Full Name" not in message["text"]
+
+    await service.commit()
+    await coalescer.close()
+
+    assert telegram.callback_answers == {"1": "Success."}
+    [message] = telegram.get_messages(chat_id=chat.id)
+    assert message["text"].endswith("Current queue:\n1. Full Name ⬅️")
+
+    await resend_notification_message(
+        service=service,
+        bot=bot,
+        occurrence_id=callback_data.occurrence_id,
+    )
+
+    [resent] = telegram.get_messages(chat_id=chat.id)
+    assert resent["message_id"] != message["message_id"]
+    assert resent["text"] == message["text"]
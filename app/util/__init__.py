@@ -1,5 +1,8 @@
+from .expression import compile_expression, linearize
 from .util import RelativeDelta
 
 __all__ = [
     "RelativeDelta",
+    "compile_expression",
+    "linearize",
 ]
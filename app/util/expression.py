@@ -0,0 +1,144 @@
+import ast
+import functools
+import operator
+import typing
+
+import numexpr
+
+Linear = tuple[float, float]
+Expression = typing.Callable[[int], float]
+
+CACHE_SIZE = 1024
+
+COMPILABLE_NODES = (
+    ast.Expression,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.UnaryOp,
+    ast.UAdd,
+    ast.USub,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Mod,
+)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(ex: str) -> Expression:
+    """Compile expression `ex` with `t` and `n` variables into a function of `t`, where `n = t + 1`.
+
+    Expressions that consist only of numbers, `t` and `n` variables, unary `+`/`-` and
+    binary `+`, `-`, `*`, `/`, `%` operators are compiled to a Python function.
+    Everything else is evaluated by `numexpr`, same as results that raise an arithmetic error.
+
+    Raises `ValueError` if expression can't be evaluated by `numexpr`.
+    """
+    if (error := numexpr.validate(ex, local_dict={"t": 0, "n": 1}, global_dict={})) is not None:
+        msg = f"invalid expression: {ex!r}"
+        raise ValueError(msg) from error
+
+    def fallback(t: int) -> float:
+        return numexpr.evaluate(ex, {"t": t, "n": t + 1}, {}).item()
+
+    try:
+        tree = ast.parse(ex.strip(), mode="eval")
+    except SyntaxError:
+        return fallback
+
+    for node in ast.walk(tree):
+        if not isinstance(node, COMPILABLE_NODES):
+            return fallback
+        if isinstance(node, ast.Constant) and (
+            isinstance(node.value, bool) or not isinstance(node.value, int | float)
+        ):
+            return fallback
+        if isinstance(node, ast.Name) and node.id not in ("t", "n"):
+            return fallback
+
+    lambda_ = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg="t"), ast.arg(arg="n")],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=tree.body,
+        ),
+    )
+    function = eval(  # noqa: S307
+        compile(ast.fix_missing_locations(lambda_), "<expression>", "eval"),
+        {"__builtins__": {}},
+    )
+
+    def evaluate(t: int) -> float:
+        try:
+            return function(t, t + 1)
+        except ArithmeticError:
+            return fallback(t)
+
+    return evaluate
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def linearize(ex: str) -> Linear | None:
+    """Represent expression `ex` as `a + b * t`, where `n = t + 1`.
+
+    Only numbers, `t` and `n` variables, unary `+`/`-` and binary `+`, `-`, `*`, `/`, `**`
+    operators are understood, anything else is treated as non-linear.
+
+    Returns `(a, b)` tuple if expression is linear in `t`, else `None`.
+    """
+    try:
+        tree = ast.parse(ex.strip(), mode="eval")
+    except SyntaxError:
+        return None
+
+    return _linearize(node=tree.body)
+
+
+def _linearize(node: ast.expr) -> Linear | None:
+    match node:
+        case ast.Constant(value=bool()):
+            return None
+        case ast.Constant(value=int() | float() as value):
+            return value, 0
+        case ast.Name(id="t"):
+            return 0, 1
+        case ast.Name(id="n"):
+            return 1, 1
+        case ast.UnaryOp(op=ast.UAdd(), operand=operand):
+            return _linearize(node=operand)
+        case ast.UnaryOp(op=ast.USub(), operand=operand):
+            if (x := _linearize(node=operand)) is None:
+                return None
+            return -x[0], -x[1]
+        case ast.BinOp(left=left, op=op, right=right):
+            if (x := _linearize(node=left)) is None or (y := _linearize(node=right)) is None:
+                return None
+            return _apply(op=op, x=x, y=y)
+    return None
+
+
+def _apply(op: ast.operator, x: Linear, y: Linear) -> Linear | None:
+    match op:
+        case ast.Add():
+            return x[0] + y[0], x[1] + y[1]
+        case ast.Sub():
+            return x[0] - y[0], x[1] - y[1]
+        case ast.Mult() if x[1] == 0 or y[1] == 0:
+            return x[0] * y[0], x[0] * y[1] + x[1] * y[0]
+        case ast.Div() if y[1] == 0 and y[0] != 0:
+            return x[0] / y[0], x[1] / y[0]
+        case ast.Pow() if x[1] == 0 and y[1] == 0:
+            try:
+                value = operator.pow(float(x[0]), float(y[0]))
+            except (OverflowError, ZeroDivisionError):
+                return None
+            return (value, 0) if isinstance(value, float) else None
+    return None
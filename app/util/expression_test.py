@@ -0,0 +1,67 @@
+import numexpr
+import pytest
+
+from app.util import compile_expression, linearize
+
+
+def test_compile_expression() -> None:
+    expressions = [
+        "1",
+        "1.5",
+        "t",
+        "n",
+        "-t + 3",
+        "2 * t + 3",
+        "t / 4",
+        "2 + 3 * (n % 2)",
+        "7.5 % -n",
+        "t % 0",
+        "1 / (t - 3)",
+        "t ** 2",
+        "where(t > 1, 1, 2)",
+    ]
+
+    for ex in expressions:
+        expression = compile_expression(ex)
+        for t in range(6):
+            assert expression(t) == numexpr.evaluate(ex, {"t": t, "n": t + 1}, {}).item()
+
+
+def test_compile_expression_cache() -> None:
+    assert compile_expression("t + 1") is compile_expression("t + 1")
+
+
+def test_compile_expression_invalid() -> None:
+    for ex in ["x", "t +", "__import__('os')", ""]:
+        with pytest.raises(ValueError, match="invalid expression"):
+            compile_expression(ex)
+
+
+def test_linearize() -> None:
+    cases = [
+        ("1", (1, 0)),
+        ("1.5", (1.5, 0)),
+        ("t", (0, 1)),
+        ("n", (1, 1)),
+        ("-t", (0, -1)),
+        ("+n", (1, 1)),
+        ("2 * t + 3", (3, 2)),
+        ("n * 2 - t", (2, 1)),
+        ("(t + 1) * 3", (3, 3)),
+        ("t / 2", (0, 0.5)),
+        ("2 ** 3", (8, 0)),
+        ("t * t", None),
+        ("t * n", None),
+        ("2 ** t", None),
+        ("1 / t", None),
+        ("1 / 0", None),
+        ("t % 2", None),
+        ("2 + 3 * (n % 2)", None),
+        ("where(t > 1, 1, 2)", None),
+        ("x", None),
+        ("True", None),
+        ("1 +", None),
+    ]
+
+    for ex, expected in cases:
+        assert linearize(ex) == expected
@@ -1,9 +1,12 @@
+import functools
 import typing
 from datetime import datetime
 
 import pytz
 from dateutil.relativedelta import relativedelta, weekday
 
+EPOCH = datetime.fromtimestamp(timestamp=0, tz=pytz.utc)
+
 
 class RelativeDelta(relativedelta):
     """`dateutil.RelativeDelta.RelativeDelta` class with custom magic methods and constructor."""
@@ -54,9 +57,7 @@ class RelativeDelta(relativedelta):
             microsecond=microsecond,
         )
 
-        self._ts = datetime.fromtimestamp(timestamp=0, tz=pytz.utc)
-
-    @property
+    @functools.cached_property
     def s(self) -> int:
         """Returns rough estimate of total number of seconds in `RelativeDelta` object.
 
@@ -69,8 +70,9 @@ class RelativeDelta(relativedelta):
         Unix Epoch as a measurement point to calculate the number of seconds.
 
         This method will always return the same result for objects with identical attributes.
+        The result is computed once per object.
         """
-        return int((self._ts + self).timestamp())
+        return int((EPOCH + self).timestamp())
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, RelativeDelta):
@@ -0,0 +1,245 @@
+"""Button presses per second one bot process sustains.
+
+`CHATS` chats with `USERS` users each press Join / Leave / Skip / Done buttons of chat's
+notification message `PRESSES` times, `RATE` presses per second in total. Presses are pushed
+to `app.testing.FakeTelegram` and received by long polling by the dispatcher of `app.main`,
+which uses Postgres and Redis from `config`. The bot has no rate limiter, so only its own
+costs are measured.
+
+Handler latency is the time an update spends in the dispatcher once its chat's turn comes,
+end-to-end latency is the time from a press reaching the fake until its update is handled.
+Database queries are statements executed by `app.database.engine` and Telegram calls are
+requests to the fake other than `getUpdates`, including edits sent by the coalescer afterwards.
+"""
+
+import asyncio
+import collections
+import random
+import statistics
+import time
+import typing
+import uuid
+from datetime import datetime
+
+import aiogram
+import pytz
+from sqlalchemy import delete, event
+
+from app import callbacks, models, schema
+from app.coalescer import EditCoalescer
+from app.config import config
+from app.database import engine
+from app.dependencies import get_service
+from app.main import build_dispatcher
+from app.tasks.tasks import send_notification_message
+from app.testing import FakeTelegram
+from app.util import RelativeDelta
+
+CHATS = 50
+USERS = 20
+PRESSES = 5
+RATE = 500
+FIRST_CHAT_ID = -1_000_000_001_000
+WIDTHS = [16, 9, 9, 9]
+
+
+class Counters:
+    def __init__(self) -> None:
+        self.queries = 0
+        self.pushed: dict[str, float] = {}
+        self.handler: list[float] = []
+        self.end_to_end: list[float] = []
+        self.done = asyncio.Event()
+
+    def count_query(self, *_: object) -> None:
+        self.queries += 1
+
+    async def measure(
+        self,
+        handler: typing.Callable[[aiogram.types.Update, dict[str, typing.Any]], typing.Awaitable],
+        update: aiogram.types.Update,
+        data: dict[str, typing.Any],
+    ) -> typing.Any:  # noqa: ANN401
+        start = time.perf_counter()
+        try:
+            return await handler(update, data)
+        finally:
+            end = time.perf_counter()
+            self.handler.append(end - start)
+            if update.callback_query is not None:
+                self.end_to_end.append(end - self.pushed[update.callback_query.id])
+            if len(self.handler) == CHATS * USERS * PRESSES:
+                self.done.set()
+
+
+async def setup(bot: aiogram.Bot, telegram: FakeTelegram) -> list[tuple[int, uuid.UUID, int]]:
+    """Create chats with an event each and send their notification messages.
+
+    Returns chat id, occurrence id and message id of every chat.
+    """
+    now = datetime.now(tz=pytz.utc)
+    chats = [
+        schema.Chat(id=FIRST_CHAT_ID - i, timezone="Etc/UTC", config={"events": []})
+        for i in range(CHATS)
+    ]
+    events = [
+        schema.Event(
+            chat=chat,
+            name="Event",
+            initial_date=now,
+            next_date=now - RelativeDelta(minutes=1),
+            periodicity=schema.Period(days="1"),
+        )
+        for chat in chats
+    ]
+
+    async with get_service() as service:
+        for chat in chats:
+            await service.chat.upsert(chat=chat)
+        await service.event.upsert_many(events=events)
+        for event_ in events:
+            await send_notification_message(service=service, bot=bot, event_id=event_.id)
+
+    occurrences = []
+    for chat in chats:
+        [message] = telegram.get_messages(chat_id=chat.id)
+        data = message["reply_markup"]["inline_keyboard"][0][0]["callback_data"]
+        occurrence_id = callbacks.OccurrenceCallbackFactory.unpack(data).occurrence_id
+        occurrences.append((chat.id, occurrence_id, message["message_id"]))
+
+    return occurrences
+
+
+async def cleanup() -> None:
+    chat_ids = [FIRST_CHAT_ID - i for i in range(CHATS)]
+
+    async with get_service() as service:
+        for chat_id in chat_ids:
+            event_ids = await service.event.delete(
+                filter_=schema.EventDeleteFilter(chat_id=chat_id),
+            )
+            await service.job.cancel(event_ids=event_ids)
+            await service.chat.get.delete(filter_=schema.ChatGetFilter(id=chat_id))
+
+    async with engine.begin() as connection:
+        await connection.execute(delete(models.Chat).where(models.Chat.id.in_(chat_ids)))
+
+
+def build_press(
+    press_id: str,
+    chat_id: int,
+    message_id: int,
+    user_id: int,
+    data: str,
+) -> dict[str, object]:
+    return {
+        "callback_query": {
+            "id": press_id,
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"},
+            "chat_instance": str(chat_id),
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "group"},
+                "text": "Event",
+            },
+            "data": data,
+        },
+    }
+
+
+async def push_presses(
+    telegram: FakeTelegram,
+    counters: Counters,
+    occurrences: list[tuple[int, uuid.UUID, int]],
+) -> None:
+    rand = random.Random(0)  # noqa: S311
+    actions = list(callbacks.OccurrenceActionEnum)
+    presses = [
+        (chat_id, occurrence_id, message_id, user_id)
+        for chat_id, occurrence_id, message_id in occurrences
+        for user_id in range(1, USERS + 1)
+        for _ in range(PRESSES)
+    ]
+    rand.shuffle(presses)
+
+    start = time.perf_counter()
+    for i, (chat_id, occurrence_id, message_id, user_id) in enumerate(presses):
+        # keep up with `RATE` on average, `asyncio.sleep` is too coarse to sleep between presses
+        delay = start + i / RATE - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        data = callbacks.OccurrenceCallbackFactory(
+            action=rand.choice(actions),
+            occurrence_id=occurrence_id,
+        ).pack()
+        counters.pushed[str(i)] = time.perf_counter()
+        await telegram.push_update(
+            update=build_press(
+                press_id=str(i),
+                chat_id=chat_id,
+                message_id=message_id,
+                user_id=user_id,
+                data=data,
+            ),
+        )
+
+
+def format_row(row: list[str]) -> str:
+    return " | ".join(f"{column:>{width}}" for column, width in zip(row, WIDTHS, strict=True))
+
+
+def format_latencies(name: str, latencies: list[float]) -> str:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return format_row(row=[name, *(f"{quantiles[q - 1] * 1000:.1f}ms" for q in [50, 95, 99])])
+
+
+async def main() -> None:
+    # jobs of the next occurrences must not be published to a broker that may not be there
+    config.scheduler.backend = "redis"
+
+    async with FakeTelegram() as telegram, telegram.build_bot() as bot:
+        await cleanup()
+        occurrences = await setup(bot=bot, telegram=telegram)
+
+        counters = Counters()
+        dp = build_dispatcher()
+        dp.update.outer_middleware(counters.measure)
+        dp["coalescer"] = EditCoalescer(bot=bot)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", counters.count_query)
+        calls_before = len(telegram.requests)
+
+        polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False))
+        start = time.perf_counter()
+        await push_presses(telegram=telegram, counters=counters, occurrences=occurrences)
+        await counters.done.wait()
+        elapsed = time.perf_counter() - start
+        await dp["coalescer"].close()
+
+        await dp.stop_polling()
+        await polling
+        event.remove(engine.sync_engine, "before_cursor_execute", counters.count_query)
+
+        updates = len(counters.handler)
+        calls = collections.Counter(
+            method for method, _ in telegram.requests[calls_before:] if method != "getUpdates"
+        )
+
+        print(f"chats: {CHATS}, users: {USERS}, presses: {updates}, offered rate: {RATE}/s")
+        print(f"throughput: {updates / elapsed:.1f} updates/s")
+        print(f"db queries per update: {counters.queries / updates:.2f}")
+        print(
+            f"telegram calls per update: {calls.total() / updates:.2f} "
+            f"({', '.join(f'{method}: {count}' for method, count in calls.most_common())})",
+        )
+        print(format_row(row=["latency", "p50", "p95", "p99"]))
+        print(format_latencies(name="handler", latencies=counters.handler))
+        print(format_latencies(name="end-to-end", latencies=counters.end_to_end))
+
+        await cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,120 @@
+"""Cost of chat's raw configuration on the hot read paths.
+
+A chat stores a configuration of `EVENTS` events, one of them is created with an occurrence.
+The occurrence is read by the button handler and the event by the notification task,
+both through `ring` Redis caches of `OccurrenceService.get` and `EventService.get`.
+
+Reports size of the cached payloads and time it takes to fetch them from the database,
+averaged over `REPEATS` fetches, each in its own session.
+"""
+
+import asyncio
+import json
+import time
+import typing
+from datetime import datetime
+
+import pytz
+from sqlalchemy import delete
+
+from app import models, schema
+from app.config import config
+from app.database import engine
+from app.dependencies import get_redis, get_service
+from app.util import RelativeDelta
+
+EVENTS = 1000
+REPEATS = 200
+CHAT_ID = -1_000_000_000_003
+WIDTHS = [10, 14, 11]
+
+
+def build_chat() -> schema.Chat:
+    now = datetime.now(tz=pytz.utc)
+    return schema.Chat(
+        id=CHAT_ID,
+        timezone="Europe/Kyiv",
+        config={
+            "timezone": "Europe/Kyiv",
+            "events": [
+                {
+                    "name": f"Event {i}",
+                    "description": f"Description of event {i}",
+                    "initial_date": (now - RelativeDelta(days=i)).strftime(config.date_format),
+                    "periodicity": {"days": "1", "minutes": str(i % 60)},
+                    "offset": {"minutes": "10"},
+                }
+                for i in range(EVENTS)
+            ],
+        },
+    )
+
+
+async def setup() -> schema.Occurrence:
+    chat = build_chat()
+    now = datetime.now(tz=pytz.utc)
+    event = schema.Event(
+        chat=chat,
+        name="Event 0",
+        initial_date=now,
+        next_date=now,
+        periodicity=schema.Period(days="1"),
+    )
+    occurrence = schema.Occurrence(event=event, message_id=1, created_at=now)
+
+    async with get_service() as service:
+        await service.chat.upsert(chat=chat)
+        await service.event.upsert(event=event)
+        await service.occurrence.upsert(occurrence=occurrence)
+
+    return occurrence
+
+
+async def cleanup() -> None:
+    async with engine.begin() as connection:
+        await connection.execute(delete(models.Chat).where(models.Chat.id == CHAT_ID))
+
+
+async def measure(
+    name: typing.Literal["event", "occurrence"],
+    filter_: schema.EventGetFilter | schema.OccurrenceGetFilter,
+) -> tuple[int, float]:
+    """Return size of the cached payload and average time to fetch it from the database."""
+    elapsed = 0.0
+    for _ in range(REPEATS):
+        async with get_service() as service:
+            start = time.perf_counter()
+            await getattr(service, name).get.execute(filter_=filter_)
+            elapsed += time.perf_counter() - start
+
+    async with get_service() as service, get_redis() as redis:
+        get = getattr(service, name).get
+        await get.update(filter_=filter_)
+        payload = await redis.get(get.key(filter_=filter_))
+        await get.delete(filter_=filter_)
+
+    return len(payload or b""), elapsed / REPEATS
+
+
+def format_row(row: list[str]) -> str:
+    return " | ".join(f"{column:>{width}}" for column, width in zip(row, WIDTHS, strict=True))
+
+
+async def main() -> None:
+    await cleanup()
+    occurrence = await setup()
+
+    print(f"configuration: {EVENTS} events, {len(json.dumps(build_chat().config))} bytes")
+    print(format_row(row=["read", "cached bytes", "fetch time"]))
+    for name, filter_ in [
+        ("event", schema.EventGetFilter(id=occurrence.event.id)),
+        ("occurrence", schema.OccurrenceGetFilter(id=occurrence.id)),
+    ]:
+        size, elapsed = await measure(name=name, filter_=filter_)
+        print(format_row(row=[name, str(size), f"{elapsed * 1000:.2f}ms"]))
+
+    await cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
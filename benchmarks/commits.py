@@ -0,0 +1,143 @@
+"""Commits per `/configure` and per notification.
+
+A configuration of `EVENTS` events is loaded by `Service.load_configuration` and reloaded
+unchanged, then a notification of every event is sent by `send_notification_message`.
+Each of them runs in its own `get_service` block, the way the handler and the task run them.
+Notifications are sent to `app.testing.FakeTelegram`. Both `postgres` and `redis` backends
+of `config.scheduler` are measured, `celery` needs a broker.
+
+Transactions committed, savepoints begun and statements executed are counted
+on `app.database.engine`.
+"""
+
+import asyncio
+import typing
+import uuid
+from datetime import datetime
+
+import aiogram
+import pytz
+from sqlalchemy import delete, event
+
+from app import models, schema
+from app.config import config
+from app.database import engine
+from app.dependencies import get_service
+from app.tasks.tasks import send_notification_message
+from app.testing import FakeTelegram
+from app.util import RelativeDelta
+
+EVENTS = 10
+CHAT_ID = -1_000_000_000_002
+EVENT_NAMES = ["commit", "savepoint", "before_cursor_execute"]
+WIDTHS = [8, 16, 9, 10, 10]
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.counts = dict.fromkeys(EVENT_NAMES, 0)
+        self._listeners = {name: self._build_listener(name=name) for name in EVENT_NAMES}
+
+    def __enter__(self) -> typing.Self:
+        for name, listener in self._listeners.items():
+            event.listen(engine.sync_engine, name, listener)
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        for name, listener in self._listeners.items():
+            event.remove(engine.sync_engine, name, listener)
+
+    def _build_listener(self, name: str) -> typing.Callable[..., None]:
+        def listener(*_: object, **__: object) -> None:
+            self.counts[name] += 1
+
+        return listener
+
+
+def build_configuration() -> tuple[schema.ConfigurationInput, dict[str, typing.Any]]:
+    now = datetime.now(tz=pytz.utc)
+    configuration_raw = {
+        "timezone": "Europe/Kyiv",
+        "events": [
+            {
+                "name": f"Event {i}",
+                "initial_date": (now - RelativeDelta(days=1)).strftime(config.date_format),
+                "periodicity": {"days": "1"},
+                "offset": {"minutes": "10"},
+            }
+            for i in range(EVENTS)
+        ],
+    }
+    return schema.ConfigurationInput.model_validate(obj=configuration_raw), configuration_raw
+
+
+async def configure() -> None:
+    configuration, configuration_raw = build_configuration()
+
+    async with get_service() as service:
+        await service.load_configuration(
+            chat_id=CHAT_ID,
+            configuration=configuration,
+            configuration_raw=configuration_raw,
+        )
+
+
+async def notify(bot: aiogram.Bot, event_ids: list[uuid.UUID]) -> None:
+    for event_id in event_ids:
+        async with get_service() as service:
+            await send_notification_message(service=service, bot=bot, event_id=event_id)
+
+
+async def get_event_ids() -> list[uuid.UUID]:
+    async with get_service() as service:
+        events = await service.event.get_many(filter_=schema.EventGetManyFilter(chat_id=CHAT_ID))
+
+    return [event_.id for event_ in events]
+
+
+async def cleanup() -> None:
+    async with get_service() as service:
+        event_ids = await service.event.delete(filter_=schema.EventDeleteFilter(chat_id=CHAT_ID))
+        await service.job.cancel(event_ids=event_ids)
+        await service.chat.get.delete(filter_=schema.ChatGetFilter(id=CHAT_ID))
+
+    async with engine.begin() as connection:
+        await connection.execute(delete(models.Chat).where(models.Chat.id == CHAT_ID))
+
+
+def format_row(row: list[str]) -> str:
+    return " | ".join(f"{column:>{width}}" for column, width in zip(row, WIDTHS, strict=True))
+
+
+def format_counts(backend: str, name: str, counter: Counter, calls: int) -> str:
+    return format_row(
+        row=[backend, name, *(f"{counter.counts[key] / calls:.1f}" for key in EVENT_NAMES)],
+    )
+
+
+async def main() -> None:
+    print(f"events: {EVENTS}, counts per call")
+    print(format_row(row=["backend", "case", "commits", "savepoints", "statements"]))
+
+    async with FakeTelegram() as telegram, telegram.build_bot() as bot:
+        for backend in ["postgres", "redis"]:
+            config.scheduler.backend = backend  # type: ignore[assignment]
+            await cleanup()
+
+            for name in ["/configure", "/configure, same"]:
+                with Counter() as counter:
+                    await configure()
+                print(format_counts(backend=backend, name=name, counter=counter, calls=1))
+
+            event_ids = await get_event_ids()
+            with Counter() as counter:
+                await notify(bot=bot, event_ids=event_ids)
+            print(
+                format_counts(backend=backend, name="notification", counter=counter, calls=EVENTS),
+            )
+
+            await cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,52 @@
+"""Cost of evaluating period expressions for a single `t`.
+
+Compares calling `numexpr.evaluate` for every field, which is what `Service.evaluate_period`
+used to do, with evaluating expressions compiled by `util.compile_expression`.
+"""
+
+import asyncio
+import timeit
+import typing
+
+import numexpr
+
+from app import schema
+from app.dependencies import get_service
+from app.util import RelativeDelta, compile_expression
+
+NUMBER = 20_000
+
+EXPRESSIONS = ["1", "2 * t + 3", "2 + 3 * (n % 2)", "where(t > 1, 1, 2)"]
+
+PERIOD = schema.Period(days="2 + 3 * (n % 2)", hours="t % 24", minutes="10")
+
+
+def evaluate_period_numexpr(period: schema.Period, t: int) -> RelativeDelta:
+    def evaluate(ex: str | None) -> int:
+        if ex is None:
+            return 0
+        return round(numexpr.evaluate(ex, {"t": t, "n": t + 1}, {}).item())
+
+    return RelativeDelta(**{key: evaluate(value) for key, value in period.model_dump().items()})
+
+
+def measure(function: typing.Callable[[], object]) -> float:
+    return timeit.timeit(function, number=NUMBER) / NUMBER * 1_000_000
+
+
+async def main() -> None:
+    print(f"{'expression':>24} | {'numexpr':>10} | {'compiled':>10}")
+    for ex in EXPRESSIONS:
+        expression = compile_expression(ex)
+        numexpr_us = measure(lambda ex=ex: numexpr.evaluate(ex, {"t": 7, "n": 8}, {}).item())
+        compiled_us = measure(lambda expression=expression: expression(7))
+        print(f"{ex:>24} | {numexpr_us:>8.2f}us | {compiled_us:>8.2f}us")
+
+    async with get_service() as service:
+        numexpr_us = measure(lambda: evaluate_period_numexpr(period=PERIOD, t=7))
+        compiled_us = measure(lambda: service.evaluate_period(period=PERIOD, t=7))
+        print(f"{'evaluate_period':>24} | {numexpr_us:>8.2f}us | {compiled_us:>8.2f}us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,149 @@
+"""Cost of loading a 1,000 events configuration with `Service.load_configuration`.
+
+Compares loading the events one by one, the way configurations used to be loaded
+with a commit after every change, with the bulk path, committed once, and then
+reloading the same configuration, which changes nothing.
+Jobs are scheduled by the backend from `config.scheduler`.
+
+Round trips are counted as transactions begun, statements executed and transactions committed.
+"""
+
+import asyncio
+import time
+import typing
+from datetime import datetime
+
+import pytz
+from sqlalchemy import delete, event
+
+from app import models, schema, tasks  # noqa: F401, tasks are imported before anything is measured
+from app.config import config
+from app.database import engine
+from app.dependencies import get_service
+from app.service import Service
+from app.util import RelativeDelta
+
+EVENTS = 1000
+CHAT_ID = -1_000_000_000_001
+
+
+class RoundTripCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_: object, **__: object) -> None:
+        self.count += 1
+
+    def __enter__(self) -> typing.Self:
+        for name in ["begin", "before_cursor_execute", "commit"]:
+            event.listen(engine.sync_engine, name, self)
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        for name in ["begin", "before_cursor_execute", "commit"]:
+            event.remove(engine.sync_engine, name, self)
+
+
+def build_configuration() -> tuple[schema.ConfigurationInput, dict[str, typing.Any]]:
+    now = datetime.now(tz=pytz.utc)
+    configuration_raw = {
+        "timezone": "Europe/Kyiv",
+        "events": [
+            {
+                "name": f"Event {i}",
+                "initial_date": (now - RelativeDelta(days=i)).strftime(config.date_format),
+                "periodicity": {"days": "1", "minutes": str(i % 60)},
+                "offset": {"minutes": "10"},
+            }
+            for i in range(EVENTS)
+        ],
+    }
+    return schema.ConfigurationInput.model_validate(obj=configuration_raw), configuration_raw
+
+
+async def load_one_by_one(
+    service: Service,
+    chat_id: int,
+    configuration: schema.ConfigurationInput,
+    configuration_raw: dict[str, typing.Any],
+) -> None:
+    event_ids = await service.event.delete(filter_=schema.EventDeleteFilter(chat_id=chat_id))
+    await service.job.cancel(event_ids=event_ids)
+    await service.commit()
+
+    chat = schema.Chat(id=chat_id, timezone=configuration.timezone, config=configuration_raw)
+    await service.chat.upsert(chat=chat)
+    await service.commit()
+
+    for event_input in configuration.events:
+        event_ = service.update_event_next_date(
+            event=schema.Event(
+                chat=chat,
+                name=event_input.name,
+                initial_date=event_input.initial_date,
+                next_date=event_input.initial_date,
+                periodicity=event_input.periodicity,
+                offset=event_input.offset,
+            ),
+        )
+        if event_ is None:
+            continue
+
+        await service.event.upsert(event=event_)
+        await service.commit()
+        await service.job.schedule(
+            job=schema.Job(
+                type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+                event_id=event_.id,
+                eta=event_.next_date - service.evaluate_event_offset(event=event_),
+            ),
+        )
+        await service.commit()
+
+
+async def cleanup(service: Service) -> None:
+    event_ids = await service.event.delete(filter_=schema.EventDeleteFilter(chat_id=CHAT_ID))
+    await service.job.cancel(event_ids=event_ids)
+    await service.commit()
+
+    async with engine.begin() as connection:
+        await connection.execute(delete(models.Chat).where(models.Chat.id == CHAT_ID))
+    await service.chat.get.delete(filter_=schema.ChatGetFilter(id=CHAT_ID))
+
+
+async def main() -> None:
+    configuration, configuration_raw = build_configuration()
+
+    cases = [
+        ("one by one", load_one_by_one),
+        ("bulk", Service.load_configuration),
+        ("bulk, unchanged", Service.load_configuration),
+    ]
+
+    async with get_service() as service:
+        await cleanup(service=service)
+
+        print(f"backend: {config.scheduler.backend}, events: {EVENTS}")
+        print(f"{'case':>16} | {'wall time':>10} | {'round trips':>11}")
+        for name, load in cases:
+            if name != "bulk, unchanged":
+                await cleanup(service=service)
+
+            with RoundTripCounter() as counter:
+                start = time.perf_counter()
+                await load(
+                    service,
+                    chat_id=CHAT_ID,
+                    configuration=configuration,
+                    configuration_raw=configuration_raw,
+                )
+                await service.commit()
+                elapsed = time.perf_counter() - start
+
+            print(f"{name:>16} | {elapsed:>9.3f}s | {counter.count:>11}")
+
+        await cleanup(service=service)
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,72 @@
+"""Throughput of the `redis` scheduler backend against the Redis from `config.redis`.
+
+Enqueues jobs that are already due, then pops them in batches of different sizes
+and dispatches every job to a no-op coroutine, the same way `app.scheduler` does.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+import pytz
+
+from app import schema
+from app.config import config
+from app.dependencies import get_redis, get_service
+from app.service.job.job import QUEUE_KEY
+
+JOBS = 20_000
+BATCH_SIZES = [1, 10, 100, 1000]
+
+
+async def dispatch(job: schema.Job) -> None:
+    return
+
+
+async def main() -> None:
+    config.scheduler.backend = "redis"
+
+    async with get_redis() as redis:
+        await redis.delete(QUEUE_KEY)
+
+    async with get_service() as service:
+        print(f"{'batch size':>10} | {'enqueued':>12} | {'popped':>12} | {'dispatched':>12}")
+        for batch_size in BATCH_SIZES:
+            now = datetime.now(tz=pytz.utc)
+            jobs = [
+                schema.Job(
+                    type=schema.JobTypeEnum.SEND_NOTIFICATION_MESSAGE,
+                    event_id=uuid.uuid4(),
+                    eta=now,
+                )
+                for _ in range(JOBS)
+            ]
+
+            start = time.perf_counter()
+            for job in jobs:
+                await service.job.schedule(job=job)
+            await service.commit()
+            enqueued = JOBS / (time.perf_counter() - start)
+
+            popped_time, dispatched_time, count = 0.0, 0.0, 0
+            while count < JOBS:
+                start = time.perf_counter()
+                claimed = await service.job.claim(limit=batch_size)
+                popped_time += time.perf_counter() - start
+
+                for job in claimed:
+                    await dispatch(job=job)
+                await service.job.complete(jobs=claimed)
+                dispatched_time += time.perf_counter() - start
+
+                count += len(claimed)
+
+            print(
+                f"{batch_size:>10} | {enqueued:>8.0f}/sec | {JOBS / popped_time:>8.0f}/sec"
+                f" | {JOBS / dispatched_time:>8.0f}/sec",
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,128 @@
+"""Cost of reading everything a queue message is rendered from.
+
+Compares `OccurrenceRepository.get` followed by `EntryRepository.get_many`, the way
+the queue used to be read, with `OccurrenceRepository.get_snapshot`, for queues
+of `QUEUE_SIZES` entries. Every read is done `REPEATS` times, each in its own session.
+
+Round trips are counted as statements executed by `app.database.engine`.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+import pytz
+from sqlalchemy import delete, event, insert
+
+from app import models, schema
+from app.database import engine
+from app.dependencies import get_repository
+from app.repository import Repository
+from app.util import RelativeDelta
+
+QUEUE_SIZES = [10, 100, 1000]
+REPEATS = 200
+CHAT_ID = -1_000_000_000_004
+WIDTHS = [10, 10, 11, 11]
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_: object) -> None:
+        self.count += 1
+
+
+async def setup(size: int) -> uuid.UUID:
+    now = datetime.now(tz=pytz.utc)
+    chat = schema.Chat(id=CHAT_ID, timezone="Europe/Kyiv", config={"events": []})
+    event_ = schema.Event(
+        chat=chat,
+        name="Event",
+        initial_date=now,
+        next_date=now,
+        periodicity=schema.Period(days="1"),
+    )
+    occurrence = schema.Occurrence(event=event_, message_id=1, created_at=now)
+
+    async with get_repository() as repository:
+        await repository.chat.upsert(chat=chat)
+        await repository.event.upsert(event=event_)
+        await repository.occurrence.upsert(occurrence=occurrence)
+
+    async with engine.begin() as connection:
+        await connection.execute(
+            insert(models.Entry),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "occurrence_id": occurrence.id,
+                    "full_name": f"User {user_id}",
+                    "username": f"user_{user_id}",
+                    "user_id": user_id,
+                    "created_at": (now + RelativeDelta(seconds=user_id)).replace(tzinfo=None),
+                    "is_skipping": user_id % 5 == 0,
+                    "is_done": user_id % 3 == 0,
+                }
+                for user_id in range(1, size + 1)
+            ],
+        )
+
+    return occurrence.id
+
+
+async def cleanup() -> None:
+    async with engine.begin() as connection:
+        await connection.execute(delete(models.Chat).where(models.Chat.id == CHAT_ID))
+
+
+async def read_separately(repository: Repository, occurrence_id: uuid.UUID) -> None:
+    await repository.occurrence.get(filter_=schema.OccurrenceGetFilter(id=occurrence_id))
+    await repository.entry.get_many(filter_=schema.EntryGetManyFilter(occurrence_id=occurrence_id))
+
+
+async def read_snapshot(repository: Repository, occurrence_id: uuid.UUID) -> None:
+    await repository.occurrence.get_snapshot(filter_=schema.OccurrenceGetFilter(id=occurrence_id))
+
+
+def format_row(row: list[str]) -> str:
+    return " | ".join(f"{column:>{width}}" for column, width in zip(row, WIDTHS, strict=True))
+
+
+async def main() -> None:
+    print(format_row(row=["entries", "read", "wall time", "statements"]))
+
+    for size in QUEUE_SIZES:
+        await cleanup()
+        occurrence_id = await setup(size=size)
+
+        for name, read in [("separate", read_separately), ("snapshot", read_snapshot)]:
+            counter = StatementCounter()
+            event.listen(engine.sync_engine, "before_cursor_execute", counter)
+
+            elapsed = 0.0
+            for _ in range(REPEATS):
+                async with get_repository() as repository:
+                    start = time.perf_counter()
+                    await read(repository, occurrence_id)
+                    elapsed += time.perf_counter() - start
+
+            event.remove(engine.sync_engine, "before_cursor_execute", counter)
+            print(
+                format_row(
+                    row=[
+                        str(size),
+                        name,
+                        f"{elapsed / REPEATS * 1000:.2f}ms",
+                        f"{counter.count / REPEATS:.1f}",
+                    ],
+                ),
+            )
+
+    await cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,49 @@
+"""Size and (de)serialization time of `send_notification_message_task` message body.
+
+Compares `pickle` that tasks used to be sent with, `json` serializer of kombu
+and the msgpack format of `app.tasks.serialization`. Message headers don't depend on
+the serializer, so the difference in size of a broker message is the difference in body size.
+"""
+
+import timeit
+import uuid
+
+from kombu.serialization import dumps, loads
+
+from app.tasks import celery, send_notification_message_task, serialization
+
+NUMBER = 100_000
+SERIALIZERS = ["pickle", "json", serialization.NAME]
+WIDTHS = [18, 10, 10, 10]
+
+
+def main() -> None:
+    message = celery.amqp.as_task_v2(
+        str(uuid.uuid4()),
+        send_notification_message_task.name,
+        kwargs={"event_id": uuid.uuid4()},
+    )
+
+    print(f"messages: {NUMBER}")
+    header = ["serializer", "body size", "encode", "decode"]
+    print(" | ".join(f"{column:>{width}}" for column, width in zip(header, WIDTHS, strict=True)))
+    for serializer in SERIALIZERS:
+        content_type, content_encoding, data = dumps(message.body, serializer=serializer)
+
+        encode = timeit.timeit(lambda: dumps(message.body, serializer=serializer), number=NUMBER)  # noqa: B023
+        decode = timeit.timeit(
+            lambda: loads(data, content_type, content_encoding, accept=[content_type]),  # noqa: B023
+            number=NUMBER,
+        )
+
+        row = [
+            serializer,
+            f"{len(data)}B",
+            f"{encode / NUMBER * 1e6:.2f}us",
+            f"{decode / NUMBER * 1e6:.2f}us",
+        ]
+        print(" | ".join(f"{column:>{width}}" for column, width in zip(row, WIDTHS, strict=True)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Catch-up cost of `Service.update_event_next_date` depending on elapsed time.
+
+Compares a linear periodicity, which is jumped ahead, with the equivalent periodicity
+written in a form that can't be linearized and is evaluated in batches instead.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytz
+
+from app import schema
+from app.dependencies import get_service
+from app.service import Service
+from app.util import RelativeDelta
+
+ELAPSED = [
+    ("1 hour", RelativeDelta(hours=1)),
+    ("1 day", RelativeDelta(days=1)),
+    ("30 days", RelativeDelta(days=30)),
+    ("1 year", RelativeDelta(years=1)),
+    ("10 years", RelativeDelta(years=10)),
+]
+MAX_BATCH_ELAPSED = RelativeDelta(years=1)
+
+PERIODICITIES = [
+    ("jump", schema.Period(minutes="1")),
+    ("batch", schema.Period(minutes="1 + 0 * (t % 2)")),
+]
+
+
+def measure(service: Service, periodicity: schema.Period, elapsed: RelativeDelta) -> float:
+    now = datetime.now(tz=pytz.utc)
+    event = schema.Event(
+        chat=schema.Chat(id=1, timezone="Etc/UTC", config={}),
+        name="Benchmark",
+        initial_date=now - elapsed,
+        next_date=now - elapsed,
+        periodicity=periodicity,
+    )
+
+    start = time.perf_counter()
+    service.update_event_next_date(event=event)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    async with get_service() as service:
+        print(f"{'elapsed':>10} | " + " | ".join(f"{name:>12}" for name, _ in PERIODICITIES))
+        for label, elapsed in ELAPSED:
+            row = []
+            for name, periodicity in PERIODICITIES:
+                if name == "batch" and elapsed > MAX_BATCH_ELAPSED:
+                    row.append(f"{'-':>12}")
+                    continue
+                row.append(f"{measure(service, periodicity, elapsed) * 1000:>10.3f}ms")
+            print(f"{label:>10} | " + " | ".join(row))
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,116 @@
+"""Latency of updates received by long polling and by webhook.
+
+`app.testing.FakeTelegram` gets `UPDATES` updates, one every `INTERVAL` seconds,
+and serves them by `getUpdates` or delivers them to the webhook set by `app.main.start_webhook`.
+Every request between the fake and the bot is delayed by `LATENCY` seconds each way,
+like requests between Telegram and a bot hosted far from it.
+
+Latency is the time from the update reaching the fake until the dispatcher calls the handler.
+"""
+
+import asyncio
+import socket
+import statistics
+import time
+
+import aiogram
+from aiogram.types import Message
+
+from app.config import config
+from app.main import start_webhook
+from app.testing import FakeTelegram
+
+UPDATES = 500
+INTERVAL = 0.01
+LATENCY = 0.05
+SECRET = "secret"  # noqa: S105
+WIDTHS = [8, 9, 9, 9, 9]
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+async def measure(telegram: FakeTelegram, mode: str) -> list[float]:
+    pushed: dict[int, float] = {}
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    dp = aiogram.Dispatcher()
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        latencies.append(time.perf_counter() - pushed[message.message_id])
+        if len(latencies) == UPDATES:
+            done.set()
+
+    bot = telegram.build_bot()
+    match mode:
+        case "polling":
+            polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False))
+        case "webhook":
+            runner = await start_webhook(dp=dp, bot=bot)
+
+    # let the first `getUpdates` or `setWebhook` reach the fake
+    await asyncio.sleep(4 * LATENCY)
+
+    deliveries = []
+    for update_id in range(UPDATES):
+        pushed[update_id] = time.perf_counter()
+        update = {
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": 1, "type": "private"},
+                "text": "text",
+            },
+        }
+        deliveries.append(asyncio.create_task(telegram.push_update(update=update)))
+        await asyncio.sleep(INTERVAL)
+
+    await asyncio.gather(*deliveries)
+    await done.wait()
+
+    match mode:
+        case "polling":
+            await dp.stop_polling()
+            await polling
+        case "webhook":
+            await runner.cleanup()
+            telegram.webhook = None
+    await bot.session.close()
+
+    return latencies
+
+
+async def main() -> None:
+    port = get_free_port()
+    config.updates.host = "127.0.0.1"
+    config.updates.port = port
+    config.updates.webhook_url = f"http://127.0.0.1:{port}{config.updates.webhook_path}"
+    config.updates.webhook_secret = SECRET
+
+    # `LATENCY` each way
+    telegram = FakeTelegram(latency=2 * LATENCY)
+    await telegram.start()
+
+    print(f"updates: {UPDATES}, interval: {INTERVAL * 1000:.0f}ms, latency: {LATENCY * 1000:.0f}ms")
+    header = ["mode", "p50", "p90", "p99", "max"]
+    print(" | ".join(f"{column:>{width}}" for column, width in zip(header, WIDTHS, strict=True)))
+    for mode in ["polling", "webhook"]:
+        latencies = sorted(await measure(telegram=telegram, mode=mode))
+        quantiles = statistics.quantiles(latencies, n=100)
+        row = [
+            mode,
+            *(f"{value * 1000:.1f}ms" for value in [quantiles[49], quantiles[89], quantiles[98]]),
+            f"{latencies[-1] * 1000:.1f}ms",
+        ]
+        print(" | ".join(f"{column:>{width}}" for column, width in zip(row, WIDTHS, strict=True)))
+
+    await telegram.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main=main())
@@ -0,0 +1,151 @@
+"""Cost of running `send_notification_message_task` N times.
+
+Compares running every task with resources of its own, the way tasks used to run,
+with running them one by one on the shared `app.tasks.celery.runtime`
+and with running them from `config.worker.concurrency` threads, the way `threads` pool does.
+Bot talks to `app.testing.FakeTelegram` over plain HTTP that answers
+after `LATENCY` seconds, the real API also pays for a TLS handshake on every new connection.
+Jobs are scheduled by the `redis` backend.
+
+Connections are counted as TCP connections accepted by the fake and by Redis.
+"""
+
+import itertools
+import time
+import typing
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytz
+from redis.asyncio import Redis as AsyncRedis
+from sqlalchemy import delete
+
+from app import models, schema
+from app.config import config
+from app.database import engine
+from app.dependencies import get_service
+from app.tasks import send_notification_message_task
+from app.tasks.celery import runtime
+from app.tasks.tasks import is_job_revoked, send_notification_message
+from app.testing import FakeTelegram
+from app.testing.telegram import TOKEN
+from app.util import RelativeDelta
+
+TASKS = 200
+LATENCY = 0.05
+CHAT_ID = -1_000_000_000_002
+WIDTHS = [14, 10, 9, 10, 11]
+
+
+async def count_redis_connections() -> int:
+    async with AsyncRedis(host=config.redis.host, port=config.redis.port) as redis:
+        return int((await redis.info(section="stats"))["total_connections_received"])
+
+
+async def setup() -> list[uuid.UUID]:
+    now = datetime.now(tz=pytz.utc)
+    chat = schema.Chat(id=CHAT_ID, timezone="Etc/UTC", config={"events": []})
+    events = [
+        schema.Event(
+            chat=chat,
+            name=f"Event {i}",
+            initial_date=now,
+            next_date=now + RelativeDelta(hours=1),
+            periodicity=schema.Period(days="1"),
+        )
+        for i in range(TASKS)
+    ]
+
+    async with get_service() as service:
+        await service.chat.upsert(chat=chat)
+        await service.event.upsert_many(events=events)
+
+    return [event.id for event in events]
+
+
+async def cleanup() -> None:
+    async with get_service() as service:
+        event_ids = await service.event.delete(filter_=schema.EventDeleteFilter(chat_id=CHAT_ID))
+        await service.job.cancel(event_ids=event_ids)
+        await service.chat.get.delete(filter_=schema.ChatGetFilter(id=CHAT_ID))
+
+    async with engine.begin() as connection:
+        await connection.execute(delete(models.Chat).where(models.Chat.id == CHAT_ID))
+
+
+async def send_with_own_resources(telegram: FakeTelegram, event_id: uuid.UUID) -> None:
+    async with get_service() as service:
+        if await is_job_revoked(service=service, job_id=None):
+            return
+
+        async with telegram.build_bot() as bot:
+            await send_notification_message(service=service, bot=bot, event_id=event_id)
+
+
+def run_sequentially(send: typing.Callable[[], None]) -> None:
+    for _ in range(TASKS):
+        send()
+
+
+def run_concurrently(send: typing.Callable[[], None]) -> None:
+    with ThreadPoolExecutor(max_workers=config.worker.concurrency) as executor:
+        for future in [executor.submit(send) for _ in range(TASKS)]:
+            future.result()
+
+
+def main() -> None:
+    # jobs must not be published to a broker that may not be there
+    config.scheduler.backend = "redis"
+    config.token = TOKEN
+
+    runtime.start()
+
+    telegram = FakeTelegram(latency=LATENCY)
+    runtime.run(telegram.start())
+    runtime.bot = telegram.build_bot()
+
+    runtime.run(cleanup())
+    # every task sends a notification of its own event, like tasks of different events do
+    event_ids = itertools.cycle(runtime.run(setup()))
+
+    def send_with_own() -> None:
+        runtime.run(send_with_own_resources(telegram=telegram, event_id=next(event_ids)))
+
+    def send_with_shared() -> None:
+        send_notification_message_task(event_id=next(event_ids))
+
+    cases = [
+        ("own resources", run_sequentially, send_with_own),
+        ("shared runtime", run_sequentially, send_with_shared),
+        (f"{config.worker.concurrency} threads", run_concurrently, send_with_shared),
+    ]
+
+    print(f"tasks: {TASKS}")
+    header = ["case", "wall time", "per task", "http conns", "redis conns"]
+    print(" | ".join(f"{column:>{width}}" for column, width in zip(header, WIDTHS, strict=True)))
+    for name, run, send in cases:
+        telegram.connections.clear()
+        redis_connections = runtime.run(count_redis_connections())
+
+        start = time.perf_counter()
+        run(send)
+        elapsed = time.perf_counter() - start
+
+        redis_connections = runtime.run(count_redis_connections()) - redis_connections - 1
+        row = [
+            name,
+            f"{elapsed:.3f}s",
+            f"{elapsed / TASKS * 1000:.2f}ms",
+            len(telegram.connections),
+            redis_connections,
+        ]
+        print(" | ".join(f"{column:>{width}}" for column, width in zip(row, WIDTHS, strict=True)))
+
+    runtime.run(cleanup())
+    runtime.run(telegram.stop())
+    runtime.stop()
+
+
+if __name__ == "__main__":
+    main()
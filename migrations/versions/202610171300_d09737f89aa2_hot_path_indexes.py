@@ -0,0 +1,64 @@
+"""Hot path indexes
+
+Revision ID: d09737f89aa2
+Revises: 5e2b8f4c1d07
+Create Date: 2026-10-17 13:00:12.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd09737f89aa2'
+down_revision: Union[str, None] = '5e2b8f4c1d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # indexes are built without blocking writes to the tables, which can't be done in a transaction,
+    # so a failed upgrade leaves them behind and is simply run again
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_event_chat_id'), 'event', ['chat_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_occurrence_event_id'), 'occurrence', ['event_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_job_event_id'), 'job', ['event_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_job_occurrence_id'), 'job', ['occurrence_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+        # a unique index that failed to build is left INVALID, it's dropped to be built again
+        op.drop_index('uq_entry_occurrence_id_user_id', table_name='entry', postgresql_concurrently=True, if_exists=True)
+
+        # duplicate entries of a user left by concurrent Join presses, the earliest one keeps its place;
+        # a duplicate joined after they are deleted fails the build below, stop the bot to avoid it
+        op.execute(
+            """
+            DELETE FROM entry
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY occurrence_id, user_id ORDER BY created_at, id
+                    ) AS position
+                    FROM entry
+                ) AS entries
+                WHERE position > 1
+            )
+            """
+        )
+        op.create_index('uq_entry_occurrence_id_user_id', 'entry', ['occurrence_id', 'user_id'], unique=True, postgresql_concurrently=True)
+
+    op.execute(
+        'ALTER TABLE entry ADD CONSTRAINT uq_entry_occurrence_id_user_id '
+        'UNIQUE USING INDEX uq_entry_occurrence_id_user_id'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_entry_occurrence_id_user_id', 'entry', type_='unique')
+
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_job_occurrence_id'), table_name='job', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_job_event_id'), table_name='job', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_occurrence_event_id'), table_name='occurrence', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_event_chat_id'), table_name='event', postgresql_concurrently=True)